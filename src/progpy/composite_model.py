@@ -3,8 +3,10 @@
 
 from collections.abc import Iterable
 from inspect import signature
+import numpy as np
 
 from progpy import PrognosticsModel
+from progpy.utils.containers import _as_container
 
 DIVIDER = "."
 
@@ -50,6 +52,8 @@ class CompositeModel(PrognosticsModel):
         >>> )
 
     .. note:: Model parameters can be set and accessed using the '[model].[param]' format. For example, for composite model m, m['foo.bar'] would set the parameter 'bar' for the model 'foo'.
+
+    .. note:: The composite model is vectorized (i.e., is_vectorized is True) if every model is vectorized and every function is marked as vectorized (i.e., fcn.is_vectorized = True). Functions of a vectorized composite model are called with arrays of values, one for each column of the state.
     """
 
     def __init__(self, models: list, connections: list = [], **kwargs):
@@ -220,7 +224,7 @@ class CompositeModel(PrognosticsModel):
                 self.__to_input_connections[out_model].append((in_key, out_key_part))
 
                 # Add to state (to preserve last between runs)
-                self.__to_state_from_pm_connections[out_model].append(
+                self.__to_state_from_pm_connections[in_model].append(
                     (in_key_part, in_key)
                 )
                 self.states.add(in_key)
@@ -262,8 +266,114 @@ class CompositeModel(PrognosticsModel):
                         PassthroughParams(params["models"], name, key)
                     ]
 
+        # Vectorized if every model is, and every function is marked as vectorized
+        self.is_vectorized = all(m.is_vectorized for _, m in params["models"]) and all(
+            getattr(fcn, "is_vectorized", False) for _, fcn in params["functions"]
+        )
+
+        # Connections are compiled into index arrays when first used (see __compile)
+        self.__compiled = None
+
         return super().__setstate__(params)
 
+    def __compile(self) -> tuple:
+        """
+        Compile the connections into index arrays over the rows of the composite state, input, and output containers, so submodels are called with gathered arrays instead of dicts built from keys every step. Compiled again when the containers are recreated (e.g., in construction or when copied)
+
+        Returns:
+            tuple: (StateContainer, model wiring, function wiring)
+        """
+        x_index = self.StateContainer._shared_index
+        u_index = self.InputContainer._shared_index
+        z_index = self.OutputContainer._shared_index
+
+        def rows(indices) -> np.ndarray:
+            return np.array(indices, dtype=np.intp)
+
+        models = []
+        for name, m in self.parameters["models"]:
+            prefix = name + DIVIDER
+            m_inputs = m.InputContainer._shared_keys
+            m_input_index = m.InputContainer._shared_index
+            m_output_index = m.OutputContainer._shared_index
+            # Inputs of the model from inputs of the composite model
+            from_inputs = [
+                (i, u_index[prefix + key])
+                for i, key in enumerate(m_inputs)
+                if prefix + key in u_index
+            ]
+            # Inputs of the model from the composite state (i.e., connections)
+            from_states = [
+                (m_input_index[key], x_index[in_key])
+                for in_key, key in self.__to_input_connections[name]
+            ]
+            # Outputs of the model saved to the composite state
+            to_states = [
+                (m_output_index[key], x_index[in_key])
+                for key, in_key in self.__to_state_connections[name]
+            ]
+            # Outputs of the model that are outputs of the composite model
+            to_outputs = [
+                (m_output_index[key], z_index[prefix + key])
+                for key in m.OutputContainer._shared_keys
+                if prefix + key in z_index
+            ]
+            models.append(
+                (
+                    prefix,
+                    m,
+                    rows(
+                        [x_index[prefix + key] for key in m.StateContainer._shared_keys]
+                    ),
+                    len(m_inputs),
+                    rows([i for i, _ in from_inputs]),
+                    rows([j for _, j in from_inputs]),
+                    rows([i for i, _ in from_states]),
+                    rows([j for _, j in from_states]),
+                    rows([i for i, _ in to_states]),
+                    rows([j for _, j in to_states]),
+                    [
+                        (key, x_index[in_key])
+                        for key, in_key in self.__to_state_from_pm_connections[name]
+                    ],
+                    rows([i for i, _ in to_outputs]),
+                    rows([j for _, j in to_outputs]),
+                )
+            )
+
+        functions = []
+        for name, fcn in self.parameters["functions"]:
+            prefix = name + DIVIDER
+            from_states = {
+                arg: x_index[in_key]
+                for in_key, arg in self.__to_input_connections[name]
+            }
+            # Remaining arguments are inputs of the composite model (None if missing)
+            from_inputs = {
+                arg: u_index.get(prefix + arg)
+                for arg in signature(fcn).parameters.keys()
+                if arg not in from_states
+            }
+            functions.append(
+                (
+                    prefix,
+                    fcn,
+                    list(from_states.items()),
+                    list(from_inputs.items()),
+                    x_index[prefix + "return"],
+                    z_index.get(prefix + "return"),
+                )
+            )
+
+        self.__compiled = (self.StateContainer, models, functions)
+        return self.__compiled
+
+    def __wiring(self) -> tuple:
+        compiled = self.__compiled
+        if compiled is None or compiled[0] is not self.StateContainer:
+            compiled = self.__compile()
+        return compiled[1], compiled[2]
+
     def initialize(self, u=None, z=None):
         if u is None:
             u = {}
@@ -296,122 +406,135 @@ class CompositeModel(PrognosticsModel):
 
         # Initialize functions
         for name, fcn in self.parameters["functions"]:
-            keys = set(signature(fcn).parameters.keys())
             fcn_in = {
                 fcn_key: x_0.get(out_key, z.get(out_key, None))
                 for (out_key, fcn_key) in self.__to_input_connections[name]
             }
-            for key in keys - set(fcn_in.keys()):
-                # For remaining keys - get from input
-                fcn_in[key] = u.get(name + DIVIDER + key, None)
+            for key in signature(fcn).parameters.keys():
+                if key not in fcn_in:
+                    # For remaining keys - get from input
+                    fcn_in[key] = u.get(name + DIVIDER + key, None)
             x_0[name + DIVIDER + "return"] = fcn(**fcn_in)
 
         return self.StateContainer(x_0)
 
     def next_state(self, x, u, dt):
-        for name, m in self.parameters["models"]:
-            # Prepare inputs
-            u_i = {key: u.get(name + "." + key, None) for key in m.inputs}
-            # Process connections
-            # This updates the inputs that are connected to states/outputs
-            for in_key, out_key_part in self.__to_input_connections[name]:
-                u_i[out_key_part] = x[in_key]
-
-            u_i = m.InputContainer(u_i)
-
-            # Prepare state
-            x_i = m.StateContainer({key: x[name + "." + key] for key in m.states})
+        models, functions = self.__wiring()
+        x = _as_container(self.StateContainer, x)
+        x_matrix = x.matrix
+        u_matrix = _as_container(self.InputContainer, u).matrix
+        n_cols = max(x_matrix.shape[1], u_matrix.shape[1])
+        dtype = np.result_type(x_matrix, u_matrix, np.float64)
+
+        for (
+            _,
+            m,
+            state_rows,
+            n_inputs,
+            u_dst,
+            u_src,
+            x_dst,
+            x_src,
+            z_src,
+            z_dst,
+            pm_rows,
+            _,
+            _,
+        ) in models:
+            # Prepare inputs, from inputs and connected states (NaN if not connected)
+            u_i = np.full((n_inputs, n_cols), np.nan, dtype=dtype)
+            u_i[u_dst] = u_matrix[u_src]
+            u_i[x_dst] = x_matrix[x_src]
 
             # Propagate state
-            x_i = m.next_state(x_i, u_i, dt)
+            x_i = m.next_state(
+                m.StateContainer.from_matrix(x_matrix[state_rows]),
+                m.InputContainer.from_matrix(u_i),
+                dt,
+            )
+            x_i = _as_container(m.StateContainer, x_i)
 
             # Save to super state
-            for key, value in x_i.items():
-                x[name + "." + key] = value
+            x_matrix[state_rows] = x_i.matrix
 
             # Process connections
             # This updates the states that are connected to outputs
-            if len(self.__to_state_connections[name]) > 0:
-                # From Outputs
-                z_i = m.output(x_i)
-                for in_key_part, in_key in self.__to_state_connections[name]:
-                    x[in_key] = z_i.get(in_key_part, None)
-
-            if len(self.__to_state_from_pm_connections) > 0:
-                # From Performance Metrics
+            if len(z_src) > 0:
+                z_i = _as_container(m.OutputContainer, m.output(x_i))
+                x_matrix[z_dst] = z_i.matrix[z_src]
+
+            # This updates the states that are connected to performance metrics
+            if pm_rows:
                 pm_i = m.performance_metrics(x_i)
-                for in_key_part, in_key in self.__to_state_from_pm_connections[name]:
-                    x[in_key] = pm_i.get(in_key_part, None)
+                for key, row in pm_rows:
+                    x_matrix[row] = pm_i.get(key, None)
 
         # Process functions
-        for name, fcn in self.parameters["functions"]:
-            keys = set(signature(fcn).parameters.keys())
-            fcn_in = {
-                fcn_key: x.get(out_key, None)
-                for (out_key, fcn_key) in self.__to_input_connections[name]
-            }
-            for key in keys - set(fcn_in.keys()):
-                # For remaining keys - get from input
-                fcn_in[key] = u.get(name + DIVIDER + key, None)
-            x[name + DIVIDER + "return"] = fcn(**fcn_in)
+        for _, fcn, from_states, from_inputs, return_row, _ in functions:
+            fcn_in = {arg: _row(x_matrix, row) for arg, row in from_states}
+            for arg, row in from_inputs:
+                fcn_in[arg] = None if row is None else _row(u_matrix, row)
+            x_matrix[return_row] = fcn(**fcn_in)
 
         return x
 
     def output(self, x):
-        z = {}
-        for name, m in self.parameters["models"]:
-            # Prepare state
-            x_i = m.StateContainer({key: x[name + "." + key] for key in m.states})
-
-            # Get outputs
-            z_i = m.output(x_i)
-
-            # Save to super outputs
-            for key, value in z_i.items():
-                z[name + "." + key] = value
+        models, functions = self.__wiring()
+        x_matrix = _as_container(self.StateContainer, x).matrix
+        z = np.full((len(self.OutputContainer._shared_keys), x_matrix.shape[1]), np.nan)
+        for _, m, state_rows, *_, z_src, z_dst in models:
+            if len(z_src) == 0:
+                continue
+            z_i = _as_container(
+                m.OutputContainer,
+                m.output(m.StateContainer.from_matrix(x_matrix[state_rows])),
+            )
+            z[z_dst] = z_i.matrix[z_src]
 
-        for name, _ in self.parameters["functions"]:
-            z[name + DIVIDER + "return"] = x[name + DIVIDER + "return"]
-        return self.OutputContainer(z)
+        for *_, return_row, output_row in functions:
+            if output_row is not None:
+                z[output_row] = x_matrix[return_row]
+        return self.OutputContainer.from_matrix(z)
 
     def performance_metrics(self, x) -> dict:
+        models, _ = self.__wiring()
+        x_matrix = _as_container(self.StateContainer, x).matrix
         metrics = {}
-        for name, m in self.parameters["models"]:
-            # Prepare state
-            x_i = m.StateContainer({key: x[name + "." + key] for key in m.states})
-
-            # Get outputs
-            metrics_i = m.performance_metrics(x_i)
+        for prefix, m, state_rows, *_ in models:
+            metrics_i = m.performance_metrics(
+                m.StateContainer.from_matrix(x_matrix[state_rows])
+            )
 
             # Save to super outputs
             for key, value in metrics_i.items():
-                metrics[name + "." + key] = value
+                metrics[prefix + key] = value
         return metrics
 
     def event_state(self, x) -> dict:
+        models, _ = self.__wiring()
+        x_matrix = _as_container(self.StateContainer, x).matrix
         e = {}
-        for name, m in self.parameters["models"]:
-            # Prepare state
-            x_i = m.StateContainer({key: x[name + "." + key] for key in m.states})
-
-            # Get outputs
-            e_i = m.event_state(x_i)
+        for prefix, m, state_rows, *_ in models:
+            e_i = m.event_state(m.StateContainer.from_matrix(x_matrix[state_rows]))
 
             # Save to super outputs
             for key, value in e_i.items():
-                e[name + "." + key] = value
+                e[prefix + key] = value
         return e
 
     def threshold_met(self, x) -> dict:
+        models, _ = self.__wiring()
+        x_matrix = _as_container(self.StateContainer, x).matrix
         tm = {}
-        for name, m in self.parameters["models"]:
-            # Prepare state
-            x_i = m.StateContainer({key: x[name + "." + key] for key in m.states})
-
-            # Get outputs
-            tm_i = m.threshold_met(x_i)
+        for prefix, m, state_rows, *_ in models:
+            tm_i = m.threshold_met(m.StateContainer.from_matrix(x_matrix[state_rows]))
 
             # Save to super outputs
             for key, value in tm_i.items():
-                tm[name + "." + key] = value
+                tm[prefix + key] = value
         return tm
+
+
+def _row(matrix: np.ndarray, i: int):
+    # Value of a row, as a scalar for a single column (as returned by container[key])
+    return matrix[i, 0] if matrix.shape[1] == 1 else matrix[i]
@@ -560,9 +560,13 @@ class DMDModel(LinearModel, DataModel):
         outputs = LazySimResult(self.output, time_interp, states_interp)
         event_states = LazySimResult(self.event_state, time_interp, states_interp)
 
-        return self.SimulationResults(
+        interp_results = self.SimulationResults(
             time_interp, inputs, states, outputs, event_states
         )
+        interp_results.time_of_event = results.time_of_event
+        interp_results.state_at_event = results.state_at_event
+        interp_results.profile = results.profile
+        return interp_results
 
 
 # Kept for backwards compatability
@@ -2,9 +2,12 @@
 # National Aeronautics and Space Administration.  All Rights Reserved.
 
 from collections.abc import Sequence
+from functools import partial
+from inspect import Parameter, signature
 import numpy as np
 
 from progpy import PrognosticsModel
+from progpy.utils.containers import _as_container
 
 
 class EnsembleModel(PrognosticsModel):
@@ -19,18 +22,26 @@ class EnsembleModel(PrognosticsModel):
 
     Ensemble Models are constructed from a set of other models (e.g., :python:`m = EnsembleModel((m1, m2, m3))`). The models then operate functionally as one prognostic model.
 
+    The results of the models are stacked into a single array (models x keys x columns) and aggregated with one call to aggregation_method (with axis=0) for each group of keys provided by the same models. The ensemble model is vectorized (i.e., is_vectorized is True) if every model is vectorized.
+
     Args:
         models (list[PrognosticsModel]): List of at least 2 models that form the ensemble
 
     Keyword Arguments:
-        aggregation_method (function): Function that aggregates the outputs of the models in the ensemble. Default is np.mean
+        aggregation_method (function): Function that aggregates the outputs of the models in the ensemble. Called with the stacked values and axis=0 (e.g., np.mean, np.median, np.max), or with the values of each key separately if it doesn't accept an axis argument (i.e., its signature has no axis or keyword arguments). Default is np.mean
+        executor (concurrent.futures.Executor): Executor used to evaluate the models in parallel (e.g., ThreadPoolExecutor or ProcessPoolExecutor), for models that are expensive to evaluate (e.g., time_of_event). The models and arguments must be picklable when using a process-based executor. The executor is not copied with the model. Default is None (models are evaluated serially)
     """
 
     default_parameters = {
         "aggregation_method": np.mean,
     }
 
-    def __init__(self, models: list, **kwargs):
+    # Compiled when first used (see __compile)
+    __compiled = None
+    # Aggregation method and if it accepts an axis argument (see __reduce)
+    __aggregation = None
+
+    def __init__(self, models: list, executor=None, **kwargs):
         if not isinstance(models, Sequence):
             raise TypeError(
                 f"EnsembleModel must be initialized with a list of models, got {type(models)}"
@@ -56,98 +67,244 @@ class EnsembleModel(PrognosticsModel):
         self.states = list(states)
         self.outputs = list(outputs)
         self.events = list(events)
+        self.is_vectorized = all(m.is_vectorized for m in models)
+        self.executor = executor
 
         super().__init__(**kwargs)
         self.parameters["models"] = models
 
-    def initialize(self, u=None, z=None):
-        xs = [
-            m.initialize(
-                m.InputContainer(u) if u is not None else None,
-                m.OutputContainer(z) if z is not None else None,
+    def __compile(self) -> tuple:
+        """
+        Compile the rows of the states, inputs, and outputs of each model in the containers of the ensemble. Compiled again when the containers are recreated
+
+        Returns:
+            tuple: (StateContainer, rows for each model)
+        """
+
+        def rows(container, model_container) -> np.ndarray:
+            return np.array(
+                [container._shared_index[key] for key in model_container._shared_keys],
+                dtype=np.intp,
             )
-            for m in self.parameters["models"]
+
+        self.__compiled = (
+            self.StateContainer,
+            [
+                (
+                    rows(self.StateContainer, m.StateContainer),
+                    rows(self.InputContainer, m.InputContainer),
+                    rows(self.OutputContainer, m.OutputContainer),
+                )
+                for m in self.parameters["models"]
+            ],
+        )
+        return self.__compiled
+
+    def __rows(self) -> list:
+        compiled = self.__compiled
+        if compiled is None or compiled[0] is not self.StateContainer:
+            compiled = self.__compile()
+        return compiled[1]
+
+    def __map(self, calls: list) -> list:
+        """
+        Call each function (with its arguments) - in parallel if there is an executor
+
+        Args:
+            calls (list[tuple[Callable, tuple]]): Function and arguments for each model
+
+        Returns:
+            list: Result for each model
+        """
+        if self.executor is None:
+            return [fcn(*args) for fcn, args in calls]
+        futures = [self.executor.submit(fcn, *args) for fcn, args in calls]
+        return [future.result() for future in futures]
+
+    def __reduce(self, stacked: np.ndarray) -> np.ndarray:
+        aggregation_method = self.parameters["aggregation_method"]
+        if (
+            self.__aggregation is None
+            or self.__aggregation[0] is not aggregation_method
+        ):
+            self.__aggregation = (aggregation_method, _accepts_axis(aggregation_method))
+        if self.__aggregation[1]:
+            return aggregation_method(stacked, axis=0)
+        # Aggregation method without axis argument - aggregate each value separately
+        return np.apply_along_axis(aggregation_method, 0, stacked)
+
+    def __aggregate(self, n_keys: int, results: list) -> tuple:
+        """
+        Aggregate the results of the models. Results are stacked into one array (models x keys x columns), and every group of keys provided by the same models is aggregated with a single reduction
+
+        Args:
+            n_keys (int): Number of keys
+            results (list[tuple[list[int], np.ndarray]]): For each model, the rows (i.e., index of keys) of its values and the values (one row for each key)
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Aggregated values (keys x columns), and if each key was provided by any model
+        """
+        n_cols = max((values.shape[1] for _, values in results), default=1)
+        stacked = np.full((len(results), n_keys, n_cols), np.nan)
+        provided = np.zeros((len(results), n_keys), dtype=bool)
+        for i, (rows, values) in enumerate(results):
+            stacked[i, rows] = values
+            provided[i, rows] = True
+
+        if provided.all():
+            # Every model provides every key (e.g., models of the same class)
+            return self.__reduce(stacked), provided[0]
+
+        aggregated = np.full((n_keys, n_cols), np.nan)
+        groups = {}
+        for key in range(n_keys):
+            groups.setdefault(tuple(np.flatnonzero(provided[:, key])), []).append(key)
+        for models, keys in groups.items():
+            if len(models) > 0:
+                aggregated[keys] = self.__reduce(stacked[np.ix_(models, keys)])
+        return aggregated, provided.any(axis=0)
+
+    def __aggregate_dicts(self, results: list) -> dict:
+        """
+        Aggregate results of the models that are dictionaries (e.g., event_state). None values (e.g., events not reached in time_of_event) are treated as NaN, and aggregated NaN values are returned as None
+        """
+        keys = list(dict.fromkeys(key for result in results for key in result.keys()))
+        index = {key: i for i, key in enumerate(keys)}
+        n_cols = max(
+            (np.size(value) for result in results for value in result.values()),
+            default=1,
+        )
+        aggregated, _ = self.__aggregate(
+            len(keys),
+            [
+                (
+                    [index[key] for key in result.keys()],
+                    np.array(
+                        [
+                            np.broadcast_to(
+                                np.nan if value is None else value, (n_cols,)
+                            )
+                            for value in result.values()
+                        ],
+                        dtype=float,
+                    ).reshape(len(result), n_cols),
+                )
+                for result in results
+            ],
+        )
+        if n_cols > 1:
+            return {key: aggregated[i] for i, key in enumerate(keys)}
+        return {
+            key: None if np.isnan(aggregated[i, 0]) else aggregated[i, 0]
+            for i, key in enumerate(keys)
+        }
+
+    def __states(self, x) -> list:
+        # State of each model
+        x_matrix = _as_container(self.StateContainer, x).matrix
+        return [
+            m.StateContainer.from_matrix(x_matrix[x_rows])
+            for m, (x_rows, _, _) in zip(self.parameters["models"], self.__rows())
         ]
-        x0 = {}
-        for x in xs:
-            for key in x.keys():
-                if key in x0:
-                    x0[key].append(x[key])
-                else:
-                    x0[key] = [x[key]]
-        for key in x0.keys():
-            x0[key] = self.parameters["aggregation_method"](x0[key])
-        return self.StateContainer(x0)
+
+    def __aggregate_states(self, xs: list):
+        aggregated, _ = self.__aggregate(
+            len(self.states),
+            [
+                (x_rows, _as_container(m.StateContainer, x_i).matrix)
+                for m, (x_rows, _, _), x_i in zip(
+                    self.parameters["models"], self.__rows(), xs
+                )
+            ],
+        )
+        return self.StateContainer.from_matrix(aggregated)
+
+    def initialize(self, u=None, z=None):
+        xs = self.__map(
+            [
+                (
+                    m.initialize,
+                    (
+                        m.InputContainer(u) if u is not None else None,
+                        m.OutputContainer(z) if z is not None else None,
+                    ),
+                )
+                for m in self.parameters["models"]
+            ]
+        )
+        return self.__aggregate_states(xs)
 
     def next_state(self, x, u, dt):
-        xs = [
-            m.next_state(m.StateContainer(x), m.InputContainer(u), dt)
-            for m in self.parameters["models"]
-        ]
-        xs_final = {}
-        for x in xs:
-            for key in x.keys():
-                if key in xs_final:
-                    xs_final[key].append(x[key])
-                else:
-                    xs_final[key] = [x[key]]
-        for key in xs_final.keys():
-            xs_final[key] = self.parameters["aggregation_method"](xs_final[key])
-
-        return self.StateContainer(xs_final)
+        u_matrix = _as_container(self.InputContainer, u).matrix
+        xs = self.__map(
+            [
+                (
+                    m.next_state,
+                    (x_i, m.InputContainer.from_matrix(u_matrix[u_rows]), dt),
+                )
+                for m, (_, u_rows, _), x_i in zip(
+                    self.parameters["models"], self.__rows(), self.__states(x)
+                )
+            ]
+        )
+        return self.__aggregate_states(xs)
 
     def output(self, x):
-        zs = [m.output(m.StateContainer(x)) for m in self.parameters["models"]]
-        zs_final = {}
-        for z in zs:
-            for key in z.keys():
-                if key in zs_final:
-                    zs_final[key].append(z[key])
-                else:
-                    zs_final[key] = [z[key]]
-        for key in zs_final.keys():
-            zs_final[key] = self.parameters["aggregation_method"](zs_final[key])
-
-        return self.OutputContainer(zs_final)
+        zs = self.__map(
+            [
+                (m.output, (x_i,))
+                for m, x_i in zip(self.parameters["models"], self.__states(x))
+            ]
+        )
+        aggregated, _ = self.__aggregate(
+            len(self.outputs),
+            [
+                (z_rows, _as_container(m.OutputContainer, z_i).matrix)
+                for m, (_, _, z_rows), z_i in zip(
+                    self.parameters["models"], self.__rows(), zs
+                )
+            ],
+        )
+        return self.OutputContainer.from_matrix(aggregated)
 
     def event_state(self, x) -> dict:
-        es = [m.event_state(m.StateContainer(x)) for m in self.parameters["models"]]
-        es_final = {}
-        for es_i in es:
-            for key in es_i.keys():
-                if key in es_final:
-                    es_final[key].append(es_i[key])
-                else:
-                    es_final[key] = [es_i[key]]
-        for key in es_final.keys():
-            es_final[key] = self.parameters["aggregation_method"](es_final[key])
-
-        return es_final
+        es = self.__map(
+            [
+                (m.event_state, (x_i,))
+                for m, x_i in zip(self.parameters["models"], self.__states(x))
+            ]
+        )
+        return self.__aggregate_dicts(es)
 
     def performance_metrics(self, x) -> dict:
-        pms = [m.performance_metrics(x) for m in self.parameters["models"]]
-        pms_final = {}
-        for pm in pms:
-            for key in pm.keys():
-                if key in pms_final:
-                    pms_final[key].append(pm[key])
-                else:
-                    pms_final[key] = [pm[key]]
-        for key in pms_final.keys():
-            pms_final[key] = self.parameters["aggregation_method"](pms_final[key])
-
-        return pms_final
+        pms = self.__map(
+            [
+                (m.performance_metrics, (x_i,))
+                for m, x_i in zip(self.parameters["models"], self.__states(x))
+            ]
+        )
+        return self.__aggregate_dicts(pms)
 
     def time_of_event(self, *args, **kwargs):
-        toes = [m.time_of_event(*args, **kwargs) for m in self.parameters["models"]]
-        toe_final = {}
-        for toe in toes:
-            for key in toe.keys():
-                if key in toe_final:
-                    toe_final[key].append(toe[key])
-                else:
-                    toe_final[key] = [toe[key]]
-        for key in toe_final.keys():
-            toe_final[key] = self.parameters["aggregation_method"](toe_final[key])
-
-        return toe_final
+        toes = self.__map(
+            [
+                (partial(m.time_of_event, **kwargs), args)
+                for m in self.parameters["models"]
+            ]
+        )
+        return self.__aggregate_dicts(toes)
+
+
+def _accepts_axis(fcn) -> bool:
+    """
+    If the function accepts an axis keyword argument (checked from its signature)
+    """
+    try:
+        parameters = signature(fcn).parameters.values()
+    except (TypeError, ValueError):
+        # No signature (e.g., some builtins)
+        return False
+    return any(
+        parameter.name == "axis" or parameter.kind is Parameter.VAR_KEYWORD
+        for parameter in parameters
+    )
@@ -10,6 +10,12 @@ class ProgModelStateLimitWarning(Warning):
     """
 
 
+class ProgModelConvergenceWarning(Warning):
+    """
+    Prognostics Convergence Warning - indicates an iterative solver (e.g., an implicit integrator) did not converge, and its last iterate was used
+    """
+
+
 warnings_seen = set()
 
 
@@ -222,6 +222,9 @@ class LinearModel(PrognosticsModel, ABC):
             dx_array += np.matmul(self.B, u.matrix)
         return self.StateContainer(dx_array)
 
+    def jacobian(self, x, u):
+        return np.asarray(self.A, dtype=np.float64)
+
     def output(self, x):
         z_array = np.matmul(self.C, x.matrix) + self.D
         return self.OutputContainer(z_array)
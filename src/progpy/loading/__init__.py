@@ -7,3 +7,4 @@ from progpy.loading.gaussian_wrapper import (
     GaussianNoiseWrapper,
 )
 from progpy.loading.piecewise import Piecewise
+from progpy.loading.state_independent import state_independent
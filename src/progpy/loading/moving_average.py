@@ -26,8 +26,14 @@ class MovingAverage:
     >>>     load = load_source.get_load()
     >>>     future_load.add_load(load)
     >>> m.simulate_to_threshold(future_load)
+
+    Note
+    ----
+    The load does not depend on state, so predictors share it between samples (see :py:func:`progpy.loading.state_independent`)
     """
 
+    state_independent = True
+
     def __init__(self, InputContainer: type, window: int = 10):
         self.window = window
         self.InputContainer = InputContainer
@@ -23,8 +23,14 @@ class Piecewise:
     >>> m = SomeModel()
     >>> future_load = Piecewise(m.InputContainer, [0, 10, 20], {'input0': [0, 1, 0, 0.2]})
     >>> m.simulate_to_threshold(future_load)
+
+    Note
+    ----
+    The load only depends on time, so predictors share it between samples (see :py:func:`progpy.loading.state_independent`)
     """
 
+    state_independent = True
+
     def __init__(self, InputContainer, times, values):
         self.InputContainer = InputContainer
 
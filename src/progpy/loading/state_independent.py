@@ -0,0 +1,38 @@
+# Copyright © 2021 United States Government as represented by the
+# National Aeronautics and Space Administration.  All Rights Reserved.
+
+from collections.abc import Callable
+
+
+def state_independent(fcn: Callable) -> Callable:
+    """
+    .. versionadded:: 1.8.0
+
+    Declare that a future loading function does not depend on state (x), i.e., it returns the same load for the same time (t) for every sample. Predictors then evaluate the load once for each time and share it between all samples (e.g., :py:class:`progpy.predictors.MonteCarlo`), instead of once for each sample and time.
+
+    Loads with random noise (e.g., :py:class:`GaussianNoiseWrapper`) should not be declared state independent, since every sample would then share the same noise.
+
+    Piecewise and MovingAverage loads are state independent by default.
+
+    Args:
+        fcn (Callable): Future loading function of (t, x=None) -> u
+
+    Returns:
+        Callable: fcn, marked as state independent (or a wrapper around fcn, if it cannot be marked, e.g., a bound method)
+
+    Example:
+        >>> from progpy.loading import state_independent
+        >>> m = SomeModel()
+        >>> future_load = state_independent(lambda t, x=None: m.InputContainer({'i': 2 if t < 100 else 3}))
+        >>> mc.predict(x0, future_load)
+    """
+    try:
+        fcn.state_independent = True
+    except AttributeError:
+
+        def wrapped(t, x=None):
+            return fcn(t, x)
+
+        wrapped.state_independent = True
+        return wrapped
+    return fcn
@@ -4,6 +4,7 @@
 import numpy as np
 
 from progpy import PrognosticsModel, CompositeModel
+from progpy.utils.containers import _as_container
 
 DIVIDER = "."
 
@@ -22,6 +23,8 @@ class MixtureOfExpertsModel(CompositeModel):
 
     When calling output, event_state, threshold_met, or performance_metrics, only the model with the best score will be called, and those results returned. In case of a tie, the first model (in the order provided by the constructor) of the tied models will be used. If not every outputs, event, or performance metric has been identified, the next best model will be used to fill in the blanks, and so on.
 
+    The MoE model is vectorized (i.e., is_vectorized is True) if every model is vectorized. For states with multiple columns (e.g., particles), scores are updated and the best model is selected separately for each column.
+
     Args:
         models (list[PrognosticsModel]): List of at least 2 models that form the ensemble
 
@@ -48,6 +51,9 @@ class MixtureOfExpertsModel(CompositeModel):
 
     default_parameters = {"max_score_step": 0.01}
 
+    # Compiled when first used (see __compile)
+    __compiled = None
+
     def __init__(self, models: list, **kwargs):
         # Run initializer in CompositeModel
         # Note: Input validation is done there
@@ -107,72 +113,162 @@ class MixtureOfExpertsModel(CompositeModel):
             x_0[name + DIVIDER + "_score"] = 0.5  # Initialize to half
         return self.StateContainer(x_0)
 
-    def next_state(self, x, u, dt):
-        # Update state
-        for name, m in self.parameters["models"]:
-            # Prepare inputs
-            u_i = {key: u.get(key, None) for key in m.inputs}
-            u_i = m.InputContainer(u_i)
+    def __compile(self) -> tuple:
+        """
+        Compile the rows of each model's states and inputs in the state and input containers, the rows of the score and measured outputs, and the models providing each output, event, and performance metric. Compiled again when the containers are recreated
+
+        Returns:
+            tuple: (StateContainer, model rows, score rows, output rows, outputs provided by each model and their number, candidate models for each key)
+        """
+        x_index = self.StateContainer._shared_index
+        u_index = self.InputContainer._shared_index
+        output_index = {key: i for i, key in enumerate(self.outputs)}
+
+        def rows(indices) -> np.ndarray:
+            return np.array(list(indices), dtype=np.intp)
+
+        models = []
+        provided = np.zeros((len(self.parameters["models"]), len(self.outputs)))
+        for i, (name, m) in enumerate(self.parameters["models"]):
+            positions = rows(
+                output_index[key] for key in m.OutputContainer._shared_keys
+            )
+            provided[i, positions] = 1
+            models.append(
+                (
+                    rows(
+                        x_index[name + DIVIDER + key]
+                        for key in m.StateContainer._shared_keys
+                    ),
+                    rows(u_index[key] for key in m.InputContainer._shared_keys),
+                    positions,
+                )
+            )
+        score_rows = rows(
+            x_index[name + DIVIDER + "_score"] for name, _ in self.parameters["models"]
+        )
 
-            # Prepare state
-            x_i = m.StateContainer({key: x[name + "." + key] for key in m.states})
+        def candidates(attr: str) -> dict:
+            # Models (indices) with each key, in the order provided to the constructor
+            return {
+                key: rows(
+                    i
+                    for i, (_, m) in enumerate(self.parameters["models"])
+                    if key in getattr(m, attr)
+                )
+                for key in getattr(self, attr)
+            }
+
+        self.__compiled = (
+            self.StateContainer,
+            models,
+            score_rows,
+            rows(u_index[key] for key in self.outputs),
+            provided[:, :, np.newaxis],
+            provided.sum(axis=1)[:, np.newaxis],
+            {
+                "outputs": candidates("outputs"),
+                "events": candidates("events"),
+                "performance_metric_keys": candidates("performance_metric_keys"),
+            },
+        )
+        return self.__compiled
 
-            # Propagate state
-            x_next_i = m.next_state(x_i, u_i, dt)
+    def __wiring(self) -> tuple:
+        compiled = self.__compiled
+        if compiled is None or compiled[0] is not self.StateContainer:
+            compiled = self.__compile()
+        return compiled[1:]
 
-            # Save to super state
-            for key, value in x_next_i.items():
-                x[name + "." + key] = value
-
-        # If z is present and not none - update score
-        if (
-            len(set(self.outputs) - set(u.keys())) == 0  # Not missing an output
-            and not np.any(np.isnan([u[key] for key in self.outputs]))
-        ):  # Not case where Output is NaN
-            # If none in not u, that means that we have an updated output, so update the scores
-            # u excluded when there is not update
-            mses = []
-            # calculate mse on predicted output
-            for name, m in self.parameters["models"]:
-                gt = [u[z_key] for z_key in m.outputs]
-                x_i = m.StateContainer({key: x[name + "." + key] for key in m.states})
-                pred = [m.output(x_i)[z_key] for z_key in m.outputs]
-                mses.append(np.square(np.subtract(gt, pred)).mean())
-
-            min_mse = min(mses)
-            max_mse = max(mses)
-            diff_mse = max_mse - min_mse
-
-            # Score delta: +self.parameters['max_score_step'] for best, -self.parameters['max_score_step'] for worse
-            score_delta = [
-                (min_mse - mse) / diff_mse * (2 * self.parameters["max_score_step"])
-                + self.parameters["max_score_step"]
-                for mse in mses
-            ]
-            for i, (key, _) in enumerate(self.parameters["models"]):
-                score_key = key + DIVIDER + "_score"
-                x[score_key] += score_delta[i]
-
-                # Apply lower limit
-                x[score_key] = np.maximum(x[score_key], 0)
-                # Note: lower limit saturation is acceptable
-
-                # Apply upper limit
-                if x[score_key] > 1:
-                    x[score_key] -= score_delta[i]  # undo application
-                    # scale all to be <0.8
-                    # This is needed to prevent one outlier bad model
-                    # From causing the other models to become saturated at 1
-                    for j, (key_i, _) in enumerate(self.parameters["models"]):
-                        score_key_i = key_i + DIVIDER + "_score"
-                        x[score_key_i] *= 0.8
-                        # Also scale the score deltas
-                        score_delta[j] *= 0.8
-
-                    x[score_key] += score_delta[i]  # Redo application
+    def next_state(self, x, u, dt):
+        models, score_rows, output_rows, provided, n_provided, _ = self.__wiring()
+        x = _as_container(self.StateContainer, x)
+        x_matrix = x.matrix
+        u_matrix = _as_container(self.InputContainer, u).matrix
+
+        # Update state
+        xs_next = []
+        for (_, m), (state_rows, input_rows, _) in zip(
+            self.parameters["models"], models
+        ):
+            x_next_i = _as_container(
+                m.StateContainer,
+                m.next_state(
+                    m.StateContainer.from_matrix(x_matrix[state_rows]),
+                    m.InputContainer.from_matrix(u_matrix[input_rows]),
+                    dt,
+                ),
+            )
+            xs_next.append(x_next_i)
 
+            # Save to super state
+            x_matrix[state_rows] = x_next_i.matrix
+
+        # If z is present and not NaN (for a column) - update score (for that column)
+        # u excluded when there is not update
+        z = u_matrix[output_rows]
+        updated = ~np.isnan(z).any(axis=0)
+        if not updated.any():
+            return x
+
+        # Predicted outputs of every model, stacked (models x outputs x columns)
+        predicted = np.zeros(
+            (len(models), len(output_rows), max(x_matrix.shape[1], z.shape[1]))
+        )
+        for i, ((_, m), (_, _, positions), x_next_i) in enumerate(
+            zip(self.parameters["models"], models, xs_next)
+        ):
+            predicted[i, positions] = _as_container(
+                m.OutputContainer, m.output(x_next_i)
+            ).matrix
+
+        # mse of each model on the outputs it provides
+        mses = (np.square(predicted - z) * provided).sum(axis=1) / n_provided
+
+        min_mse = mses.min(axis=0)
+        max_mse = mses.max(axis=0)
+        diff_mse = max_mse - min_mse
+
+        # Score delta: +self.parameters['max_score_step'] for best, -self.parameters['max_score_step'] for worse
+        score_delta = (min_mse - mses) / diff_mse * (
+            2 * self.parameters["max_score_step"]
+        ) + self.parameters["max_score_step"]
+        if not updated.all():
+            score_delta = np.where(updated, score_delta, 0)
+        scores = x_matrix[score_rows]
+
+        # Apply lower limit
+        # Note: lower limit saturation is acceptable
+        new_scores = np.maximum(scores + score_delta, 0)
+        if not (new_scores > 1).any():
+            x_matrix[score_rows] = new_scores
+            return x
+
+        # Apply upper limit - model by model, since saturation scales every score
+        score_delta = score_delta * np.ones_like(scores)
+        for i in range(len(score_rows)):
+            scores[i] += score_delta[i]
+            scores[i] = np.maximum(scores[i], 0)
+            saturated = scores[i] > 1
+            if saturated.any():
+                scores[i, saturated] -= score_delta[i, saturated]  # undo application
+                # scale all to be <0.8
+                # This is needed to prevent one outlier bad model
+                # From causing the other models to become saturated at 1
+                scores[:, saturated] *= 0.8
+                # Also scale the score deltas
+                score_delta[:, saturated] *= 0.8
+
+                scores[i, saturated] += score_delta[i, saturated]  # Redo application
+
+        x_matrix[score_rows] = scores
         return x
 
+    def __best_indices(self, x_matrix: np.ndarray, indices: np.ndarray) -> np.ndarray:
+        # Index of the model with the highest score (of the models at indices) for each column. Ties go to the first model
+        _, score_rows, _, _, _, _ = self.__wiring()
+        return indices[np.argmax(x_matrix[score_rows[indices]], axis=0)]
+
     def best_model(self, x, _excepting=[]):
         """
         Get the best-performing model according to the scores
@@ -181,121 +277,99 @@ class MixtureOfExpertsModel(CompositeModel):
             x (StateContainer): System state
 
         Returns:
-            tuple[str, PrognosticsModel]: The name and model for the model with the highest score. If two models are tied, the first one will be returned in the order they were passed to the constructor.
+            tuple[str, PrognosticsModel] or list[tuple[str, PrognosticsModel]]: The name and model for the model with the highest score. If two models are tied, the first one will be returned in the order they were passed to the constructor. For states with multiple columns, a list of the best model for each column.
         """
-        # Identify best model
-        best_value: float = -1
-        for i, (key, _) in enumerate(self.parameters["models"]):
-            if key in _excepting:
-                continue  # Skip excepting
-            score_key = key + DIVIDER + "_score"
-            if x[score_key] > best_value:
-                best_value = x[score_key]
-                best_index = i
-        return self.parameters["models"][best_index]
+        models = self.parameters["models"]
+        x_matrix = _as_container(self.StateContainer, x).matrix
+        indices = np.array(
+            [i for i, (key, _) in enumerate(models) if key not in _excepting],
+            dtype=np.intp,
+        )
+        best = self.__best_indices(x_matrix, indices)
+        if len(best) == 1:
+            return models[best[0]]
+        return [models[i] for i in best]
 
-    def output(self, x):
-        excepting = []
-        outputs_seen = set()
-        z = {}
-        while outputs_seen != set(self.outputs):
-            # Not all outputs have been calculated
-            name, m = self.best_model(x, _excepting=excepting)
-            excepting.append(name)
+    def __selection(self, x_matrix: np.ndarray, attr: str) -> tuple:
+        """
+        Get the best model for each key and column, and the columns for which each of those models is needed. Selected for each call (not kept on the model), so it is safe when the model is used from multiple threads
 
-            new_outputs = set(m.outputs) - outputs_seen
-            if len(new_outputs) > 0:
-                # Has an output that hasn't been seen
+        Args:
+            x_matrix (np.ndarray): System state
+            attr (str): Attribute with the keys (e.g., 'outputs')
 
-                # Prepare state
-                x_i = m.StateContainer({key: x[name + "." + key] for key in m.states})
-                z_i = m.output(x_i)
+        Returns:
+            tuple[dict[str, np.ndarray], dict[int, np.ndarray]]: Best model (index) for each key and column, and the columns needed from each best model
+        """
+        _, score_rows, _, _, _, candidates = self.__wiring()
+        scores = x_matrix[score_rows]
+        best = {
+            key: indices[np.argmax(scores[indices], axis=0)]
+            for key, indices in candidates[attr].items()
+        }
+        if scores.shape[1] == 1:
+            columns = {b[0]: None for b in best.values()}
+        else:
+            stacked = np.array(list(best.values()))
+            columns = {
+                i: np.flatnonzero((stacked == i).any(axis=0))
+                for i in np.flatnonzero(np.bincount(stacked.ravel()))
+            }
+        return best, columns
+
+    def __select(self, x, attr: str, method: str) -> dict:
+        """
+        Get the value of each key (outputs, events, or performance metrics) from the model with the best score that has that key, for each column of the state. Each best model is only evaluated once, for the columns where it is best for any key
 
-                # Merge in new outputs
-                for key in new_outputs:
-                    z[key] = z_i[key]
+        Args:
+            x (StateContainer): System state
+            attr (str): Attribute with the keys (e.g., 'outputs')
+            method (str): Model method calculating the values (e.g., 'output')
 
-                # Add new outputs
-                outputs_seen |= new_outputs
+        Returns:
+            dict: Value for each key
+        """
+        models = self.__wiring()[0]
+        x_matrix = _as_container(self.StateContainer, x).matrix
+        best, columns = self.__selection(x_matrix, attr)
+        n_cols = x_matrix.shape[1]
+
+        results = {}
+        for i, cols in columns.items():
+            m = self.parameters["models"][i][1]
+            x_i = x_matrix[models[i][0]]
+            if cols is not None and len(cols) < n_cols:
+                x_i = x_i[:, cols]
+            results[i] = getattr(m, method)(m.StateContainer.from_matrix(x_i))
+
+        if n_cols == 1:
+            return {key: results[best_i[0]][key] for key, best_i in best.items()}
+
+        values = {}
+        for key, best_i in best.items():
+            value = None
+            for i in np.flatnonzero(np.bincount(best_i)):
+                cols = columns[i]
+                value_i = np.broadcast_to(results[i][key], (len(cols),))
+                if value is None:
+                    value = np.empty(n_cols, dtype=value_i.dtype)
+                if len(cols) == n_cols:
+                    mask = best_i == i
+                    value[mask] = value_i[mask]
+                else:
+                    selected_cols = np.flatnonzero(best_i == i)
+                    value[selected_cols] = value_i[np.searchsorted(cols, selected_cols)]
+            values[key] = value
+        return values
 
-        return self.OutputContainer(z)
+    def output(self, x):
+        return self.OutputContainer(self.__select(x, "outputs", "output"))
 
     def event_state(self, x):
-        excepting = []
-        events_seen = set()
-        es = {}
-        while events_seen != set(self.events):
-            # Not all outputs have been calculated
-            name, m = self.best_model(x, _excepting=excepting)
-            excepting.append(name)
-
-            new_events = set(m.events) - events_seen
-            if len(new_events) > 0:
-                # Has an event that hasn't been seen
-
-                # Prepare state
-                x_i = m.StateContainer({key: x[name + "." + key] for key in m.states})
-                es_i = m.event_state(x_i)
-
-                # Merge in new events
-                for key in new_events:
-                    es[key] = es_i[key]
-
-                # Add new events
-                events_seen |= new_events
-
-        return es
+        return self.__select(x, "events", "event_state")
 
     def threshold_met(self, x):
-        excepting = []
-        events_seen = set()
-        tm = {}
-        while events_seen != set(self.events):
-            # Not all outputs have been calculated
-            name, m = self.best_model(x, _excepting=excepting)
-            excepting.append(name)
-
-            new_events = set(m.events) - events_seen
-            if len(new_events) > 0:
-                # Has an event that hasn't been seen
-
-                # Prepare state
-                x_i = m.StateContainer({key: x[name + "." + key] for key in m.states})
-                tm_i = m.threshold_met(x_i)
-
-                # Merge in new events
-                for key in new_events:
-                    tm[key] = tm_i[key]
-
-                # Add new events
-                events_seen |= new_events
-
-        return tm
+        return self.__select(x, "events", "threshold_met")
 
     def performance_metrics(self, x):
-        excepting = []
-        performance_metrics_seen = set()
-        pm = {}
-        while performance_metrics_seen != set(self.performance_metric_keys):
-            # Not all outputs have been calculated
-            name, m = self.best_model(x, _excepting=excepting)
-            excepting.append(name)
-
-            new_performance_metrics = (
-                set(m.performance_metric_keys) - performance_metrics_seen
-            )
-            if len(new_performance_metrics) > 0:
-                # Has an performance metrics that hasn't been seen
-
-                # Prepare state
-                x_i = m.StateContainer({key: x[name + "." + key] for key in m.states})
-                pm_i = m.performance_metrics(x_i)
-
-                # Merge in new events
-                for key in new_performance_metrics:
-                    pm[key] = pm_i[key]
-
-                # Add new events
-                performance_metrics_seen |= new_performance_metrics
-
-        return pm
+        return self.__select(x, "performance_metric_keys", "performance_metrics")
@@ -1,10 +1,14 @@
 # Copyright © 2021 United States Government as represented by the Administrator of the National Aeronautics and Space Administration.  All Rights Reserved.
 
 from collections import abc
+from concurrent.futures import ProcessPoolExecutor
 from copy import deepcopy
+import numpy as np
+import pickle
 from typing import Callable
 from progpy.sim_result import SimResult, LazySimResult
-from progpy.uncertain_data import UnweightedSamples, UncertainData
+from progpy.uncertain_data import UnweightedSamples, UncertainData, WeightedSamples
+from progpy.utils.profiling import Profiler, get_profiler
 
 from .prediction import UnweightedSamplesPrediction, PredictionResults
 from .predictor import Predictor
@@ -16,26 +20,78 @@ class MonteCarlo(Predictor):
 
     A Predictor using the monte carlo algorithm. The provided initial states are simulated until either a specified time horizon is met, or the threshold for all simulated events is reached for all samples. A provided future loading equation is used to compute the inputs to the system at any given time point.
 
+    For vectorized models (i.e., model.is_vectorized is True) with a load that does not depend on state (no future_loading_eqn, or see :py:func:`progpy.loading.state_independent`), all samples are simulated together, as a single state with a column for each sample (see :py:meth:`progpy.PrognosticsModel.simulate_batch_to_threshold`). Other models and loads (which are called with the state of a single sample), and options only supported by :py:meth:`progpy.PrognosticsModel.simulate_to_threshold` (e.g., integration_method, event_localization, or adaptive or ivp dt), simulate each sample separately.
+
     The following configuration parameters are supported (as kwargs in constructor or as parameters in predict method):
 
     Configuration Parameters
     ------------------------------
     n_samples : int, optional
-        Default number of samples to use. If not specified, a default value is used. If state is type UnweightedSamples and n_samples is not provided, the provided unweighted samples will be used directly.
+        Default number of samples to use. If not specified, a default value is used. If state is type UnweightedSamples and n_samples is not provided, the provided unweighted samples will be used directly. If state is type WeightedSamples and n_samples is not provided, the same number of samples is drawn according to their weights.
     save_freq : float, optional
         Default frequency at which results are saved (s).
+    n_workers : int, optional
+        Number of worker processes used to simulate samples in parallel. The process pool is created on first use and reused for later predictions. Default is None (samples are simulated serially in the current process)
+    executor : concurrent.futures.Executor, optional
+        Executor used to simulate samples in parallel, instead of the pool created for n_workers. n_workers must also be given (the number of workers of the executor), and is used to split samples into chunks. The model and future_loading_eqn must be picklable (e.g., defined at module level) when using n_workers or a process-based executor
+    store_trajectories : bool, optional
+        If the inputs, states, outputs, and event states of each sample are kept (default: True). If False, only time_of_event (and time_of_event.final_state) are calculated, saving the memory and time used to store every trajectory
+    convergence : str, optional
+        Stopping rule for sequential Monte Carlo. If set, samples are simulated in batches of batch_size until the time of event estimate has converged, or n_samples samples have been simulated. One of:\n
+        * *sem*: Standard error of the mean time of event is within convergence_tol of the mean, for every event\n
+        * *quantile*: Quantiles (convergence_quantiles) of the time of event changed by less than convergence_tol (relative) with the last batch, for every event\n
+        Default is None (all n_samples samples are simulated)
+    convergence_tol : float, optional
+        Relative tolerance for convergence (default: 0.01)
+    convergence_quantiles : list[float], optional
+        Quantiles checked for convergence 'quantile' (default: (0.05, 0.5, 0.95))
+    convergence_min_samples : int, optional
+        Minimum number of samples that must reach each event before convergence is checked (default: 10). If fewer samples reach an event, sampling continues (up to n_samples)
+    batch_size : int, optional
+        Number of samples simulated between convergence checks (default: 100)
+    sample_method : str, optional
+        Method used to sample the initial state: 'random' (default), 'sobol', 'halton', or 'lhs'. Quasi-Monte Carlo ('sobol', 'halton') and Latin hypercube ('lhs') samples reach the same time of event accuracy with fewer samples. See :py:meth:`progpy.uncertain_data.UncertainData.sample`
     """
 
     __DEFAULT_N_SAMPLES = (
         100  # Default number of samples to use, if none specified and not UncertainData
     )
 
+    # Parameters supported by simulate_batch_to_threshold (and parameters of MonteCarlo)
+    __BATCH_PARAMETERS = (
+        "n_samples",
+        "constant_noise",
+        "print",
+        "progress",
+        "profile",
+        "t0",
+        "dt",
+        "save_freq",
+        "save_pts",
+        "eval_pts",
+        "horizon",
+    )
+
     default_parameters = {
         "n_samples": None,
         "event_strategy": "all",
         "constant_noise": False,
+        "n_workers": None,
+        "executor": None,
+        "store_trajectories": True,
+        "convergence": None,
+        "convergence_tol": 0.01,
+        "convergence_quantiles": (0.05, 0.5, 0.95),
+        "convergence_min_samples": 10,
+        "batch_size": 100,
+        "sample_method": "random",
     }
 
+    def __init__(self, model, **kwargs):
+        super().__init__(model, **kwargs)
+        self._pool = None
+        self._pool_workers = None  # Number of workers of the pool
+
     def predict(
         self,
         state: UncertainData,
@@ -51,7 +107,7 @@ class MonteCarlo(Predictor):
         state : UncertainData
             Distribution representing current state of the system
         future_loading_eqn : function (t, x=None) -> z, optional
-            Function to generate an estimate of loading at future time t, and state x
+            Function to generate an estimate of loading at future time t, and state x. If the load is state independent (e.g., Piecewise, or see :py:func:`progpy.loading.state_independent`), it is evaluated once for each time and shared by all samples
 
         Keyword Arguments
         ------------------
@@ -68,13 +124,33 @@ class MonteCarlo(Predictor):
         horizon : float, optional
             Prediction horizon (s)
         n_samples : int, optional
-            Number of samples to use. If not specified, a default value is used. If state is type UnweightedSamples and n_samples is not provided, the provided unweighted samples will be used directly.
+            Number of samples to use. If not specified, a default value is used. If state is type UnweightedSamples and n_samples is not provided, the provided unweighted samples will be used directly. If state is type WeightedSamples and n_samples is not provided, the same number of samples is drawn according to their weights.
         save_freq : float, optional
             Frequency at which results are saved (s)
         save_pts : list[float], optional
             Any additional savepoints (s) e.g., [10.1, 22.5]
         constant_noise : bool, optional
             If the same noise should be applied every step. Default: False
+        n_workers : int, optional
+            Number of worker processes used to simulate samples in parallel. When run in parallel, each sample is simulated with its own random seed, drawn from numpy's global random state, so results are repeatable and do not depend on the number of workers. Default: None (serial)
+        executor : concurrent.futures.Executor, optional
+            Executor used to simulate samples in parallel, instead of the pool created for n_workers. Requires n_workers, the number of workers of the executor
+        store_trajectories : bool, optional
+            If the trajectory of each sample is kept. If False, times, inputs, states, outputs, and event_states of the result are empty, and only time_of_event is calculated. Default: True
+        convergence : str, optional
+            Stopping rule for sequential Monte Carlo ('sem' or 'quantile'), where n_samples is the maximum number of samples. See class documentation. Default: None
+        convergence_tol : float, optional
+            Relative tolerance for convergence. Default: 0.01
+        convergence_quantiles : list[float], optional
+            Quantiles checked for convergence 'quantile'. Default: (0.05, 0.5, 0.95)
+        convergence_min_samples : int, optional
+            Minimum number of samples that must reach each event before convergence is checked. Default: 10
+        batch_size : int, optional
+            Number of samples simulated between convergence checks. Default: 100
+        sample_method : str, optional
+            Method used to sample the initial state ('random', 'sobol', 'halton', or 'lhs'). Only used when state is sampled (see n_samples). Default: 'random'
+        profile : bool or Profiler, optional
+            Record the time and number of calls of each phase of the prediction (sampling, and each phase of simulation - see :py:meth:`progpy.PrognosticsModel.simulate_to_threshold`), summed over all samples. Returned as the profile attribute of the result. Default: False
 
         Return
         ----------
@@ -85,6 +161,9 @@ class MonteCarlo(Predictor):
             * outputs (Prediction): Outputs at each savepoint such that outputs.snapshot(i) is the output distribution (type UncertainData) at times[i]
             * event_states (Prediction): Event states at each savepoint such that event_states.snapshot(i) is the event state distribution (type UncertainData) at times[i]
             * time_of_event (UncertainData): Distribution of predicted Time of Event (ToE) for each predicted event, represented by some subclass of UncertaintData (e.g., MultivariateNormalDist)
+            * profile (Profiler): Attribute (not part of the tuple). Time spent in each phase, when profile is set
+            * n_samples (int): Attribute (not part of the tuple). Number of samples simulated
+            * converged (bool): Attribute (not part of the tuple). If the time of event converged, when convergence is set (None otherwise)
         """
         if isinstance(state, dict) or isinstance(state, self.model.StateContainer):
             from progpy.uncertain_data import ScalarData
@@ -96,16 +175,58 @@ class MonteCarlo(Predictor):
             raise TypeError("state must be UncertainData, dict, or StateContainer")
 
         if future_loading_eqn is None:
-            future_loading_eqn = lambda t, x=None: self.model.InputContainer({})
+            future_loading_eqn = _no_load
 
-        params = deepcopy(self.parameters)  # copy parameters
+        params = deepcopy(
+            {key: value for key, value in self.parameters.items() if key != "executor"}
+        )  # copy parameters (executor cannot be copied)
         params.update(kwargs)  # update for specific run
+        executor = params.pop("executor", self.parameters["executor"])
+        n_workers = params.pop("n_workers")
+        store_trajectories = params.pop("store_trajectories")
+        convergence = params.pop("convergence")
+        convergence_tol = params.pop("convergence_tol")
+        convergence_quantiles = params.pop("convergence_quantiles")
+        convergence_min_samples = params.pop("convergence_min_samples")
+        batch_size = params.pop("batch_size")
+        sample_method = params.pop("sample_method")
+        if convergence not in (None, "sem", "quantile"):
+            raise ValueError(
+                f"convergence must be 'sem', 'quantile', or None, was {convergence}"
+            )
+        if convergence is not None and (
+            not isinstance(batch_size, int) or batch_size < 2
+        ):
+            raise ValueError(
+                f"batch_size must be an integer greater than 1, was {batch_size}"
+            )
+        if not isinstance(convergence_min_samples, int) or convergence_min_samples < 2:
+            raise ValueError(
+                f"convergence_min_samples must be an integer greater than 1, was {convergence_min_samples}"
+            )
+        if n_workers is not None and (not isinstance(n_workers, int) or n_workers < 1):
+            raise ValueError(f"n_workers must be a positive integer, was {n_workers}")
+        if executor is not None and n_workers is None:
+            raise ValueError(
+                "n_workers (the number of workers of executor) is required with executor"
+            )
         params["print"] = False
         params["progress"] = False
         # Remove event_strategy from params to not confuse simulate_to method call
         event_strategy = params.pop("event_strategy")
-
-        if not isinstance(state, UnweightedSamples) and params["n_samples"] is None:
+        if event_strategy not in ("first", "any", "all"):
+            raise ValueError(
+                f"Invalid value for `event_strategy`: {event_strategy}. Should be either 'all' or 'first'"
+            )
+        profiler = get_profiler(params.get("profile", False))
+        if profiler is not None:
+            # Shared by all simulations
+            params["profile"] = profiler
+
+        if isinstance(state, WeightedSamples) and params["n_samples"] is None:
+            # Resampled by weight, keeping the number of samples
+            params["n_samples"] = len(state)
+        elif not isinstance(state, UnweightedSamples) and params["n_samples"] is None:
             # if not unweighted samples, some sample number is required, so set to default.
             params["n_samples"] = MonteCarlo.__DEFAULT_N_SAMPLES
         elif isinstance(state, UnweightedSamples) and params["n_samples"] is None:
@@ -144,6 +265,11 @@ class MonteCarlo(Predictor):
             # Remove it so it's not passed to simulate_to*
             del params["events"]
 
+        if not store_trajectories:
+            # Only the first and last state of each simulation is saved (needed to find the event)
+            params["save_freq"] = float("inf")
+            params["save_pts"] = []
+
         # Sample from state if n_samples specified or state is not UnweightedSamples (Case 2)
         # Or if is Unweighted samples, but there are the wrong number of samples (Case 1)
         if (
@@ -153,19 +279,163 @@ class MonteCarlo(Predictor):
             )  # Case 1
             or not isinstance(state, UnweightedSamples)
         ):  # Case 2
-            state = state.sample(params["n_samples"])
+            # Custom UncertainData classes might not support method, so only passed when needed
+            sample_kwargs = (
+                {} if sample_method == "random" else {"method": sample_method}
+            )
+            if profiler is not None:
+                with profiler.phase("sample"):
+                    state = state.sample(params["n_samples"], **sample_kwargs)
+            else:
+                state = state.sample(params["n_samples"], **sample_kwargs)
 
-        es_eqn = self.model.event_state
-        tm_eqn = self.model.threshold_met
-        simulate_to_threshold = self.model.simulate_to_threshold
+        if getattr(future_loading_eqn, "state_independent", False):
+            # Evaluated once for each time and shared by all samples simulated separately
+            shared_load = _SharedLoad(future_loading_eqn, self.model)
+        else:
+            shared_load = future_loading_eqn
+
+        def simulate(samples):
+            if n_workers is None and self._can_predict_batch(
+                future_loading_eqn, params
+            ):
+                # Vectorized prediction - all samples are simulated together
+                return self._predict_batch(
+                    samples, future_loading_eqn, events, event_strategy, params
+                )
+            if n_workers is None:
+                # Perform prediction
+                return [
+                    self._predict_sample(x, shared_load, events, event_strategy, params)
+                    for x in samples
+                ]
+            return self._predict_parallel(
+                samples,
+                shared_load,
+                events,
+                event_strategy,
+                params,
+                executor or self._get_pool(n_workers),
+                n_workers,
+            )
+
+        converged = None
+        if convergence is None:
+            results = simulate(state)
+        else:
+            # Sequential Monte Carlo - simulate batches of samples until the time of event converges
+            results = []
+            previous = None
+            for start in range(0, len(state), batch_size):
+                end = min(start + batch_size, len(state))
+                results.extend(simulate([state[i] for i in range(start, end)]))
+                converged, previous = self._check_convergence(
+                    [result[5] for result in results],
+                    events,
+                    convergence,
+                    convergence_tol,
+                    convergence_quantiles,
+                    convergence_min_samples,
+                    previous,
+                )
+                if converged:
+                    break
 
-        time_of_event_all = []
-        last_states = []
         times_all = []
-        inputs_all = []
-        states_all = []
-        outputs_all = []
-        event_states_all = []
+        if store_trajectories:
+            for times, *_ in results:
+                if len(times) > len(times_all):  # Keep longest
+                    times_all = times
+            inputs_all = UnweightedSamplesPrediction(
+                times_all, [result[1] for result in results]
+            )
+            states_all = UnweightedSamplesPrediction(
+                times_all, [result[2] for result in results]
+            )
+            outputs_all = UnweightedSamplesPrediction(
+                times_all, [result[3] for result in results]
+            )
+            event_states_all = UnweightedSamplesPrediction(
+                times_all, [result[4] for result in results]
+            )
+        else:
+            inputs_all = UnweightedSamplesPrediction(times_all, [])
+            states_all = UnweightedSamplesPrediction(times_all, [])
+            outputs_all = UnweightedSamplesPrediction(times_all, [])
+            event_states_all = UnweightedSamplesPrediction(times_all, [])
+        time_of_event = UnweightedSamples([result[5] for result in results])
+        last_states = [result[6] for result in results]
+
+        # Transform final states:
+        time_of_event.final_state = {
+            key: UnweightedSamples(
+                [sample[key] for sample in last_states], _type=self.model.StateContainer
+            )
+            for key in time_of_event.keys()
+        }
+
+        result = PredictionResults(
+            times_all,
+            inputs_all,
+            states_all,
+            outputs_all,
+            event_states_all,
+            time_of_event,
+        )
+        result.profile = profiler
+        result.n_samples = len(results)
+        result.converged = converged
+        return result
+
+    @staticmethod
+    def _check_convergence(
+        time_of_event, events, method, tol, quantiles, min_samples, previous
+    ):
+        """
+        Check if the time of event estimate has converged, for sequential Monte Carlo. Not converged until at least min_samples samples have reached each event
+
+        Returns
+        -------
+        tuple[bool, dict]
+            If converged, and the quantiles of each event (compared to the next batch, for method 'quantile')
+        """
+        toe = {event: [] for event in events}
+        for sample in time_of_event:
+            for key, value in sample.items():
+                if value is not None and key in toe:
+                    toe[key].append(value)
+        if not toe or any(len(values) < min_samples for values in toe.values()):
+            return False, None
+
+        if method == "sem":
+            converged = all(
+                np.std(values, ddof=1) / np.sqrt(len(values))
+                <= tol * abs(np.mean(values))
+                for values in toe.values()
+            )
+            return converged, None
+
+        # Quantiles are stable between batches
+        current = {key: np.quantile(values, quantiles) for key, values in toe.items()}
+        converged = previous is not None and all(
+            key in previous and np.all(np.abs(q - previous[key]) <= tol * np.abs(q))
+            for key, q in current.items()
+        )
+        return converged, current
+
+    def _predict_sample(self, x, future_loading_eqn, events, event_strategy, params):
+        """
+        Predict a single sample
+
+        Returns
+        -------
+        tuple
+            (times, inputs, states, outputs, event_states, time_of_event, last_state) for the sample
+        """
+        params = params.copy()  # Changed for each sample
+        output = self.model.output
+        if params.get("profile"):
+            output = params["profile"].wrap("output", output)
 
         if params["constant_noise"]:
             # Save loads
@@ -174,137 +444,345 @@ class MonteCarlo(Predictor):
                 "process_noise_dist", "normal"
             )
 
-        # Perform prediction
-        t0 = params.get("t0", 0)
-        HORIZON = params.get(
-            "horizon", float("inf")
-        )  # Save the horizon to be used later
-        for x in state:
-            if params["constant_noise"]:
-                # Calculate process noise
-                x_noise = self.model.apply_process_noise(x.copy(), 1)
-                x_noise = self.model.StateContainer(
-                    {key: x_noise[key] - x[key] for key in x.keys()}
-                )
+            # Calculate process noise
+            x_noise = self.model.apply_process_noise(x.copy(), 1)
+            x_noise = self.model.StateContainer(
+                {key: x_noise[key] - x[key] for key in x.keys()}
+            )
 
-                self.model["process_noise"] = x_noise
-                self.model["process_noise_dist"] = "constant"
+            self.model["process_noise"] = x_noise
+            self.model["process_noise_dist"] = "constant"
 
-            first_output = self.model.output(x)
+        first_output = output(x)
 
-            time_of_event = {}
-            last_state = {}
+        params["x"] = x
+        if isinstance(future_loading_eqn, _SharedLoad):
+            future_loading_eqn.start()
+        if "save_freq" in params and not isinstance(params["save_freq"], tuple):
+            params["save_freq"] = (params.get("t0", 0), params["save_freq"])
 
-            params["t0"] = t0
-            params["x"] = x
-            params["horizon"] = HORIZON  # reset to initial horizon
+        # Every event is recorded in a single simulation (see simulate_to_threshold)
+        simulation = self.model.simulate_to_threshold(
+            future_loading_eqn,
+            first_output,
+            events=events,
+            event_strategy=event_strategy,
+            **params,
+        )
+        if simulation.time_of_event is None:
+            # simulate_to_threshold is overridden without recording events, use the final state
+            t_met = self.model.threshold_met(simulation.states[-1])
+            simulation.time_of_event = {
+                event: simulation.times[-1] if t_met[event] else None
+                for event in events
+            }
+            simulation.state_at_event = {
+                event: simulation.states[-1].copy() if t_met[event] else None
+                for event in events
+            }
+        time_of_event, last_state = self._events_reached(
+            simulation, events, event_strategy
+        )
+        times, inputs, states, outputs, event_states = self._trajectory(
+            simulation, events, event_strategy
+        )
 
-            if "save_freq" in params and not isinstance(params["save_freq"], tuple):
-                params["save_freq"] = (params["t0"], params["save_freq"])
+        # Reset noise
+        if params["constant_noise"]:
+            self.model["process_noise"] = process_noise
+            self.model["process_noise_dist"] = process_noise_dist
+
+        return (
+            times,
+            inputs,
+            states,
+            outputs,
+            event_states,
+            time_of_event,
+            last_state,
+        )
 
-            if len(events) == 0:  # Predict to time
-                (times, inputs, states, outputs, event_states) = simulate_to_threshold(
-                    future_loading_eqn, first_output, events=[], **params
-                )
-            else:
-                events_remaining = events.copy()
-
-                times = []
-                inputs = SimResult(_copy=False)
-                states = SimResult(_copy=False)
-                outputs = LazySimResult(fcn=self.model.output, _copy=False)
-                event_states = LazySimResult(fcn=es_eqn, _copy=False)
-
-                # Non-vectorized prediction
-                while len(events_remaining) > 0:  # Still events to predict
-                    # Since horizon is relative to t0 (the simulation starting point),
-                    # we must subtract the difference in current t0 from the initial (i.e., prediction t0)
-                    # each subsequent simulation
-                    params["horizon"] = HORIZON - (params["t0"] - t0)
-                    (t, u, xi, z, es) = simulate_to_threshold(
-                        future_loading_eqn,
-                        first_output,
-                        events=events_remaining,
-                        **params,
-                    )
+    @staticmethod
+    def _events_reached(simulation, events, event_strategy):
+        """
+        Time of event and state at event for a simulation, from the events recorded during the simulation
 
-                    # Add results
-                    times.extend(t)
-                    inputs.extend(u)
-                    states.extend(xi)
-                    outputs.extend(z, _copy=False)
-                    event_states.extend(es, _copy=False)
-
-                    # Get which event occurs
-                    t_met = tm_eqn(states[-1])
-                    t_met = {
-                        key: t_met[key] for key in events_remaining
-                    }  # Only look at remaining keys
-
-                    try:
-                        event = list(t_met.keys())[list(t_met.values()).index(True)]
-                    except ValueError:
-                        # no event has occured - hit horizon
-                        for event in events_remaining:
-                            time_of_event[event] = None
-                            last_state[event] = None
-                        break
-
-                    # An event has occured
-                    time_of_event[event] = times[-1]
-                    if event_strategy == "all":
-                        events_remaining.remove(
-                            event
-                        )  # No longer an event to predict to
-                    elif event_strategy in ("first", "any"):
-                        events_remaining = []
-                    else:
-                        raise ValueError(
-                            f"Invalid value for `event_strategy`: {event_strategy}. Should be either 'all' or 'first'"
-                        )
-
-                    # Remove last state (event)
-                    params["t0"] = times.pop()
-                    inputs.pop()
-                    params["x"] = states.pop()
-                    last_state[event] = params["x"].copy()
-                    outputs.pop()
-                    event_states.pop()
-
-            # Add to "all" structures
-            if len(times) > len(times_all):  # Keep longest
-                times_all = times
-            inputs_all.append(inputs)
-            states_all.append(states)
-            outputs_all.append(outputs)
-            event_states_all.append(event_states)
-            time_of_event_all.append(time_of_event)
-            last_states.append(last_state)
-
-            # Reset noise
-            if params["constant_noise"]:
-                self.model["process_noise"] = process_noise
-                self.model["process_noise_dist"] = process_noise_dist
-
-        inputs_all = UnweightedSamplesPrediction(times_all, inputs_all)
-        states_all = UnweightedSamplesPrediction(times_all, states_all)
-        outputs_all = UnweightedSamplesPrediction(times_all, outputs_all)
-        event_states_all = UnweightedSamplesPrediction(times_all, event_states_all)
-        time_of_event = UnweightedSamples(time_of_event_all)
+        Returns
+        -------
+        tuple[dict, dict]
+            time_of_event and last_state for each event. For event_strategy 'first', only the first event reached (or every event, if none were reached)
+        """
+        if event_strategy == "all" or len(events) == 0:
+            return dict(simulation.time_of_event), dict(simulation.state_at_event)
+        reached = [
+            event for event in events if simulation.time_of_event[event] is not None
+        ]
+        if len(reached) > 0:
+            event = min(reached, key=lambda key: simulation.time_of_event[key])
+            reached = [event]
+        else:
+            reached = events
+        time_of_event = {event: simulation.time_of_event[event] for event in reached}
+        last_state = {event: simulation.state_at_event[event] for event in reached}
+        return time_of_event, last_state
 
-        # Transform final states:
-        time_of_event.final_state = {
-            key: UnweightedSamples(
-                [sample[key] for sample in last_states], _type=self.model.StateContainer
+    def _trajectory(self, simulation, events, event_strategy):
+        """
+        Trajectory of a sample. If the simulation ended because events were reached, the last point (i.e., where the event was reached) is not included - it is part of the result as time_of_event.final_state
+
+        Returns
+        -------
+        tuple
+            (times, inputs, states, outputs, event_states)
+        """
+        reached = [simulation.time_of_event[event] is not None for event in events]
+        ended_at_event = len(events) > 0 and (
+            all(reached) if event_strategy == "all" else any(reached)
+        )
+        if not ended_at_event or len(simulation.times) < 2:
+            return tuple(simulation)
+
+        times = simulation.times[:-1]
+        states = simulation.states
+        states.pop_by_index()
+        return (
+            times,
+            SimResult(times, simulation.inputs.data[:-1], _copy=False),
+            states,
+            LazySimResult(self.model.output, times, states, _copy=False),
+            LazySimResult(self.model.event_state, times, states, _copy=False),
+        )
+
+    def _can_predict_batch(self, future_loading_eqn, params: dict) -> bool:
+        """
+        If the prediction can be performed for all samples at once (see :py:meth:`progpy.PrognosticsModel.simulate_batch_to_threshold`). Requires a vectorized model, a load that does not depend on state (which would be called with the states of every sample), and no simulation options that are only supported by simulate_to_threshold
+        """
+        if (
+            not self.model.is_vectorized
+            or not getattr(future_loading_eqn, "state_independent", False)
+            or params["constant_noise"]
+        ):
+            return False
+        dt_mode = params.get("dt")
+        if isinstance(dt_mode, tuple):
+            dt_mode = dt_mode[0]
+        if isinstance(dt_mode, str) and dt_mode in ("adaptive", "ivp"):
+            return False
+        return all(
+            key in MonteCarlo.__BATCH_PARAMETERS or not value
+            for key, value in params.items()
+        )
+
+    def _predict_batch(self, state, future_loading_eqn, events, event_strategy, params):
+        """
+        Predict all samples together, for vectorized models
+
+        Returns
+        -------
+        list[tuple]
+            (times, inputs, states, outputs, event_states, time_of_event, last_state) for each sample
+        """
+        config = {
+            key: params[key]
+            for key in (
+                "t0",
+                "dt",
+                "save_freq",
+                "save_pts",
+                "eval_pts",
+                "horizon",
+                "profile",
             )
-            for key in time_of_event.keys()
+            if key in params
         }
+        if "save_freq" in config and not isinstance(config["save_freq"], tuple):
+            config["save_freq"] = (config.get("t0", 0), config["save_freq"])
+
+        simulations = self.model.simulate_batch_to_threshold(
+            list(state),
+            future_loading_eqn,
+            events=events,
+            event_strategy=event_strategy,
+            **config,
+        )
 
-        return PredictionResults(
-            times_all,
-            inputs_all,
-            states_all,
-            outputs_all,
-            event_states_all,
-            time_of_event,
+        results = []
+        for simulation in simulations:
+            time_of_event, last_state = self._events_reached(
+                simulation, events, event_strategy
+            )
+            results.append(
+                (
+                    *self._trajectory(simulation, events, event_strategy),
+                    time_of_event,
+                    last_state,
+                )
+            )
+        return results
+
+    def _get_pool(self, n_workers: int):
+        """
+        Get the process pool with n_workers workers. The pool is kept and reused for later predictions
+        """
+        if self._pool is None or self._pool_workers != n_workers:
+            if self._pool is not None:
+                self._pool.shutdown()
+            self._pool = ProcessPoolExecutor(max_workers=n_workers)
+            self._pool_workers = n_workers
+        return self._pool
+
+    def _predict_parallel(
+        self,
+        state,
+        future_loading_eqn,
+        events,
+        event_strategy,
+        params,
+        executor,
+        n_workers,
+    ):
+        """
+        Predict samples in chunks, using executor. Each sample is seeded from the global numpy random state, so results are repeatable and independent of the number of workers
+        """
+        profiler = params.get("profile")
+        params = params.copy()
+        params["profile"] = profiler is not None
+        # The model and loading are pickled once, and unpickled once per worker
+        try:
+            payload = pickle.dumps(
+                (self.model, future_loading_eqn, events, event_strategy, params)
+            )
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            raise TypeError(
+                "The model and future_loading_eqn must be picklable to predict in parallel (e.g., define future_loading_eqn at module level instead of as a lambda or local function)"
+            ) from e
+
+        samples = [x.matrix for x in state]
+        seeds = np.random.randint(2**32, size=len(samples), dtype=np.uint64)
+        # A few chunks per worker, to balance the load
+        n_chunks = min(len(samples), 4 * n_workers)
+        bounds = np.linspace(0, len(samples), n_chunks + 1).astype(int)
+        futures = [
+            executor.submit(
+                _predict_chunk,
+                payload,
+                samples[start:end],
+                seeds[start:end],
+            )
+            for start, end in zip(bounds[:-1], bounds[1:])
+        ]
+
+        StateContainer = self.model.StateContainer
+        InputContainer = self.model.InputContainer
+        results = []
+        for future in futures:
+            chunk_results, chunk_profile = future.result()
+            if profiler is not None:
+                profiler.merge(chunk_profile)
+            for times, inputs, states, time_of_event, last_state in chunk_results:
+                states = SimResult(
+                    times, [StateContainer(x) for x in states], _copy=False
+                )
+                results.append(
+                    (
+                        times,
+                        SimResult(
+                            times, [InputContainer(u) for u in inputs], _copy=False
+                        ),
+                        states,
+                        LazySimResult(self.model.output, times, states, _copy=False),
+                        LazySimResult(
+                            self.model.event_state, times, states, _copy=False
+                        ),
+                        time_of_event,
+                        {
+                            key: None if x is None else StateContainer(x)
+                            for key, x in last_state.items()
+                        },
+                    )
+                )
+        return results
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_pool"] = None  # Pools cannot be pickled
+        return state
+
+
+def _no_load(t, x=None):
+    return {}
+
+
+_no_load.state_independent = True
+
+
+class _SharedLoad:
+    """
+    Future loading equation that is evaluated once for each step, and shared by every sample. Only used for loads that do not depend on state (see :py:func:`progpy.loading.state_independent`).
+
+    Loads are cached by step of the simulation (reset with start() at the beginning of each sample), with the time they were calculated for, so samples that take the same steps reuse them. At most maxsize steps are cached. Each call returns a copy of the cached InputContainer, so samples do not share inputs
+    """
+
+    state_independent = True
+
+    def __init__(self, fcn, model, maxsize: int = 100000):
+        self.fcn = fcn
+        self.model = model  # For InputContainer, which cannot be pickled directly
+        self.maxsize = maxsize
+        self.loads = []  # (t, u) for each step
+        self.step = 0
+
+    def start(self):
+        """
+        Start a new sample (i.e., simulation) at the first step
+        """
+        self.step = 0
+
+    def __call__(self, t, x=None):
+        step = self.step
+        self.step += 1
+        if step < len(self.loads) and self.loads[step][0] == t:
+            return self.loads[step][1].copy()
+        u = self.fcn(t, x)
+        if not isinstance(u, self.model.InputContainer):
+            u = self.model.InputContainer(u)
+        if step == len(self.loads) and step < self.maxsize:
+            self.loads.append((t, u.copy()))
+        return u
+
+
+# Model, loading, and configuration of the most recent prediction, in each worker process
+_worker_predictor = {"payload": None, "args": None}
+
+
+def _predict_chunk(payload: bytes, samples: list, seeds: list):
+    """
+    Predict a chunk of samples in a worker process. Returns the results as arrays (for efficient transfer) and the profile of the chunk, if profiling
+    """
+    if _worker_predictor["payload"] != payload:
+        _worker_predictor["payload"] = payload
+        _worker_predictor["args"] = pickle.loads(payload)
+    model, future_loading_eqn, events, event_strategy, params = _worker_predictor[
+        "args"
+    ]
+    mc = MonteCarlo(model)
+    params = params.copy()
+    profiler = Profiler() if params["profile"] else None
+    params["profile"] = profiler
+
+    results = []
+    for x, seed in zip(samples, seeds):
+        np.random.seed(seed)
+        (times, inputs, states, _, _, time_of_event, last_state) = mc._predict_sample(
+            model.StateContainer(x), future_loading_eqn, events, event_strategy, params
+        )
+        results.append(
+            (
+                times,
+                [model.InputContainer(u).matrix for u in inputs],
+                [x.matrix for x in states],
+                time_of_event,
+                {key: None if x is None else x.matrix for key, x in last_state.items()},
+            )
         )
+    return results, profiler
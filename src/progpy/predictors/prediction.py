@@ -6,10 +6,28 @@ from numpy import sign
 
 from ..uncertain_data import UnweightedSamples, UncertainData
 
-PredictionResults = namedtuple(
-    "PredictionResults",
-    ["times", "inputs", "states", "outputs", "event_states", "time_of_event"],
-)
+
+class PredictionResults(
+    namedtuple(
+        "PredictionResults",
+        ["times", "inputs", "states", "outputs", "event_states", "time_of_event"],
+    )
+):
+    """
+    Result of a prediction (i.e., :py:meth:`progpy.predictors.Predictor.predict`). Behaves as a namedtuple of (times, inputs, states, outputs, event_states, time_of_event).
+
+    Attributes:
+        profile (Profiler, optional):
+            Time and number of calls for each phase of the prediction. Only recorded when predicted with profile=True
+        n_samples (int, optional):
+            Number of samples simulated, for sample-based predictors (e.g., MonteCarlo)
+        converged (bool, optional):
+            If the time of event estimate converged, for predictors with a stopping rule (e.g., MonteCarlo with convergence set)
+    """
+
+    profile = None
+    n_samples = None
+    converged = None
 
 
 class Prediction:
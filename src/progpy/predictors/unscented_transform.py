@@ -89,6 +89,8 @@ class UnscentedTransformPredictor(Predictor):
         Frequency at which results are saved (s)
     save_pts : list[float]
         Any additional savepoints (s) e.g., [10.1, 22.5]
+    store_trajectories : bool
+        If the inputs and states are saved (default: True). If False, only time_of_event (and time_of_event.final_state) are calculated
 
     Note
     ----
@@ -105,6 +107,7 @@ class UnscentedTransformPredictor(Predictor):
         "horizon": 1e99,
         "save_pts": [],
         "save_freq": 1e99,
+        "store_trajectories": True,
     }
 
     def __init__(self, model, **kwargs):
@@ -158,7 +161,7 @@ class UnscentedTransformPredictor(Predictor):
         ----------
         state (UncertaintData): Distribution of states
         future_loading_eqn: function (t, x=None) -> z, optional
-            Function to generate an estimate of loading at future time t
+            Function to generate an estimate of loading at future time t. The load is evaluated once per step (at the mean state) and shared by all sigma points. If the load is state independent (see :py:func:`progpy.loading.state_independent`), the mean state is not calculated
         options (optional, kwargs): configuration options\n
         Any additional configuration values. Note: These parameters can also be specified in the predictor constructor. The following configuration parameters are supported: \n
             * alpha, beta, kappa: UKF Scaling parameters
@@ -170,6 +173,7 @@ class UnscentedTransformPredictor(Predictor):
                 Strategy for stopping evaluation. Default is 'first'. One of:\n
                 * *first*: Will stop when first event in `events` list is reached.\n
                 * *all*: Will stop when all events in `events` list have been reached
+            * store_trajectories: If the trajectory is saved. If False, times, inputs, states, outputs, and event_states are empty (default: True)
 
         Returns (PredictionResults)
         -------
@@ -278,8 +282,11 @@ class UnscentedTransformPredictor(Predictor):
         next_save = t + save_freq
         save_pts = params["save_pts"]
         save_pts.append(1e99)  # Add last endpoint
+        store_trajectories = params["store_trajectories"]
 
         def update_all():
+            if not store_trajectories:
+                return
             times.append(t)
             inputs.append(
                 deepcopy(self.__input)
@@ -292,12 +299,15 @@ class UnscentedTransformPredictor(Predictor):
         # Simulation
         self.__input = future_loading_eqn(t, state.mean)
         update_all()  # First State
+        state_independent = getattr(future_loading_eqn, "state_independent", False)
+        mean_state = None
         while t < params["horizon"]:
             # Iterate through time
             t += dt
-            mean_state = StateContainer(
-                {key: x for (key, x) in zip(state_keys, filt.x)}
-            )
+            if not state_independent:
+                mean_state = StateContainer(
+                    {key: x for (key, x) in zip(state_keys, filt.x)}
+                )
             self.__input = future_loading_eqn(t, mean_state)
             filt.predict(dt=dt)
 
@@ -8,20 +8,29 @@ import itertools
 import json
 from numbers import Number
 import numpy as np
+from scipy.integrate import solve_ivp
 from typing import List, Mapping  # Still needed until v3.9
 from warnings import warn
 
 from progpy.exceptions import ProgModelStateLimitWarning, warn_once
 from progpy.loading import Piecewise
-from progpy.sim_result import SimResult, LazySimResult
+from progpy.sim_result import ColumnarSimResult, SimResult, LazySimResult
 from progpy.utils import ProgressBar, calc_error, input_validation
 from progpy.utils.containers import (
     DictLikeMatrixWrapper,
+    _key_index,
     InputContainer,
     OutputContainer,
 )
-from progpy.utils.next_state import next_state_functions
+from progpy.utils.next_state import (
+    _dx_matrix,
+    dormand_prince_step,
+    euler_next_state,
+    finite_difference_jacobian,
+    next_state_functions,
+)
 from progpy.utils.parameters import PrognosticsModelParameters
+from progpy.utils.profiling import get_profiler
 from progpy.utils.serialization import CustomEncoder, custom_decoder
 from progpy.utils.size import getsizeof
 
@@ -48,8 +57,12 @@ class PrognosticsModel(ABC):
           output (e.g., {'z1': 0.2, 'z2': 0.3}), or a function (z) -> z
         measurement_noise_dist : Optional, str
           distribution for :term:`measurement noise` (e.g., normal, uniform, triangular)
+        state_limit_warnings: Optional, str
+          What to do when :py:meth:`apply_limits` limits a state (default: 'always'). One of:
+          'always' (warn every time), 'once' (warn the first time each state is limited at each bound),
+          'counted' (no warning, count in state_limit_counts), or 'off' (no warning or count)
         integration_method: Optional, str or OdeSolver
-          Integration method used by next_state in continuous models, e.g. 'rk4' or 'euler' (default: 'euler'). Could also be a SciPy integrator (e.g., scipy.integrate.RK45). If the model is discrete, this parameter will raise an exception.
+          Integration method used by next_state in continuous models, e.g. 'rk4' or 'euler' (default: 'euler'). For stiff models, the implicit methods 'backward_euler' and 'rosenbrock' remain stable at much larger time steps (see :py:meth:`jacobian`). Could also be a SciPy integrator (e.g., scipy.integrate.RK45). If the model is discrete, this parameter will raise an exception.
 
     Additional parameters specific to the model
 
@@ -82,6 +95,8 @@ class PrognosticsModel(ABC):
             Parameters for the specific model object. This is created automatically from the default_parameters and kwargs
         state_limits: dict[str, tuple[float, float]], optional
             Limits on the state variables format {'state_name': (lower_limit, upper_limit)}
+        state_limit_counts: dict[str, int]
+            Number of values limited for each state by apply_limits, when state_limit_warnings is 'once' or 'counted'
         param_callbacks : dict[str, list[function]], optional
             Callbacks for derived parameters
         inputs: list[str], optional
@@ -104,6 +119,9 @@ class PrognosticsModel(ABC):
 
     is_vectorized = False
 
+    # Set by parameter state_limit_warnings
+    _state_limit_warnings = "always"
+
     # Configuration Parameters for model
     default_parameters = {"process_noise": 0.0, "measurement_noise": 0.0}
 
@@ -119,9 +137,27 @@ class PrognosticsModel(ABC):
     # events = []       # Identifiers for each event
     param_callbacks = {}  # Callbacks for derived parameters
 
-    SimulationResults = namedtuple(
-        "SimulationResults", ["times", "inputs", "states", "outputs", "event_states"]
-    )
+    class SimulationResults(
+        namedtuple(
+            "SimulationResults",
+            ["times", "inputs", "states", "outputs", "event_states"],
+        )
+    ):
+        """
+        Result of a simulation (e.g., :py:meth:`PrognosticsModel.simulate_to_threshold`). Behaves as a namedtuple of (times, inputs, states, outputs, event_states).
+
+        Attributes:
+            time_of_event (dict[str, float], optional):
+                Time at which each event was first reached, with keys defined by the simulated events. None for events not reached and when not recorded by the simulation.
+            state_at_event (dict[str, StateContainer], optional):
+                State at which each event was first reached, with keys defined by the simulated events. None for events not reached and when not recorded by the simulation.
+            profile (Profiler, optional):
+                Time and number of calls for each phase of the simulation. Only recorded when simulated with profile=True
+        """
+
+        time_of_event = None
+        state_at_event = None
+        profile = None
 
     def __init__(self, **kwargs):
         # Default params for any model
@@ -189,30 +225,45 @@ class PrognosticsModel(ABC):
         # These containers should be used instead of dictionaries for models
         # that use the internal matrix state
 
+        # Map of key to row is computed once, and shared by every container
         states = self.states
 
         class StateContainer(DictLikeMatrixWrapper):
+            __slots__ = ()
+            _shared_keys, _shared_index = _key_index(tuple(states))
+
             def __init__(self, data):
-                super().__init__(states, data)
+                super().__init__(self._shared_keys, data)
 
         self.StateContainer = StateContainer
 
         inputs = self.inputs
 
         class InputContainer(DictLikeMatrixWrapper):
+            __slots__ = ()
+            _shared_keys, _shared_index = _key_index(tuple(inputs))
+
             def __init__(self, data):
-                super().__init__(inputs, data)
+                super().__init__(self._shared_keys, data)
 
         self.InputContainer = InputContainer
 
         outputs = self.outputs
 
         class OutputContainer(DictLikeMatrixWrapper):
+            __slots__ = ()
+            _shared_keys, _shared_index = _key_index(tuple(outputs))
+
             def __init__(self, data):
-                super().__init__(outputs, data)
+                super().__init__(self._shared_keys, data)
 
         self.OutputContainer = OutputContainer
 
+        # State limits, as bound arrays aligned with states (see apply_limits)
+        self._state_limits_cache = None
+        self._state_limits_warned = set()
+        self.state_limit_counts = {}
+
         self.parameters = PrognosticsModelParameters(self, params, self.param_callbacks)
 
     def __getitem__(self, arg):
@@ -358,6 +409,43 @@ class PrognosticsModel(ABC):
         """
         raise NotImplementedError("dx not defined - please use next_state()")
 
+    def jacobian(self, x, u) -> np.ndarray:
+        """
+        .. versionadded:: 1.8.0
+
+        Calculate the Jacobian of the first derivative of state (dx) with respect to state, given state and input. Used by the implicit integration methods ('backward_euler' and 'rosenbrock').
+
+        By default, the Jacobian is estimated using finite differences of dx (see :py:func:`progpy.utils.next_state.finite_difference_jacobian`), which costs one call to dx per state. Models with an analytical Jacobian can override this method to make implicit integration faster and more accurate.
+
+        Parameters
+        ----------
+        x : StateContainer
+            state, with keys defined by model.states \n
+            e.g., x = m.StateContainer({'abc': 332.1, 'def': 221.003}) given states = ['abc', 'def']
+        u : InputContainer
+            Inputs, with keys defined by model.inputs \n
+            e.g., u = m.InputContainer({'i':3.2}) given inputs = ['i']
+
+        Returns
+        -------
+        jacobian : np.ndarray
+            Matrix where element [i, j] is the derivative of dx[i] with respect to x[j], with states in the order of model.states. Shape is (n_states, n_states), or (n_states, n_states, n_samples) for a vectorized state with more than one column (if the Jacobian is different for each column)
+
+        Example
+        -------
+        >>> from progpy.models import BatteryCircuit
+        >>> m = BatteryCircuit()
+        >>> u = m.InputContainer({'i': 2.0})
+        >>> z = m.OutputContainer({'v': 3.2, 't': 295})
+        >>> x = m.initialize(u, z) # Initialize first state
+        >>> J = m.jacobian(x, u) # Returns 4x4 matrix
+
+        See Also
+        --------
+        dx
+        """
+        return finite_difference_jacobian(self, x, u)
+
     def next_state(self, x, u, dt: float):
         """
         State transition equation: Calculate next state
@@ -399,8 +487,7 @@ class PrognosticsModel(ABC):
         ----
         A model should overwrite either `next_state` or `dx`. Override `dx` for continuous models, and `next_state` for discrete, where the behavior cannot be described by the first derivative
         """
-        dx = self.dx(x, u)
-        return self.StateContainer({key: x[key] + dx[key] * dt for key in dx.keys()})
+        return euler_next_state(self, x, u, dt)
 
     @property
     def is_continuous(self) -> bool:
@@ -446,22 +533,91 @@ class PrognosticsModel(ABC):
         >>> z = m.OutputContainer({'z1': 2.2})
         >>> x = m.initialize(u, z) # Initialize first state
         >>> x = m.apply_limits(x) # Returns bounded state
+
+        Note
+        ----
+        Limits are compiled into lower and upper bound arrays aligned with model.states the first time they are used, and again whenever state_limits changes. Warnings are configured using parameter `state_limit_warnings`
         """
+        if not self.state_limits:
+            return x
+        lower, upper = self._compile_state_limits()
+        policy = self._state_limit_warnings
+        keys = self.StateContainer._shared_keys
+        if (
+            isinstance(x, DictLikeMatrixWrapper)
+            and x.matrix.dtype == np.float64
+            and (x._keys is keys or x._keys == keys)
+        ):
+            matrix = x.matrix
+            if policy != "off":
+                below = matrix < lower
+                above = matrix > upper
+                # count_nonzero is faster than any() for small arrays
+                if np.count_nonzero(below) or np.count_nonzero(above):
+                    for i in np.flatnonzero(below.any(axis=1)):
+                        self._state_limited(
+                            keys[i], 0, lower[i, 0], matrix[i], below[i]
+                        )
+                    for i in np.flatnonzero(above.any(axis=1)):
+                        self._state_limited(
+                            keys[i], 1, upper[i, 0], matrix[i], above[i]
+                        )
+            np.maximum(matrix, lower, out=matrix)
+            np.minimum(matrix, upper, out=matrix)
+            return x
+
+        # Other states (e.g., dict or non-float)
         for key, limit in self.state_limits.items():
-            if np.any(np.array(x[key]) < limit[0]):
-                warn(
-                    "State {} limited to {} (was {})".format(key, limit[0], x[key]),
-                    ProgModelStateLimitWarning,
-                )
+            value = np.array(x[key])
+            if np.any(value < limit[0]):
+                if policy != "off":
+                    self._state_limited(key, 0, limit[0], value, value < limit[0])
                 x[key] = np.maximum(x[key], limit[0])
-            if np.any(np.array(x[key]) > limit[1]):
-                warn(
-                    "State {} limited to {} (was {})".format(key, limit[1], x[key]),
-                    ProgModelStateLimitWarning,
-                )
+            if np.any(value > limit[1]):
+                if policy != "off":
+                    self._state_limited(key, 1, limit[1], value, value > limit[1])
                 x[key] = np.minimum(x[key], limit[1])
         return x
 
+    def _compile_state_limits(self) -> tuple:
+        """
+        Lower and upper bound arrays (with a row for each state, in the order of model.states) for state_limits. Compiled again if state_limits has been replaced or changed since the last call
+        """
+        limits = self.state_limits
+        cache = self._state_limits_cache
+        if cache is not None and cache[0] is limits and cache[1] == limits:
+            return cache[2]
+        index = self.StateContainer._shared_index
+        lower = np.full((len(index), 1), -np.inf)
+        upper = np.full((len(index), 1), np.inf)
+        for key, (lower_limit, upper_limit) in limits.items():
+            i = index[key]
+            lower[i, 0] = lower_limit
+            upper[i, 0] = upper_limit
+        self._state_limits_cache = (limits, dict(limits), (lower, upper))
+        return lower, upper
+
+    def _state_limited(
+        self, key: str, bound: int, limit: float, value, limited
+    ) -> None:
+        """
+        Warn or count (depending on parameter state_limit_warnings) that state key was limited to the lower (bound 0) or upper (bound 1) limit
+        """
+        policy = self._state_limit_warnings
+        if policy == "always" or (
+            policy == "once" and (key, bound) not in self._state_limits_warned
+        ):
+            if policy == "once":
+                self._state_limits_warned.add((key, bound))
+            value = value[0] if np.size(value) == 1 else value
+            warn(
+                "State {} limited to {} (was {})".format(key, limit, value),
+                ProgModelStateLimitWarning,
+            )
+        if policy != "always":
+            count = int(np.count_nonzero(limited))
+            self.state_limit_counts[key] = self.state_limit_counts.get(key, 0) + count
+
     def performance_metrics(self, x) -> dict:
         """
         Calculate performance metrics where
@@ -546,6 +702,8 @@ class PrognosticsModel(ABC):
 
         # Calculate next state, forward one timestep
         z = self.output(x)
+        if not isinstance(z, DictLikeMatrixWrapper):
+            z = self.OutputContainer(z)
 
         # Add measurement noise
         return self.apply_measurement_noise(z)
@@ -674,7 +832,7 @@ class PrognosticsModel(ABC):
 
         Returns:
             state_at_event (dict[str, StateContainer]):
-                state at each events occurrence, with keys defined by model.events \n
+                state at each events occurrence, with keys defined by model.events (None for events not reached before the horizon). All events are found in a single simulation \n
                 e.g., state_at_event = {'impact': {'x1': 10, 'x2': 11}, 'falling': {'x1': 15, 'x2': 20}} given events = ['impact', 'falling'] and states = ['x1', 'x2']
 
         Note:
@@ -688,18 +846,11 @@ class PrognosticsModel(ABC):
         }
         params.update(kwargs)
 
-        events_remaining = self.events.copy()
-        t = 0
-        state_at_event = {}
-        while len(events_remaining) > 0:
-            result = self.simulate_to_threshold(x=x, t0=t, **params)
-            for key, value in result.event_states[-1].items():
-                if value <= 0 and key not in state_at_event:
-                    events_remaining.remove(key)
-                    state_at_event[key] = result.states[-1]
-            x = result.states[-1]
-            t = result.times[-1]
-        return state_at_event
+        params.setdefault("events", self.events)
+        params["event_strategy"] = "all"
+        # Every event is recorded in a single simulation
+        result = self.simulate_to_threshold(x=x, **params)
+        return result.state_at_event
 
     def time_of_event(
         self, x, future_loading_eqn=lambda t, x=None: {}, **kwargs
@@ -718,7 +869,7 @@ class PrognosticsModel(ABC):
 
         Returns:
             time_of_event (dict)
-                time of each event, with keys defined by model.events \n
+                time of each event, with keys defined by model.events (None for events not reached before the horizon). All events are found in a single simulation \n
                 e.g., time_of_event = {'impact': 8.2, 'falling': 4.077} given events = ['impact', 'falling']
 
         Note:
@@ -732,18 +883,11 @@ class PrognosticsModel(ABC):
         }
         params.update(kwargs)
 
-        events_remaining = self.events.copy()
-        t = 0
-        time_of_event = {}
-        while len(events_remaining) > 0:
-            result = self.simulate_to_threshold(x=x, t0=t, **params)
-            for key, value in result.event_states[-1].items():
-                if value <= 0 and key not in time_of_event:
-                    events_remaining.remove(key)
-                    time_of_event[key] = result.times[-1]
-            x = result.states[-1]
-            t = result.times[-1]
-        return time_of_event
+        params.setdefault("events", self.events)
+        params["event_strategy"] = "all"
+        # Every event is recorded in a single simulation
+        result = self.simulate_to_threshold(x=x, **params)
+        return result.time_of_event
 
     def simulate_to(
         self,
@@ -845,9 +989,11 @@ class PrognosticsModel(ABC):
             float: constant time step (s), e.g. dt = 0.1\n
             function (t, x) -> dt\n
             tuple: (mode, dt), where modes could be constant or auto. If auto, dt is maximum step size\n
-            str: mode - 'auto' or 'constant'\n
+            tuple: ('adaptive', tol): error-controlled step size using the embedded Dormand-Prince Runge-Kutta pair on model.dx, where tol is the relative and absolute tolerance of each step (continuous models only). Steps end at save and eval points, as with auto\n
+            tuple: ('ivp', method): integrate the whole horizon with scipy.integrate.solve_ivp using the given method (e.g., 'RK45', 'LSODA', or an OdeSolver class), with solver options from the model parameter integrator_config (continuous models only, single state). The solver chooses its own steps, restarting only at eval points (including the times of a Piecewise load). Saved states are sampled from the dense output at exactly the save times, and the time at which each threshold is met is found by root finding (on event_state, where it agrees with threshold_met). Process noise is not applied, and limits are applied to the state passed to dx\n
+            str: mode - 'auto', 'constant', 'adaptive' (tol 1e-6), or 'ivp' (method 'RK45')\n
         integration_method: str, optional
-            Integration method, e.g. 'rk4' or 'euler' (default: 'euler')
+            Integration method, e.g. 'rk4', 'euler', 'backward_euler', or 'rosenbrock' (default: 'euler')
         save_freq : float, optional
             Frequency at which output is saved (s), e.g., save_freq = 10. A save_freq of 0 will save every step. \n
         save_pts : list[float], optional
@@ -856,6 +1002,11 @@ class PrognosticsModel(ABC):
             Additional ordered list of custom times where simulation is guarenteed to be evaluated (though results are not saved, as with save_pts) when dt is auto (s), e.g., eval_pts= [50, 75] \n
         horizon : float, optional
             maximum time that the model will be simulated forward (s), e.g., horizon = 1000 \n
+        event_localization : str or tuple, optional
+            Method used to locate the time of event within the last step, instead of reporting the end of the step (default: None, no localization). The step is repeated from the last state, without process noise, for shorter durations until the crossing is found. One of:\n
+            * *bisect*: Bisection on threshold_met\n
+            * *interp*: Linear interpolation of event_state, refined until threshold_met changes (Illinois method)\n
+            tuple: (method, tol), where tol is the tolerance in time (s) (default: 1e-6), e.g., event_localization=('bisect', 1e-3)
         first_output : OutputContainer, optional
             First measured output, needed to initialize state for some classes. Can be omitted for classes that don't use this
         x : StateContainer, optional
@@ -865,6 +1016,8 @@ class PrognosticsModel(ABC):
             e.g., m.simulate_to_threshold(eqn, z, dt=0.1, save_pts=[1, 2])
         progress : bool, optional
             toggle progress bar printing, e.g., progress = True\n
+        profile : bool or Profiler, optional
+            Record the time and number of calls of each phase of the simulation (load, next_state, apply_process_noise, apply_limits, threshold_met, event_state, output, and saving), returned as the profile attribute of the result (default: False). If a Profiler is provided, results are added to it\n
 
         Returns
         -------
@@ -878,6 +1031,12 @@ class PrognosticsModel(ABC):
             Estimated outputs for each time in times
         event_states: SimResult
             Estimated event state (e.g., SOH), between 1-0 where 0 is event occurrence, for each time in times
+        profile: Profiler
+            Attribute (not part of the tuple). Time spent in each phase, when profile is set
+        time_of_event: dict[str, float]
+            Attribute (not part of the tuple). Time at which each event in events was first reached, or None if it was not reached. Recorded during the simulation, so with event_strategy 'all' every event is found in a single pass
+        state_at_event: dict[str, StateContainer]
+            Attribute (not part of the tuple). State at which each event in events was first reached, or None if it was not reached
 
         Raises
         ------
@@ -903,43 +1062,177 @@ class PrognosticsModel(ABC):
         ----
         configuration of the model is set through model.parameters.\n
         """
-        # Input Validation
-        if first_output and not all(key in first_output for key in self.outputs):
-            raise ValueError(
-                "Missing key in 'first_output', must have every key in model.outputs"
-            )
-
-        if future_loading_eqn is None:
-            future_loading_eqn = lambda t, x=None: self.InputContainer({})
-        elif not (callable(future_loading_eqn)):
-            raise ValueError("'future_loading_eqn' must be callable f(t)")
+        # Initialization of save arrays
+        saved_times = []
+        saved_inputs = []
+        saved_states = []
+        saved_outputs = []
+        saved_event_states = []
+        output = self.__output
+        event_state = self.event_state
 
-        if "threshold_keys" in kwargs:
-            warn("Please use the keyword argument `events` instead of `threshold_keys`")
-            if events is None:
-                events = kwargs["threshold_keys"]
+        profiler = get_profiler(kwargs.get("profile", False))
+        if profiler is not None:
+            kwargs["profile"] = profiler
+            output = profiler.wrap("output", output)
+            event_state = profiler.wrap("event_state", event_state)
+
+        def save(t, u, x):
+            saved_times.append(t)
+            saved_inputs.append(u)
+            if isinstance(saved_states, ColumnarSimResult):
+                saved_states._append(t, x.matrix[:, 0])
             else:
-                warn(
-                    "Both `events` and `threshold_keys` were set. `events` will be used."
+                # Avoid optimization where x is not copied
+                saved_states.append(deepcopy(x))
+
+        if profiler is not None:
+            save = profiler.wrap("saving", save)
+
+        events_met = {}
+        for t, u, x in self.__simulate(
+            future_loading_eqn, first_output, events, events_met, **kwargs
+        ):
+            if (
+                not saved_times
+                and x.matrix.dtype == np.float64
+                and x.matrix.shape[1:] == (1,)
+            ):
+                # States are stored in a single array, instead of copying the container at each save point
+                saved_states = ColumnarSimResult(x.keys(), _type=self.StateContainer)
+            save(t, u, x)
+
+            if kwargs.get("print", False):
+                # Intermediate printing
+                saved_outputs.append(output(x))
+                saved_event_states.append(event_state(x))
+                print(
+                    "Time: {}\n\tInput: {}\n\tState: {}\n\tOutput: {}\n\tEvent State: {}\n".format(
+                        saved_times[-1],
+                        saved_inputs[-1],
+                        x,
+                        saved_outputs[-1],
+                        saved_event_states[-1],
+                    )
                 )
 
+        if not saved_outputs:
+            # saved_outputs is empty, so it wasn't calculated in simulation - used cached result
+            saved_outputs = LazySimResult(
+                output, saved_times, saved_states, _copy=False
+            )
+            saved_event_states = LazySimResult(
+                event_state, saved_times, saved_states, _copy=False
+            )
+        else:
+            saved_outputs = SimResult(saved_times, saved_outputs, _copy=False)
+            saved_event_states = SimResult(saved_times, saved_event_states, _copy=False)
+
+        if not isinstance(saved_states, SimResult):
+            saved_states = SimResult(saved_times, saved_states, _copy=False)
+
+        result = self.SimulationResults(
+            saved_times,
+            SimResult(saved_times, saved_inputs, _copy=False),
+            saved_states,
+            saved_outputs,
+            saved_event_states,
+        )
+        result.profile = profiler
+        result.time_of_event = {
+            key: None if met is None else met[0] for key, met in events_met.items()
+        }
+        result.state_at_event = {
+            key: None if met is None else met[1] for key, met in events_met.items()
+        }
+        return result
+
+    def simulate_iter(
+        self,
+        future_loading_eqn: abc.Callable = None,
+        first_output=None,
+        events: list = None,
+        **kwargs,
+    ):
+        """
+        Simulate prognostics model until any or specified threshold(s) have been met, yielding the result at each save point instead of storing it.
+
+        Unlike :py:meth:`simulate_to_threshold`, no history is kept, so memory use does not grow with the length of the simulation. The simulation can be stopped early by stopping iteration (e.g., break from a for loop).
+
+        Parameters
+        ----------
+        future_loading_eqn : abc.Callable
+            Function of (t) -> z used to predict future loading (output) at a given time (t)
+        first_output : OutputContainer, optional
+            First measured output, needed to initialize state for some classes. Can be omitted for classes that don't use this
+
+        Keyword Arguments
+        -----------------
+        Supports the same keyword arguments as :py:meth:`simulate_to_threshold` (e.g., events, event_strategy, t0, dt, save_freq, save_pts, horizon, x)
+
+        Yields
+        ------
+        t : float
+            Time of the save point
+        u : InputContainer
+            Input (from future_loading_eqn) at time t
+        x : StateContainer
+            State at time t
+        z : OutputContainer
+            Output at time t
+        event_state : dict
+            Event state at time t
+
+        See Also
+        --------
+        simulate_to_threshold
+
+        Example
+        -------
+        >>> from progpy.models import BatteryCircuit
+        >>> m = BatteryCircuit() # Replace with specific model being simulated
+        >>> def future_load_eqn(t, x = None):
+        ...     return m.InputContainer({'i': 2.0})
+        >>> min_v = float('inf')
+        >>> for (t, u, x, z, es) in m.simulate_iter(future_load_eqn, save_freq=100):
+        ...     min_v = min(min_v, z['v'])
+        """
+        output = self.__output
+        event_state = self.event_state
+        simulation = self.__simulate(future_loading_eqn, first_output, events, **kwargs)
+        try:
+            for t, u, x in simulation:
+                x = x.copy()
+                yield t, u, x, output(x), event_state(x)
+        finally:
+            # Ends simulation (e.g., resetting integration method) if stopped early
+            simulation.close()
+
+    def __events(self, events) -> list:
+        """
+        Events to simulate to, as a list (all events if events is None). Raises an error for anything other than an event name or a list of event names
+        """
         if events is None:
-            events = self.events.copy()
+            return self.events.copy()
+        if isinstance(events, str):
+            # A single event
+            events = [events]
         if not isinstance(events, abc.Iterable):
             # must be string or list-like
             raise TypeError(
                 f"`events` must be a single event string or list of events. Was unsupported type {type(events)}."
             )
-        if isinstance(events, str):
-            # A single event
-            events = [events]
-        if (events is not None) and not all([key in self.events for key in events]):
+        # Change to list because of the limits of jsonify
+        events = list(events)
+        if not all([key in self.events for key in events]):
             raise ValueError("`events` must be event names")
-        if not isinstance(events, list):
-            # Change to list because of the limits of jsonify
-            events = list(events)
+        return events
 
-        # Configure
+    @staticmethod
+    def __simulation_config(kwargs: dict) -> dict:
+        """
+        Simulation configuration: the defaults, updated with kwargs. The configuration shared by every simulation (dt, save_freq, save_pts, and horizon) is validated
+        """
         config = {  # Defaults
             "t0": 0.0,
             "dt": ("auto", 1.0),
@@ -951,6 +1244,8 @@ class PrognosticsModel(ABC):
             "print": False,
             "x": None,
             "progress": False,
+            "event_localization": None,
+            "profile": False,
         }
         config.update(kwargs)
 
@@ -991,6 +1286,101 @@ class PrognosticsModel(ABC):
             raise ValueError(
                 "'horizon' must be positive, was {}".format(config["horizon"])
             )
+        return config
+
+    @staticmethod
+    def __dt_mode(dt, modes: tuple) -> tuple:
+        """
+        Mode of the time step (dt argument of simulate_to_threshold) and its step size (or the function, for mode 'function'). Raises an error for modes other than modes
+
+        Returns:
+            tuple: (dt_mode, dt)
+        """
+        if callable(dt):
+            return "function", dt
+        if isinstance(dt, tuple):
+            dt_mode, dt = dt[0], dt[1]
+        elif isinstance(dt, str):
+            # Default step size for constant, otherwise limited only by save and eval points
+            dt_mode, dt = dt, 1.0 if dt == "constant" else np.inf
+        else:
+            dt_mode = "constant"
+        if dt_mode not in modes:
+            raise ValueError(
+                f"'dt' mode {dt_mode} not supported. Must be one of {', '.join(modes)}, or a function"
+            )
+        return dt_mode, dt
+
+    @staticmethod
+    def __save_times(t: float, save_freq) -> tuple:
+        """
+        Iterator of the times to save at, from save_freq (frequency, or tuple of start time and frequency), after t
+
+        Returns:
+            tuple: (iterator, next save time, save frequency)
+        """
+        if isinstance(save_freq, tuple):
+            # Tuple used to specify start and frequency
+            t_step = save_freq[1]
+            # Use starting time or the next multiple
+            t_start = save_freq[0]
+            start = max(t_start, t - (t - t_start) % t_step)
+            iterator = itertools.count(start, t_step)
+        else:
+            # Otherwise - start is t0
+            t_step = save_freq
+            iterator = itertools.count(t, t_step)
+        next(iterator)  # Skip current time
+        return iterator, next(iterator), t_step
+
+    @staticmethod
+    def __eval_pts(eval_pts: list, future_loading_eqn) -> list:
+        """
+        Evaluation points for dt mode 'auto', including the times where a piecewise load changes
+        """
+        if isinstance(future_loading_eqn, Piecewise):
+            return sorted(list(eval_pts) + list(future_loading_eqn.times))
+        return eval_pts
+
+    def __simulate(
+        self,
+        future_loading_eqn: abc.Callable = None,
+        first_output=None,
+        events: list = None,
+        events_met: dict = None,
+        **kwargs,
+    ):
+        """
+        Generator that simulates the model until any or specified threshold(s) have been met. Used by :py:meth:`simulate_to_threshold` and :py:meth:`simulate_iter`.
+
+        Yields (t, u, x) at the start of the simulation, each save point, and the end of the simulation. x is not copied, so it must be copied if kept. See simulate_to_threshold for arguments.
+
+        If events_met is a dict, it is filled with the (time, state) at which each event in events was first met (localized, if event_localization is set), or None for events that were not met. The simulation is not restarted for each event.
+        """
+        # Input Validation
+        if first_output and not all(key in first_output for key in self.outputs):
+            raise ValueError(
+                "Missing key in 'first_output', must have every key in model.outputs"
+            )
+
+        if future_loading_eqn is None:
+            future_loading_eqn = lambda t, x=None: self.InputContainer({})
+        elif not (callable(future_loading_eqn)):
+            raise ValueError("'future_loading_eqn' must be callable f(t)")
+
+        if "threshold_keys" in kwargs:
+            warn("Please use the keyword argument `events` instead of `threshold_keys`")
+            if events is None:
+                events = kwargs["threshold_keys"]
+            else:
+                warn(
+                    "Both `events` and `threshold_keys` were set. `events` will be used."
+                )
+
+        events = self.__events(events)
+
+        # Configure
+        config = self.__simulation_config(kwargs)
         if config["x"] is not None and not all(
             [state in config["x"] for state in self.states]
         ):
@@ -1020,6 +1410,22 @@ class PrognosticsModel(ABC):
             raise TypeError(
                 "'print' must be a bool, was a {}".format(type(config["print"]))
             )
+        profiler = get_profiler(config["profile"])
+        if isinstance(config["event_localization"], tuple):
+            localization, localization_tol = config["event_localization"]
+        else:
+            localization = config["event_localization"]
+            localization_tol = 1e-6
+        if localization not in (None, "bisect", "interp"):
+            raise ValueError(
+                f"'event_localization' method {localization} not supported. Must be 'bisect', 'interp', or None"
+            )
+        if not isinstance(localization_tol, Number) or localization_tol <= 0:
+            raise ValueError(
+                "'event_localization' tolerance must be a positive number, was {}".format(
+                    localization_tol
+                )
+            )
 
         # Setup
         t = config["t0"]
@@ -1037,140 +1443,672 @@ class PrognosticsModel(ABC):
             old_integration_method = self.parameters.get("integration_method", "euler")
             self.parameters["integration_method"] = config["integration_method"]
 
-        # Optimization
-        output = self.__output
-        threshold_met_eqn = self.threshold_met
-        event_state = self.event_state
-        load_eqn = future_loading_eqn
-        next_state = self.next_state
-        apply_noise = self.apply_process_noise
-        apply_limits = self.apply_limits
-        progress = config["progress"]
-
-        # Threshold Met Equations
-        if config["event_strategy"] in ("first", "any"):
-
-            def check_thresholds(thresholds_met):
-                t_met = [thresholds_met[key] for key in events]
-                if len(t_met) > 0 and not np.isscalar(list(t_met)[0]):
-                    return np.any(t_met)
-                return any(t_met)
-        elif config["event_strategy"] == "all":
-
-            def check_thresholds(thresholds_met):
-                t_met = [thresholds_met[key] for key in events]
-                if len(t_met) > 0 and not np.isscalar(list(t_met)[0]):
-                    return np.all(t_met)
-                return all(t_met)
-        elif callable(config["event_strategy"]):
-            check_thresholds = config["event_strategy"]
-        else:
-            raise ValueError(
-                f"Invalid value for `event_strategy`: {config['event_strategy']}. Should 'all', 'first', or a callable (e.g., function or lambda)"
+        try:
+            # Optimization
+            threshold_met_eqn = self.threshold_met
+            event_state = self.event_state
+            load_eqn = future_loading_eqn
+            next_state = self.next_state
+            apply_noise = self.apply_process_noise
+            apply_limits = self.apply_limits
+            progress = config["progress"]
+
+            # Threshold Met Equations
+            if config["event_strategy"] in ("first", "any"):
+
+                def check_thresholds(thresholds_met):
+                    t_met = [thresholds_met[key] for key in events]
+                    if len(t_met) > 0 and not np.isscalar(list(t_met)[0]):
+                        return np.any(t_met)
+                    return any(t_met)
+            elif config["event_strategy"] == "all":
+
+                def check_thresholds(thresholds_met):
+                    t_met = [thresholds_met[key] for key in events]
+                    if len(t_met) > 0 and not np.isscalar(list(t_met)[0]):
+                        return np.all(t_met)
+                    return all(t_met)
+            elif callable(config["event_strategy"]):
+                check_thresholds = config["event_strategy"]
+            else:
+                raise ValueError(
+                    f"Invalid value for `event_strategy`: {config['event_strategy']}. Should 'all', 'first', or a callable (e.g., function or lambda)"
+                )
+
+            if "thresholds_met_eqn" in config:
+                warn(
+                    "thresholds_met_eqn will be removed after version 1.7 of ProgPy. The thresholds_met_eqn argument can now be passed into event_strategy.",
+                    DeprecationWarning,
+                    stacklevel=2,
+                )
+                check_thresholds = config["thresholds_met_eqn"]
+                events = []
+            elif events is None:
+                # Note: Setting events to be all events if it is None
+                events = self.events
+            elif len(events) == 0:
+                check_thresholds = lambda _: False
+
+            if (
+                len(events) == 0
+                and config.get("thresholds_met_eqn", None) is None
+                and "horizon" not in kwargs
+            ):
+                raise ValueError(
+                    "Running simulate to threshold for a model with no events requires a horizon to be set. Otherwise simulation would never end."
+                )
+
+            if localization == "interp" and (
+                len(events) == 0 or callable(config["event_strategy"])
+            ):
+                # Interpolation relies on the event states of the events, fall back to bisection
+                localization = "bisect"
+            if config["event_strategy"] == "all":
+                # Event occurs when the last event is reached
+                combine_event_states = np.max
+            else:
+                combine_event_states = np.min
+
+            def localize_event(t_prev, x_prev, u, dt, x, check=None, keys=None):
+                """
+                Find the first time in (t_prev, t_prev + dt] where the thresholds are met (check, by default check_thresholds), repeating the step from x_prev. Returns the time and state at the crossing
+                """
+                if check is None:
+                    check, keys = check_thresholds, events
+                lo, hi = 0.0, dt
+                interpolate = localization == "interp"
+                if interpolate:
+                    f_lo = combine_event_states(
+                        [event_state(x_prev)[key] for key in keys]
+                    )
+                    f_hi = combine_event_states([event_state(x)[key] for key in keys])
+                while hi - lo > localization_tol:
+                    width = hi - lo
+                    if interpolate and f_lo != f_hi:
+                        dt_i = lo + width * f_lo / (f_lo - f_hi)
+                        # Keep the trial point inside the bracket, so it always shrinks
+                        dt_i = min(
+                            max(dt_i, lo + localization_tol / 2),
+                            hi - localization_tol / 2,
+                        )
+                    else:
+                        dt_i = (lo + hi) / 2
+                    x_i = apply_limits(next_state(x_prev.copy(), u, dt_i))
+                    if check(threshold_met_eqn(x_i)):
+                        hi, x = dt_i, x_i
+                    else:
+                        lo = dt_i
+                    if localization == "interp":
+                        f_i = combine_event_states(
+                            [event_state(x_i)[key] for key in keys]
+                        )
+                        if hi == dt_i:
+                            f_hi = f_i
+                        else:
+                            f_lo = f_i
+                        # Interpolation is only used while it converges faster than bisection
+                        # (e.g., event states clipped at 0 stall it)
+                        interpolate = not interpolate or hi - lo <= width / 2
+                return t_prev + hi, x
+
+            # Events that have not been met yet, for recording the first crossing of each
+            events_remaining = []
+            if events_met is not None:
+                events_met.update({key: None for key in events})
+                events_remaining = list(events)
+            # With 'all', the simulation ends once every event has been met (not necessarily at the same time)
+            until_all_met = (
+                events_met is not None
+                and config["event_strategy"] == "all"
+                and len(events) > 0
+            )
+            # Thresholds are arrays when x has a column for each of several trajectories
+            event_met = bool if x.matrix.shape[1:] in ((), (1,)) else np.any
+            if config["event_strategy"] in ("first", "any"):
+                # Simulation ends at the first event, or the last for 'all'
+                select_event = min
+            elif config["event_strategy"] == "all":
+                select_event = max
+            else:
+                select_event = None
+
+            horizon = t + config["horizon"]
+            iterator, next_save, t_step = self.__save_times(t, config["save_freq"])
+            save_pt_index = 0
+            save_pts = config["save_pts"]
+            eval_pt_index = 0
+            eval_pts = list(config["eval_pts"])
+
+            # configuring next_time function to define prediction time step, default is constant dt
+            dt_mode, dt = self.__dt_mode(
+                config["dt"], ("constant", "auto", "adaptive", "ivp")
             )
+            if dt_mode == "function":
+                next_time = dt
+
+            adaptive = dt_mode == "adaptive"
+            if adaptive:
+                if not self.is_continuous:
+                    raise ValueError(
+                        "'dt' mode 'adaptive' is only supported for continuous models (i.e., models that define dx)"
+                    )
+                tol = dt if np.isfinite(dt) else 1e-6
+                if tol <= 0:
+                    raise ValueError(
+                        f"'adaptive' tolerance must be positive, was {tol}"
+                    )
+                # Step size is limited only by save and eval points
+                dt = np.inf
+                dt_mode = "auto"
+
+                def step(x, u, dt):
+                    return dormand_prince_step(self, x, u, dt)
+
+                def adaptive_step(t, x, dt_max):
+                    """
+                    Take the largest step (up to dt_max) with estimated error within tolerance. Returns the input, next state, and step size
+                    """
+                    nonlocal h
+                    h_i = min(h, dt_max)
+                    while True:
+                        u = load_eqn(t + h_i / 2, x)
+                        x_next, err = step(x, u, h_i)
+                        scale = tol + tol * np.maximum(
+                            np.abs(x.matrix), np.abs(x_next.matrix)
+                        )
+                        err_norm = float(
+                            np.max(
+                                np.sqrt(
+                                    np.mean(
+                                        np.square(err / scale, dtype=np.float64), axis=0
+                                    )
+                                )
+                            )
+                        )
+                        # Step size controller
+                        if err_norm == 0:
+                            factor = 5
+                        else:
+                            factor = min(5, max(0.2, 0.9 * err_norm**-0.2))
+                        if err_norm <= 1:
+                            # Accept. Next step is based on this one, unless it was shortened to meet a save or eval point
+                            h = h_i * factor if h_i == h else max(h, h_i * factor)
+                            return u, x_next, h_i
+                        if not np.isfinite(err_norm):
+                            factor = 0.2
+                        h_i *= factor
+                        if t + h_i == t:
+                            raise ValueError(
+                                f"Adaptive step size underflow at t={t}. Could not meet tolerance {tol}"
+                            )
+
+            ivp = dt_mode == "ivp"
+            if ivp:
+                if not self.is_continuous:
+                    raise ValueError(
+                        "'dt' mode 'ivp' is only supported for continuous models (i.e., models that define dx)"
+                    )
+                if x.matrix.shape[1:] != (1,):
+                    raise ValueError(
+                        "'dt' mode 'ivp' is only supported for a single state (i.e., not vectorized)"
+                    )
+                ivp_method = dt if isinstance(dt, (str, type)) else "RK45"
+                dt = np.inf
+                dt_mode = "auto"
 
-        if "thresholds_met_eqn" in config:
-            warn(
-                "thresholds_met_eqn will be removed after version 1.7 of ProgPy. The thresholds_met_eqn argument can now be passed into event_strategy.",
-                DeprecationWarning,
-                stacklevel=2,
+            if dt_mode == "constant":
+
+                def next_time(t, x):
+                    return dt
+            elif dt_mode == "auto":
+                eval_pts = self.__eval_pts(eval_pts, future_loading_eqn)
+
+                def next_time(t, x=None):
+                    next_save_pt = (
+                        save_pts[save_pt_index]
+                        if save_pt_index < len(save_pts)
+                        else float("inf")
+                    )
+                    next_eval_pt = (
+                        eval_pts[eval_pt_index]
+                        if eval_pt_index < len(eval_pts)
+                        else float("inf")
+                    )
+                    opts = (
+                        item
+                        for item in (
+                            dt,
+                            next_save - t,
+                            next_save_pt - t,
+                            next_eval_pt - t,
+                        )
+                        if item > 0
+                    )
+                    return min(*opts)
+
+            if adaptive:
+                # Initial step size, from the scale of the state and its derivative (Hairer, Norsett & Wanner)
+                dx0 = self.StateContainer(self.dx(x, u)).matrix
+                scale = tol + tol * np.abs(x.matrix)
+                d0 = np.sqrt(np.mean(np.square(x.matrix / scale, dtype=np.float64)))
+                d1 = np.sqrt(np.mean(np.square(dx0 / scale, dtype=np.float64)))
+                h = float(0.01 * d0 / d1) if d0 > 1e-5 and d1 > 1e-5 else 1e-6
+
+                # Events are localized with the same integrator
+                def next_state(x, u, dt):
+                    return step(x, u, dt)[0]
+
+            if ivp:
+                state_cls = self.StateContainer
+                integrator_config = self.parameters.get("integrator_config", {})
+
+                def f(t, y):
+                    x = apply_limits(state_cls.from_matrix(y[:, np.newaxis].copy()))
+                    return _dx_matrix(self, x, load_eqn(t, x))[:, 0]
+
+                def ivp_event(key):
+                    def event(t, y):
+                        # Magnitude from event_state, so the root finder sees a smooth crossing, and sign from threshold_met, so the root is where the threshold is met (even if event_state is not exactly 0 there)
+                        x = state_cls.from_matrix(y[:, np.newaxis])
+                        magnitude = max(
+                            abs(np.ravel(event_state(x)[key])[0]),
+                            np.finfo(np.float64).tiny,
+                        )
+                        if event_met(threshold_met_eqn(x)[key]):
+                            return -magnitude
+                        return magnitude
+
+                    event.terminal = True
+                    event.direction = -1
+                    return event
+
+                def simulate_ivp(t, x):
+                    """
+                    Integrate from t until the thresholds are met or the horizon is reached using solve_ivp, restarting at eval points and events that do not end the simulation. Yields (t, u, x) at each save point and at the end of the simulation
+                    """
+                    nonlocal next_save, save_pt_index
+                    t_saved = t
+                    # Events with a zero crossing still to find
+                    ivp_events = list(events)
+                    boundaries = [pt for pt in eval_pts if pt > t]
+                    while t < horizon:
+                        t_end = min(
+                            [pt for pt in boundaries if pt > t], default=horizon
+                        )
+                        solution = solve_ivp(
+                            f,
+                            (t, min(t_end, horizon)),
+                            x.matrix[:, 0],
+                            method=ivp_method,
+                            events=[ivp_event(key) for key in ivp_events],
+                            dense_output=True,
+                            **integrator_config,
+                        )
+                        if solution.status < 0:
+                            raise ValueError(
+                                f"solve_ivp failed at t={solution.t[-1]}: {solution.message}"
+                            )
+                        t_stop = solution.t[-1]
+
+                        # Save points within this segment, from the dense output
+                        if t_step == 0:
+                            # Save every step of the solver
+                            save_times = list(solution.t[1:])
+                        else:
+                            save_times = []
+                            while next_save <= t_stop:
+                                save_times.append(next_save)
+                                next_save = next(iterator)
+                        while (
+                            save_pt_index < len(save_pts)
+                            and save_pts[save_pt_index] <= t_stop
+                        ):
+                            save_times.append(save_pts[save_pt_index])
+                            save_pt_index += 1
+                        for t_save in sorted(set(save_times)):
+                            if t_save <= t_saved:
+                                continue
+                            x_save = apply_limits(
+                                state_cls.from_matrix(
+                                    solution.sol(t_save)[:, np.newaxis]
+                                )
+                            )
+                            yield t_save, load_eqn(t_save, x_save), x_save
+                            t_saved = t_save
+
+                        t = t_stop
+                        x = apply_limits(
+                            state_cls.from_matrix(solution.y[:, -1:].copy())
+                        )
+                        thresholds_met = dict(threshold_met_eqn(x))
+                        if solution.status == 1:
+                            # Stopped where the threshold of an event is met. Counted as met, even if the root is on the other side by the root finding tolerance
+                            fired = [
+                                key
+                                for key, t_events in zip(ivp_events, solution.t_events)
+                                if len(t_events) > 0
+                            ]
+                            for key in fired:
+                                ivp_events.remove(key)
+                                thresholds_met[key] = True
+                        newly_met = [
+                            key
+                            for key in events_remaining
+                            if event_met(thresholds_met[key])
+                        ]
+                        for key in newly_met:
+                            events_remaining.remove(key)
+                            events_met[key] = (t, x.copy())
+                        if until_all_met:
+                            if not events_remaining:
+                                break
+                        elif check_thresholds(thresholds_met):
+                            break
+
+                    if t_saved != t:
+                        yield t, load_eqn(t, x), x
+
+            # Auto Container wrapping
+            dt0 = next_time(t, x) - t
+            if not isinstance(u, DictLikeMatrixWrapper):
+                # Wrapper around the future loading equation
+                def load_eqn(t, x):
+                    u = future_loading_eqn(t, x)
+                    return self.InputContainer(u)
+
+            if not isinstance(next_state(x.copy(), u, dt0), DictLikeMatrixWrapper):
+                # Wrapper around the next state equation
+                def next_state(x, u, dt):
+                    x = self.next_state(x, u, dt)
+                    return self.StateContainer(x)
+
+            if profiler is not None:
+                # Calls are timed through wrappers, so there is no overhead when not profiling
+                load_eqn = profiler.wrap("load", load_eqn)
+                if adaptive:
+                    step = profiler.wrap("next_state", step)
+                else:
+                    next_state = profiler.wrap("next_state", next_state)
+                apply_noise = profiler.wrap("apply_process_noise", apply_noise)
+                apply_limits = profiler.wrap("apply_limits", apply_limits)
+                threshold_met_eqn = profiler.wrap("threshold_met", threshold_met_eqn)
+                event_state = profiler.wrap("event_state", event_state)
+
+            # Simulate
+            yield t, u, x
+            if ivp:
+                yield from simulate_ivp(t, x)
+                return
+            t_saved = t
+            if progress:
+                simulate_progress = ProgressBar(100, "Progress")
+                last_percentage = 0
+
+            while t < horizon:
+                if localization is not None:
+                    t_prev, x_prev = t, x.copy()
+                dt_i = next_time(t, x)
+                if adaptive:
+                    u, x, dt_i = adaptive_step(t, x, dt_i)
+                    t += dt_i
+                else:
+                    t_load = (
+                        t + dt_i / 2
+                    )  # Saving as separate variable reduces likelihood of floating point error
+                    # Use state at midpoint of step to best represent the load during the duration of the step
+                    # This is sometimes referred to as 'leapfrog integration'
+                    u = load_eqn(t_load, x)
+                    t += dt_i
+                    x = next_state(x, u, dt_i)
+                x = apply_noise(x, dt_i)
+                x = apply_limits(x)
+
+                thresholds_met = threshold_met_eqn(x)
+                newly_met = []
+                if events_remaining:
+                    newly_met = [
+                        key
+                        for key in events_remaining
+                        if event_met(thresholds_met[key])
+                    ]
+                    for key in newly_met:
+                        events_remaining.remove(key)
+                        if localization is not None:
+                            events_met[key] = localize_event(
+                                t_prev,
+                                x_prev,
+                                u,
+                                dt_i,
+                                x,
+                                lambda t_met, key=key: event_met(t_met[key]),
+                                [key],
+                            )
+                        else:
+                            events_met[key] = (t, x.copy())
+                if until_all_met:
+                    finished = not events_remaining
+                else:
+                    finished = check_thresholds(thresholds_met)
+
+                if localization is not None and finished:
+                    # Event occurred within this step, find when
+                    if newly_met and select_event is not None:
+                        # Already found for each event met in this step
+                        t, x = select_event(
+                            (events_met[key] for key in newly_met),
+                            key=lambda event: event[0],
+                        )
+                    else:
+                        t, x = localize_event(t_prev, x_prev, u, dt_i, x)
+                    break
+
+                # Save if at appropriate time
+                if t >= next_save:
+                    next_save = next(iterator)
+                    yield t, u, x
+                    t_saved = t
+                    if (save_pt_index < len(save_pts)) and (
+                        t >= save_pts[save_pt_index]
+                    ):
+                        # Prevent double saving when save_pt and save_freq align
+                        save_pt_index += 1
+                elif (save_pt_index < len(save_pts)) and (t >= save_pts[save_pt_index]):
+                    # (save_pt_index < len(save_pts)) covers when t is past the last savepoint
+                    # Otherwise save_pt_index would be out of range
+                    save_pt_index += 1
+                    yield t, u, x
+                    t_saved = t
+                elif (eval_pt_index < len(eval_pts)) and (t >= eval_pts[eval_pt_index]):
+                    # (eval_pt_index < len(eval_pts)) covers when t is past the last evaluation point
+                    # Otherwise eval_pt_index would be out of range
+                    eval_pt_index += 1
+
+                # Update progress bar
+                if config["progress"]:
+                    percentages = [1 - val for val in event_state(x).values()]
+                    percentages.append((t / horizon))
+                    converted_iteration = int(max(min(100, max(percentages) * 100), 0))
+                    if converted_iteration - last_percentage > 1:
+                        simulate_progress(converted_iteration)
+                        last_percentage = converted_iteration
+
+                # Check thresholds
+                if finished:
+                    break
+
+            # Save final state
+            if t_saved != t:
+                # This check prevents double recording when the last state was a savepoint
+                yield t, u, x
+        finally:
+            if "integration_method" in config:
+                # Reset integration method
+                self.parameters["integration_method"] = old_integration_method
+
+    def simulate_batch_to_threshold(
+        self,
+        x_batch,
+        future_loading_eqn: abc.Callable = None,
+        events: list = None,
+        **kwargs,
+    ) -> list:
+        """
+        Simulate a batch of initial states until any or specified threshold(s) have been met for each trajectory
+
+        For vectorized models (i.e., model.is_vectorized is True) the batch is propagated as one StateContainer with a column per trajectory, so every step of the simulation is shared by the whole batch. Each trajectory is removed from the batch once it meets its threshold(s). For other models, each trajectory is simulated separately using :py:meth:`simulate_to_threshold`.
+
+        Parameters
+        ----------
+        x_batch : list[StateContainer], UnweightedSamples, or StateContainer
+            Initial state for each trajectory. Either a sequence of states, or a single StateContainer with a column for each trajectory \n
+            e.g., x_batch = [m.StateContainer({'x1': 10, 'x2': -5.3}), m.StateContainer({'x1': 11, 'x2': -5.1})]
+        future_loading_eqn : abc.Callable, optional
+            Function of (t, x) -> u used to predict future loading (input) at a given time (t). For vectorized models, x contains a column for every trajectory still being simulated
+
+        Keyword Arguments
+        -----------------
+        events: abc.Sequence[str] or str, optional
+            Keys for events that will trigger the end of simulation for a trajectory. If blank, all events are used
+        event_strategy: str, optional
+            Strategy for stopping evaluation of a trajectory. Default is 'first'. One of:\n
+            * *first*: Will stop when first event in `events` list is reached.\n
+            * *all*: Will stop when all events in `events` list have been reached
+        t0 : float, optional
+            Starting time for simulation in seconds (default: 0.0)
+        dt : float, tuple, str, or function, optional
+            Time step, as in :py:meth:`simulate_to_threshold`
+        save_freq : float, optional
+            Frequency at which output is saved (s), e.g., save_freq = 10. A save_freq of 0 will save every step.
+        save_pts : list[float], optional
+            Additional ordered list of custom times where output is saved (s), e.g., save_pts= [50, 75]
+        eval_pts : list[float], optional
+            Additional ordered list of custom times where simulation is guaranteed to be evaluated when dt is auto (s)
+        horizon : float, optional
+            maximum time that the model will be simulated forward (s), e.g., horizon = 1000
+        profile : bool or Profiler, optional
+            Record the time and number of calls of each phase of the simulation, as in :py:meth:`simulate_to_threshold`. The Profiler is shared by all results (default: False)
+
+        Returns
+        -------
+        results : list[SimulationResults]
+            Results of each trajectory, in the order of x_batch. time_of_event and state_at_event are recorded for each result
+
+        Raises
+        ------
+        ValueError, TypeError
+
+        See Also
+        --------
+        simulate_to_threshold
+
+        Example
+        -------
+        >>> from progpy.models import ThrownObject
+        >>> m = ThrownObject()
+        >>> x_batch = [m.StateContainer({'x': 1.83, 'v': v}) for v in (35, 40, 45)]
+        >>> results = m.simulate_batch_to_threshold(x_batch, events='impact', dt=0.01)
+        >>> toe = [result.time_of_event['impact'] for result in results]
+        """
+        if future_loading_eqn is None:
+            future_loading_eqn = lambda t, x=None: self.InputContainer({})
+        elif not callable(future_loading_eqn):
+            raise ValueError("'future_loading_eqn' must be callable f(t)")
+
+        if isinstance(x_batch, (dict, DictLikeMatrixWrapper)):
+            x_matrix = self.StateContainer(x_batch).matrix
+        elif isinstance(x_batch, abc.Iterable):
+            x_matrix = np.array(
+                [[x_i[key] for x_i in x_batch] for key in self.states],
+                dtype=np.float64,
+            )
+        else:
+            raise TypeError(
+                f"'x_batch' must be a sequence of states or a StateContainer, was {type(x_batch)}"
             )
-            check_thresholds = config["thresholds_met_eqn"]
-            events = []
-        elif events is None:
-            # Note: Setting events to be all events if it is None
-            events = self.events
-        elif len(events) == 0:
-            check_thresholds = lambda _: False
+        x_matrix = np.array(x_matrix, dtype=np.float64).reshape(self.n_states, -1)
+        n_trajectories = x_matrix.shape[1]
 
-        if (
-            len(events) == 0
-            and config.get("thresholds_met_eqn", None) is None
-            and "horizon" not in kwargs
-        ):
+        events = self.__events(events)
+        if len(events) == 0 and "horizon" not in kwargs:
             raise ValueError(
                 "Running simulate to threshold for a model with no events requires a horizon to be set. Otherwise simulation would never end."
             )
 
-        # Initialization of save arrays
-        saved_times = []
-        saved_inputs = []
-        saved_states = []
-        saved_outputs = []
-        saved_event_states = []
+        event_strategy = kwargs.get("event_strategy", "first")
+        if event_strategy not in ("first", "any", "all"):
+            raise ValueError(
+                f"Invalid value for `event_strategy`: {event_strategy}. Should be 'all' or 'first'"
+            )
+
+        profiler = get_profiler(kwargs.get("profile", False))
+        kwargs["profile"] = profiler  # Shared by all trajectories
+
+        if not self.is_vectorized:
+            # Fall back to simulating each trajectory separately
+            results = []
+            for i in range(n_trajectories):
+                result = self.simulate_to_threshold(
+                    future_loading_eqn,
+                    events=events,
+                    **{**kwargs, "x": self.StateContainer(x_matrix[:, [i]].copy())},
+                )
+                if getattr(result, "time_of_event", None) is None:
+                    # simulate_to_threshold is overridden without recording events, use the final state
+                    t_met = self.threshold_met(result.states[-1])
+                    result.time_of_event = {
+                        key: result.times[-1] if t_met[key] else None for key in events
+                    }
+                    result.state_at_event = {
+                        key: result.states[-1] if t_met[key] else None for key in events
+                    }
+                results.append(result)
+            return results
+
+        # Configure
+        config = self.__simulation_config(kwargs)
+
+        # Optimization
+        threshold_met_eqn = self.threshold_met
+        next_state = self.next_state
+        apply_noise = self.apply_process_noise
+        apply_limits = self.apply_limits
+        StateContainer = self.StateContainer
+
+        def load_eqn(t, x):
+            u = future_loading_eqn(t, x)
+            if not isinstance(u, DictLikeMatrixWrapper):
+                u = self.InputContainer(u)
+            return u
+
+        if profiler is not None:
+            load_eqn = profiler.wrap("load", load_eqn)
+            next_state = profiler.wrap("next_state", next_state)
+            apply_noise = profiler.wrap("apply_process_noise", apply_noise)
+            apply_limits = profiler.wrap("apply_limits", apply_limits)
+            threshold_met_eqn = profiler.wrap("threshold_met", threshold_met_eqn)
+
+        # Setup
+        t = config["t0"]
+        x = StateContainer(x_matrix.copy())
+        active = np.arange(n_trajectories)  # Trajectories still being simulated
+        u = load_eqn(t, x)
+
         horizon = t + config["horizon"]
-        if isinstance(config["save_freq"], tuple):
-            # Tuple used to specify start and frequency
-            t_step = config["save_freq"][1]
-            # Use starting time or the next multiple
-            t_start = config["save_freq"][0]
-            start = max(t_start, t - (t - t_start) % t_step)
-            iterator = itertools.count(start, t_step)
-        else:
-            # Otherwise - start is t0
-            t_step = config["save_freq"]
-            iterator = itertools.count(t, t_step)
-        next(iterator)  # Skip current time
-        next_save = next(iterator)
+        iterator, next_save, _ = self.__save_times(t, config["save_freq"])
         save_pt_index = 0
         save_pts = config["save_pts"]
         eval_pt_index = 0
-        eval_pts = config["eval_pts"].copy()  # Copy because we may change it
+        eval_pts = list(config["eval_pts"])
 
-        # configure optional intermediate printing
-        if config["print"]:
-
-            def update_all():
-                saved_times.append(t)
-                saved_inputs.append(u)
-                saved_states.append(
-                    deepcopy(x)
-                )  # Avoid optimization where x is not copied
-                saved_outputs.append(output(x))
-                saved_event_states.append(event_state(x))
-                print(
-                    "Time: {}\n\tInput: {}\n\tState: {}\n\tOutput: {}\n\tEvent State: {}\n".format(
-                        saved_times[-1],
-                        saved_inputs[-1],
-                        saved_states[-1],
-                        saved_outputs[-1],
-                        saved_event_states[-1],
-                    )
-                )
-        else:
-
-            def update_all():
-                saved_times.append(t)
-                saved_inputs.append(u)
-                saved_states.append(
-                    deepcopy(x)
-                )  # Avoid optimization where x is not copied
-
-        # configuring next_time function to define prediction time step, default is constant dt
-        if callable(config["dt"]):
-            next_time = config["dt"]
-            dt_mode = "function"
-        elif isinstance(config["dt"], tuple):
-            dt_mode = config["dt"][0]
-            dt = config["dt"][1]
-        elif isinstance(config["dt"], str):
-            dt_mode = config["dt"]
-            if dt_mode == "constant":
-                dt = 1.0  # Default
-            else:
-                dt = np.inf
-        else:
-            dt_mode = "constant"
-            dt = config["dt"]  # saving to optimize access in while loop
-
-        if dt_mode == "constant":
+        dt_mode, dt = self.__dt_mode(config["dt"], ("constant", "auto"))
+        if dt_mode == "function":
+            next_time = dt
+        elif dt_mode == "constant":
 
             def next_time(t, x):
                 return dt
         elif dt_mode == "auto":
-            if isinstance(future_loading_eqn, Piecewise):
-                eval_pts.extend(future_loading_eqn.times)
-                eval_pts = sorted(eval_pts)
+            eval_pts = self.__eval_pts(eval_pts, future_loading_eqn)
 
             def next_time(t, x=None):
                 next_save_pt = (
@@ -1189,110 +2127,151 @@ class PrognosticsModel(ABC):
                     if item > 0
                 )
                 return min(*opts)
-        elif dt_mode != "function":
-            raise ValueError(
-                f"'dt' mode {dt_mode} not supported. Must be 'constant', 'auto', or a function"
-            )
 
-        # Auto Container wrapping
-        dt0 = next_time(t, x) - t
-        if not isinstance(u, DictLikeMatrixWrapper):
-            # Wrapper around the future loading equation
-            def load_eqn(t, x):
-                u = future_loading_eqn(t, x)
-                return self.InputContainer(u)
-
-        if not isinstance(next_state(x.copy(), u, dt0), DictLikeMatrixWrapper):
-            # Wrapper around the next state equation
-            def next_state(x, u, dt):
-                x = self.next_state(x, u, dt)
-                return self.StateContainer(x)
-
-        if not isinstance(self.output(x), DictLikeMatrixWrapper):
-            # Wrapper around the output equation
-            def output(x):
-                # Calculate output, convert to output container
-                z = self.output(x)
-                z = self.OutputContainer(z)
-
-                # Add measurement noise
-                return self.apply_measurement_noise(z)
+        # Saved points are recorded for the whole batch, as (time, trajectories, input, states)
+        # and split into the results for each trajectory at the end
+        records = []
+        last_saved = np.full(
+            n_trajectories, np.nan
+        )  # Time of last save for each trajectory
+        time_of_event = np.full((len(events), n_trajectories), np.nan)
+        state_at_event = {key: [None] * n_trajectories for key in events}
+
+        def save(t, u, x, columns=None):
+            if columns is None:
+                last_saved[active] = t
+                records.append((t, active, u, x.matrix.copy()))
+                return
+            last_saved[active[columns]] = t
+            if u.matrix.ndim == 2 and u.matrix.shape[1] == active.size > 1:
+                # Input differs between trajectories
+                u = self.InputContainer(u.matrix[:, columns])
+            records.append((t, active[columns], u, x.matrix[:, columns]))
+
+        if profiler is not None:
+            save = profiler.wrap("saving", save)
 
         # Simulate
-        update_all()
-        if progress:
-            simulate_progress = ProgressBar(100, "Progress")
-            last_percentage = 0
-
+        save(t, u, x)
         while t < horizon:
             dt_i = next_time(t, x)
-            t_load = (
-                t + dt_i / 2
-            )  # Saving as separate variable reduces likelihood of floating point error
             # Use state at midpoint of step to best represent the load during the duration of the step
-            # This is sometimes referred to as 'leapfrog integration'
-            u = load_eqn(t_load, x)
+            u = load_eqn(t + dt_i / 2, x)
             t += dt_i
             x = next_state(x, u, dt_i)
+            if not isinstance(x, DictLikeMatrixWrapper):
+                x = StateContainer(x)
             x = apply_noise(x, dt_i)
             x = apply_limits(x)
 
             # Save if at appropriate time
+            saved = False
             if t >= next_save:
                 next_save = next(iterator)
-                update_all()
+                saved = True
                 if (save_pt_index < len(save_pts)) and (t >= save_pts[save_pt_index]):
                     # Prevent double saving when save_pt and save_freq align
                     save_pt_index += 1
             elif (save_pt_index < len(save_pts)) and (t >= save_pts[save_pt_index]):
-                # (save_pt_index < len(save_pts)) covers when t is past the last savepoint
-                # Otherwise save_pt_index would be out of range
                 save_pt_index += 1
-                update_all()
+                saved = True
             elif (eval_pt_index < len(eval_pts)) and (t >= eval_pts[eval_pt_index]):
-                # (eval_pt_index < len(eval_pts)) covers when t is past the last evaluation point
-                # Otherwise eval_pt_index would be out of range
                 eval_pt_index += 1
+            if saved:
+                save(t, u, x)
 
-            # Update progress bar
-            if config["progress"]:
-                percentages = [1 - val for val in event_state(x).values()]
-                percentages.append((t / horizon))
-                converted_iteration = int(max(min(100, max(percentages) * 100), 0))
-                if converted_iteration - last_percentage > 1:
-                    simulate_progress(converted_iteration)
-                    last_percentage = converted_iteration
-
-            # Check thresholds
-            if check_thresholds(threshold_met_eqn(x)):
-                break
+            if len(events) == 0:
+                continue
 
-        # Save final state
-        if saved_times[-1] != t:
-            # This check prevents double recording when the last state was a savepoint
-            update_all()
-
-        if not saved_outputs:
-            # saved_outputs is empty, so it wasn't calculated in simulation - used cached result
-            saved_outputs = LazySimResult(self.__output, saved_times, saved_states)
-            saved_event_states = LazySimResult(
-                self.event_state, saved_times, saved_states
+            # Check thresholds for each trajectory
+            t_met = threshold_met_eqn(x)
+            t_met = np.array(
+                [np.broadcast_to(t_met[key], active.shape) for key in events],
+                dtype=bool,
             )
-        else:
-            saved_outputs = SimResult(saved_times, saved_outputs, _copy=False)
-            saved_event_states = SimResult(saved_times, saved_event_states, _copy=False)
+            newly_met = t_met & np.isnan(time_of_event[:, active])
+            if newly_met.any():
+                for i, key in enumerate(events):
+                    for j in np.flatnonzero(newly_met[i]):
+                        state_at_event[key][active[j]] = StateContainer(
+                            x.matrix[:, [j]].copy()
+                        )
+                    time_of_event[i, active[newly_met[i]]] = t
 
-        if "integration_method" in config:
-            # Reset integration method
-            self.parameters["integration_method"] = old_integration_method
+            if event_strategy == "all":
+                finished = ~np.isnan(time_of_event[:, active]).any(axis=0)
+            else:
+                finished = t_met.any(axis=0)
+
+            if finished.any():
+                # Record final state of finished trajectories, then remove them from the batch
+                if not saved:
+                    save(t, u, x, finished)
+                remaining = ~finished
+                active = active[remaining]
+                if active.size == 0:
+                    break
+                x = StateContainer(x.matrix[:, remaining])
+                if u.matrix.ndim == 2 and u.matrix.shape[1] == remaining.size > 1:
+                    # Input differs between trajectories
+                    u = self.InputContainer(u.matrix[:, remaining])
+
+        # Save final state of trajectories that reached the horizon
+        if active.size > 0:
+            not_saved = last_saved[active] != t
+            if not_saved.all():
+                save(t, u, x)
+            elif not_saved.any():
+                save(t, u, x, not_saved)
+
+        # Split records into results for each trajectory
+        times = [[] for _ in range(n_trajectories)]
+        inputs = [[] for _ in range(n_trajectories)]
+        states = [[] for _ in range(n_trajectories)]
+        for t_i, trajectories, u_i, x_i in records:
+            per_column_input = (
+                u_i.matrix.ndim == 2 and u_i.matrix.shape[1] == len(trajectories) > 1
+            )
+            for j, trajectory in enumerate(trajectories):
+                times[trajectory].append(t_i)
+                states[trajectory].append(x_i[:, j])
+                if per_column_input:
+                    inputs[trajectory].append(self.InputContainer(u_i.matrix[:, [j]]))
+                else:
+                    inputs[trajectory].append(u_i)
 
-        return self.SimulationResults(
-            saved_times,
-            SimResult(saved_times, saved_inputs, _copy=False),
-            SimResult(saved_times, saved_states, _copy=False),
-            saved_outputs,
-            saved_event_states,
-        )
+        output = self.__output
+        event_state = self.event_state
+        if profiler is not None:
+            output = profiler.wrap("output", output)
+            event_state = profiler.wrap("event_state", event_state)
+
+        results = []
+        for i in range(n_trajectories):
+            states[i] = ColumnarSimResult(
+                self.states,
+                times[i],
+                np.array(states[i]),
+                _type=StateContainer,
+                _copy=False,
+            )
+            result = self.SimulationResults(
+                times[i],
+                SimResult(times[i], inputs[i], _copy=False),
+                states[i],
+                LazySimResult(output, times[i], states[i], _copy=False),
+                LazySimResult(event_state, times[i], states[i], _copy=False),
+            )
+            result.profile = profiler
+            result.time_of_event = {
+                key: None
+                if np.isnan(time_of_event[j, i])
+                else float(time_of_event[j, i])
+                for j, key in enumerate(events)
+            }
+            result.state_at_event = {key: state_at_event[key][i] for key in events}
+            results.append(result)
+        return results
 
     def __sizeof__(self):
         return getsizeof(self)
@@ -2,7 +2,7 @@
 
 from collections import UserList, defaultdict, abc
 from copy import deepcopy
-from functools import cached_property
+from functools import cached_property, partial
 from matplotlib.pyplot import figure
 import numpy as np
 import pandas as pd
@@ -363,6 +363,160 @@ class SimResult(UserList):
     # lgtm [py/missing-equals]
 
 
+class ColumnarSimResult(SimResult):  # lgtm [py/missing-equals]
+    """
+    A `SimResult` where the data is stored as a single 2D numpy array (one row per time and one column per key) instead of a list of containers. This is used by the `simulate_to*` methods to store states without creating a new container at each save point.
+
+    Rows (i.e., elements of data) are only created as containers when first accessed, while `to_numpy` and `frame` use the array directly. Any modification of the data (e.g., pop, extend) converts the result to a list of containers, after which it behaves like a regular `SimResult`.
+
+    Args:
+        keys (list[str]): Keys for each column (e.g., model.states)
+        times (list[float], optional): Times for each row where times[n] corresponds to matrix[n]
+        matrix (np.ndarray, optional): Array of shape (len(times), len(keys))
+        _type (type, optional): Container type for each row (e.g., model.StateContainer). Defaults to dict
+    """
+
+    def __init__(
+        self,
+        keys: list,
+        times: list = None,
+        matrix: np.ndarray = None,
+        _type=dict,
+        _copy=True,
+    ):
+        self._keys = list(keys)
+        self._type = _type
+        # If data has been modified (i.e., buffer is out of date)
+        self._detached = False
+        if times is None or matrix is None:
+            self.times = []
+            self._buffer = np.empty((16, len(self._keys)), dtype=np.float64)
+        else:
+            self.times = times.copy()
+            matrix = (
+                np.array(matrix, dtype=np.float64)
+                if _copy
+                else np.asarray(matrix, dtype=np.float64)
+            )
+            self._buffer = matrix.reshape(len(self.times), len(self._keys))
+
+    @property
+    def _matrix(self) -> np.ndarray:
+        if self._detached:
+            return None
+        return self._buffer[: len(self.times)]
+
+    def _append(self, t: float, row: np.ndarray) -> None:
+        """
+        Add a row to the end of the result. For use while simulating, before data is first accessed
+
+        Args:
+            t (float): Time of the row
+            row (np.ndarray): Values for each key, in the order of keys
+        """
+        n = len(self.times)
+        if n == self._buffer.shape[0]:
+            # Full, double capacity
+            buffer = np.empty((2 * n, len(self._keys)), dtype=np.float64)
+            buffer[:n] = self._buffer
+            self._buffer = buffer
+        self._buffer[n] = row
+        self.times.append(t)
+
+    @cached_property
+    def data(self) -> list:
+        """
+        Get the data (elements of list) as containers. Only calculated on first request
+
+        Returns:
+            list: data
+        """
+        # Each container is a view of its row, so changes to a container are reflected in the array
+        rows = self._buffer[: len(self.times), :, np.newaxis]
+        if self._type is dict:
+            return [dict(zip(self._keys, row[:, 0])) for row in rows]
+        return [self._type(row) for row in rows]
+
+    @cached_property
+    def frame(self) -> pd.DataFrame:
+        matrix = self._matrix
+        if matrix is None or len(self.times) == 0:
+            return super().frame
+        return pd.DataFrame(
+            matrix,
+            columns=self._keys,
+            index=pd.Index(self.times, name="time"),
+            copy=False,
+        )
+
+    def to_numpy(self, keys=None) -> np.ndarray:
+        """
+        Convert from simresult to numpy array. If keys is not provided, the array is returned directly, without copying
+
+        Args:
+            keys: Subset of keys to return as part of numpy array (by default, all)
+
+        Returns:
+            np.ndarray: numpy array representing simresult
+        """
+        matrix = self._matrix
+        if matrix is None or len(self.times) == 0:
+            return super().to_numpy(keys)
+        if keys is None:
+            return matrix
+        return matrix[:, [self._keys.index(key) for key in keys]]
+
+    def __reduce__(self):
+        _type = self._type
+        if isinstance(_type, type) and issubclass(_type, DictLikeMatrixWrapper):
+            # Containers are pickled as DictLikeMatrixWrapper (model containers cannot be pickled)
+            _type = partial(DictLikeMatrixWrapper, list(self._keys))
+        matrix = self.to_numpy() if self.times else None
+        return (ColumnarSimResult, (self._keys, self.times, matrix, _type))
+
+    def _detach(self) -> None:
+        # Make sure data is a list of containers before modifying it
+        self.data
+        if not self._detached and "frame" in self.__dict__:
+            # Frame may share memory with buffer
+            self.__dict__["frame"] = self.__dict__["frame"].copy()
+        self._detached = True
+
+    def __setitem__(self, key, value):
+        self._detach()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._detach()
+        super().__delitem__(key)
+
+    def extend(self, other: SimResult) -> None:
+        self._detach()
+        super().extend(other)
+
+    def pop_by_index(self, index: int = -1) -> dict:
+        n = len(self.times)
+        if (
+            index in (-1, n - 1)
+            and n > 0
+            and not self._detached
+            and "data" not in self.__dict__
+            and "frame" not in self.__dict__
+        ):
+            # Removing the last row only shortens the array
+            row = self._buffer[n - 1].copy()
+            self.times.pop()
+            if self._type is dict:
+                return dict(zip(self._keys, row))
+            return self._type(row[:, np.newaxis])
+        self._detach()
+        return super().pop_by_index(index)
+
+    def clear(self) -> None:
+        self._detach()
+        super().clear()
+
+
 class LazySimResult(SimResult):  # lgtm [py/missing-equals]
     """
     Used to store the result of a simulation, which is only calculated on first request
@@ -375,7 +529,7 @@ class LazySimResult(SimResult):  # lgtm [py/missing-equals]
         Args:
             fcn (abc.Callable): function (x) -> z where x is the state and z is the data
             times (array(float)): Times for each data point where times[n] corresponds to data[n]
-            data (array(dict)): Data points where data[n] corresponds to times[n]
+            states (array(dict) or ColumnarSimResult): States where states[n] corresponds to times[n]. Without _copy, a ColumnarSimResult is only copied as an array (which can be modified without affecting this result), and its containers are created when first needed
         """
         self.fcn = fcn
         if times is None or states is None:
@@ -384,13 +538,34 @@ class LazySimResult(SimResult):  # lgtm [py/missing-equals]
         else:
             self.times = times.copy()
             if _copy:
+                if isinstance(states, SimResult):
+                    states = states.data
                 self.states = deepcopy(states)
+            elif isinstance(states, ColumnarSimResult) and states._matrix is not None:
+                # Own copy of the array, so modifying states (e.g., sim.states) doesn't change this result
+                self.states = ColumnarSimResult(
+                    states._keys, states.times, states._matrix, _type=states._type
+                )
             else:
                 self.states = states
 
     def __reduce__(self):
         return (self.__class__.__base__, (self.times, self.data))
 
+    @property
+    def states(self) -> list:
+        """
+        States used to calculate the data, where states[n] corresponds to times[n]
+        """
+        if isinstance(self._states, ColumnarSimResult):
+            # Only converted to containers when first needed
+            self._states = self._states.data
+        return self._states
+
+    @states.setter
+    def states(self, value) -> None:
+        self._states = value
+
     def is_cached(self) -> bool:
         """
         Returns:
@@ -1,14 +1,224 @@
 # Copyright © 2021 United States Government as represented by the Administrator of the National Aeronautics and Space Administration.  All Rights Reserved.
 
-from filterpy.monte_carlo import residual_resample
-from numpy import array, empty, exp, max, take, float64
-from scipy.stats import norm
+from concurrent.futures import ProcessPoolExecutor
+from hashlib import sha1
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+from numpy import array, float64
+import pickle
+from statistics import NormalDist
+from time import perf_counter
 from warnings import warn
+import weakref
 
-from progpy.utils.containers import DictLikeMatrixWrapper
+from progpy.utils.containers import DictLikeMatrixWrapper, _as_container
+from progpy.utils.profiling import Profiler, get_profiler
 
 from . import state_estimator
-from ..uncertain_data import UnweightedSamples, ScalarData, UncertainData
+from ..uncertain_data import (
+    UnweightedSamples,
+    WeightedSamples,
+    ScalarData,
+    UncertainData,
+)
+
+
+def _select(weights: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    # Index of the particle at each position (in [0, 1)) of the cumulative weights
+    cumulative = np.cumsum(weights)
+    cumulative[-1] = 1.0  # Avoid round-off error
+    return np.searchsorted(cumulative, positions, side="right")
+
+
+def systematic_resample(weights: np.ndarray, num_samples: int = None) -> np.ndarray:
+    """
+    Systematic resampling: particles are selected at evenly spaced positions of the cumulative weights, with a single random offset
+
+    Args:
+        weights (np.ndarray): Normalized weight of each particle
+        num_samples (int, optional): Number of particles to select. Defaults to the number of weights
+
+    Returns:
+        np.ndarray: Index of the particle selected for each new particle
+    """
+    n = len(weights) if num_samples is None else num_samples
+    return _select(weights, (np.random.random() + np.arange(n)) / n)
+
+
+def stratified_resample(weights: np.ndarray, num_samples: int = None) -> np.ndarray:
+    """
+    Stratified resampling: one particle is selected at a random position in each of n evenly spaced strata of the cumulative weights
+
+    Args:
+        weights (np.ndarray): Normalized weight of each particle
+        num_samples (int, optional): Number of particles to select. Defaults to the number of weights
+
+    Returns:
+        np.ndarray: Index of the particle selected for each new particle
+    """
+    n = len(weights) if num_samples is None else num_samples
+    return _select(weights, (np.random.random(n) + np.arange(n)) / n)
+
+
+def residual_resample(weights: np.ndarray, num_samples: int = None) -> np.ndarray:
+    """
+    Residual resampling: each particle is copied floor(n*weight) times, and the rest of the particles are selected randomly according to the remaining (residual) weights
+
+    Args:
+        weights (np.ndarray): Normalized weight of each particle
+        num_samples (int, optional): Number of particles to select. Defaults to the number of weights
+
+    Returns:
+        np.ndarray: Index of the particle selected for each new particle
+    """
+    n = len(weights) if num_samples is None else num_samples
+    scaled = n * np.asarray(weights)
+    copies = np.floor(scaled).astype(np.intp)
+    indexes = np.repeat(np.arange(len(weights)), copies)
+    n_residual = n - len(indexes)
+    if n_residual <= 0:
+        return indexes
+    residual = scaled - copies
+    residual /= residual.sum()
+    return np.concatenate((indexes, _select(residual, np.random.random(n_residual))))
+
+
+def _kld_bound(k: np.ndarray, epsilon: float, delta: float) -> np.ndarray:
+    # Number of samples needed so that, with probability 1-delta, the KL divergence between the sample-based and the true distribution over k bins is less than epsilon (Wilson-Hilferty approximation of the chi-square quantile, see Fox, 2003)
+    z = NormalDist().inv_cdf(1 - delta)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        a = 2 / (9 * (k - 1))
+        bound = (k - 1) / (2 * epsilon) * (1 - a + np.sqrt(a) * z) ** 3
+    return np.where(k > 1, bound, 1)
+
+
+resample_functions = {
+    "systematic": systematic_resample,
+    "stratified": stratified_resample,
+    "residual": residual_resample,
+}
+
+
+def _propagate(
+    model,
+    fcns: tuple,
+    particles: np.ndarray,
+    z_predicted: np.ndarray,
+    columns,
+    t0: float,
+    t: float,
+    u,
+    dt: float,
+    seeds=None,
+) -> None:
+    """
+    Propagate particles (columns of particles) of a non-vectorized model from t0 to t, in place, and predict their measurements (into the same columns of z_predicted)
+
+    Args:
+        model (PrognosticsModel): Model
+        fcns (tuple): next_state, apply_process_noise, apply_limits, and output functions
+        particles (np.ndarray): Particles (states x particles)
+        z_predicted (np.ndarray): Predicted measurements (outputs x particles)
+        columns (range): Particles to propagate
+        t0 (float): Time of the particles
+        t (float): Time to propagate to
+        u (InputContainer): Inputs
+        dt (float): Maximum timestep
+        seeds (list, optional): Random seed for each particle. The global random state is restored afterwards. Defaults to using the current random state
+    """
+    next_state, apply_process_noise, apply_limits, output = fcns
+    StateContainer = model.StateContainer
+    OutputContainer = model.OutputContainer
+    if seeds is not None:
+        random_state = np.random.get_state()  # Restored after seeding
+    for j, i in enumerate(columns):
+        if seeds is not None:
+            np.random.seed(seeds[j])
+        t_i = t0  # Used to mark time for each particle
+        x = StateContainer.from_matrix(particles[:, [i]])
+        while t_i < t:
+            dt_i = min(dt, t - t_i)
+            x = next_state(x, u, dt_i)
+            x = apply_process_noise(x, dt_i)
+            x = apply_limits(x)
+            t_i += dt_i
+        particles[:, i] = _as_container(StateContainer, x).matrix[:, 0]
+        z_predicted[:, i] = _as_container(OutputContainer, output(x)).matrix[:, 0]
+    if seeds is not None:
+        np.random.set_state(random_state)
+
+
+def _release(shm: SharedMemory) -> None:
+    shm.close()
+    shm.unlink()
+
+
+# Model (and the hash of its pickled form) and shared memory of the most recent propagation, in each worker process
+_worker_filter = {"token": None, "model": None, "shm": None}
+
+
+def _propagate_chunk(
+    token: str,
+    payload: bytes,
+    name: str,
+    shape: tuple,
+    start: int,
+    end: int,
+    seeds: list,
+    t0: float,
+    t: float,
+    u,
+    dt: float,
+    profile: bool,
+):
+    """
+    Propagate a chunk of particles (start to end) in a worker process. Particles (first rows) and predicted measurements (remaining rows) are read from and written to the shared memory block (name).
+
+    The model is identified by token (hash of the pickled model), and the pickled model (payload) is only sent when the model has changed. Returns (False, None) without propagating if the worker does not have the model and payload is None, otherwise (True, profile of the chunk, if profiling)
+    """
+    if _worker_filter["token"] != token:
+        if payload is None:
+            return False, None
+        _worker_filter["model"] = pickle.loads(payload)
+        _worker_filter["token"] = token
+    model = _worker_filter["model"]
+    shm = _worker_filter["shm"]
+    if shm is None or shm.name != name:
+        if shm is not None:
+            shm.close()
+        shm = SharedMemory(name=name)
+        _worker_filter["shm"] = shm
+    shared = np.ndarray(shape, dtype=float64, buffer=shm.buf)
+    n_states = len(model.states)
+
+    fcns = (
+        model.next_state,
+        model.apply_process_noise,
+        model.apply_limits,
+        model.output,
+    )
+    profiler = Profiler() if profile else None
+    if profiler is not None:
+        fcns = tuple(
+            profiler.wrap(phase, fcn)
+            for phase, fcn in zip(
+                ("next_state", "apply_process_noise", "apply_limits", "output"),
+                fcns,
+            )
+        )
+    _propagate(
+        model,
+        fcns,
+        shared[:n_states],
+        shared[n_states:],
+        range(start, end),
+        t0,
+        t,
+        u,
+        dt,
+        seeds,
+    )
+    return True, profiler
 
 
 class ParticleFilter(state_estimator.StateEstimator):
@@ -35,20 +245,66 @@ class ParticleFilter(state_estimator.StateEstimator):
             e.g., dt = 1e-2
         num_particles (int, optional):
             Number of particles in particle filter
-        resample_fcn (function, optional):
-            Resampling function ([weights]) -> [indexes] e.g., filterpy.monte_carlo.residual_resample
+        resample_fcn (str or function, optional):
+            Resampling method: 'residual' (default), 'systematic', 'stratified', or a function ([weights]) -> [indexes] e.g., filterpy.monte_carlo.residual_resample. With KLD-sampling, the function is called with the number of particles to select as a second argument ([weights], n) -> [indexes]
+        resample_threshold (float, optional):
+            Particles are resampled when the effective sample size (1/sum(weights^2)) drops below resample_threshold*num_particles. Between resampling, the weights are carried over to the next estimate. 1 (default) resamples at every estimate, 0 never resamples
+        kld_bin_size (float or dict, optional):
+            Enables KLD-sampling: when resampling, the number of particles is adapted to the spread of the particles, with fewer particles when the state estimate is tight and more when it is diffuse. The state space is divided into bins of this size (float for every state, or dict {state: size}). Default: None (fixed number of particles)
+        kld_epsilon (float, optional):
+            Maximum KL divergence between the particles and the estimated state distribution, for KLD-sampling. Default: 0.05
+        kld_delta (float, optional):
+            Probability that the KL divergence exceeds kld_epsilon, for KLD-sampling. Default: 0.01
+        min_particles (int, optional):
+            Minimum number of particles with KLD-sampling. Default: 10
+        max_particles (int, optional):
+            Maximum number of particles with KLD-sampling. Default: num_particles
+        n_workers (int, optional):
+            Number of worker processes used to propagate particles in parallel, for models that are not vectorized (model.is_vectorized is False). Particles are split into a chunk for each worker. The process pool is created on first use and reused for later estimates. With executor, the number of chunks particles are split into (required). Default is None (particles are propagated serially in the current process)
+        executor (concurrent.futures.Executor, optional):
+            Process-based executor (e.g., ProcessPoolExecutor) used to propagate particles in parallel, instead of the pool created for n_workers. n_workers must also be given, as the number of chunks (e.g., the number of workers of the executor). The model must be picklable. Threads share the global numpy random state, so thread-based executors do not give repeatable process noise
+        profile (bool or Profiler, optional):
+            Record the time and number of calls of each phase of estimation (next_state, apply_process_noise, apply_limits, output, likelihood, and resample, when particles are resampled), summed over calls to estimate. Results are stored in filt.profile. Default: False
+
+    Attributes:
+        weights (np.ndarray):
+            Normalized weight of each particle. Equal after resampling
+        profile (Profiler):
+            Time spent in each phase of estimation, when the profile parameter is set. None otherwise
+
+    Note:
+        Particles are weighted with a Gaussian likelihood of the measurements, with standard deviations defined by the measurement_noise parameter (e.g., {'v': 0.01}), times their weight from the previous estimate. If no particle has a finite likelihood (e.g., when measurement_noise is 0), the weights are not changed.
+
+        Particles are resampled into a preallocated buffer, which is reused between estimates. Copy filt.particles to keep them after the next call to estimate.
+
+        For models that are not vectorized, the process noise of each particle is seeded from the global numpy random state, so results are the same whether particles are propagated serially or in parallel (n_workers or executor), with any number of workers. In parallel, the model is pickled and sent to the workers only when it has changed (i.e., is not equal to the model last sent), otherwise workers are sent a hash identifying the model they already have. Particles and their predicted outputs are exchanged through shared memory.
     """
 
     default_parameters = {
         "t0": -1e-99,  # practically 0, but allowing for a 0 first estimate
         "num_particles": None,
-        "resample_fcn": residual_resample,
+        "resample_fcn": "residual",
+        "resample_threshold": 1,
+        "kld_bin_size": None,
+        "kld_epsilon": 0.05,
+        "kld_delta": 0.01,
+        "min_particles": 10,
+        "max_particles": None,
+        "n_workers": None,
+        "executor": None,
+        "profile": False,
     }
 
     def __init__(self, model, x0, **kwargs):
         super().__init__(model, x0, **kwargs)
 
         self._measure = model.output
+        self.profile = get_profiler(self.parameters["profile"])
+        self._pool = None
+        self._pool_workers = None  # Number of workers of the pool
+        self._shared = None  # Shared memory for parallel propagation
+        self._sent_model = None  # Copy of the model last sent to workers
+        self._token = None  # Hash of the pickled model last sent to workers
 
         # Build array inplace
         if isinstance(x0, DictLikeMatrixWrapper) or isinstance(x0, dict):
@@ -73,6 +329,13 @@ class ParticleFilter(state_estimator.StateEstimator):
             sample_gen = x0.sample(self.parameters["num_particles"])
         samples = {k: array(sample_gen.key(k), dtype=float64) for k in x0.keys()}
         self.particles = model.StateContainer(samples)
+        # Buffer for resampled particles (swapped with the particles on resampling)
+        self._buffer = np.empty_like(self.particles.matrix)
+        num_particles = self.parameters["num_particles"]
+        self.weights = np.full(num_particles, 1 / num_particles)
+        self._weighted = False  # True when weights are not equal
+        if self.parameters["max_particles"] is None:
+            self.parameters["max_particles"] = num_particles
 
         if "R" in self.parameters:
             # For backwards compatibility
@@ -120,8 +383,7 @@ class ParticleFilter(state_estimator.StateEstimator):
         # Check Types
         if isinstance(u, dict):
             u = self.model.InputContainer(u)
-        if isinstance(z, dict):
-            z = self.model.OutputContainer(z)
+        z = _as_container(self.model.OutputContainer, z)
 
         # Optimization
         particles = self.particles
@@ -129,15 +391,23 @@ class ParticleFilter(state_estimator.StateEstimator):
         apply_process_noise = self.model.apply_process_noise
         apply_limits = self.model.apply_limits
         output = self._measure
-        # apply_measurement_noise = self.model.apply_measurement_noise
-        noise_params = self.parameters["measurement_noise"]
-        num_particles = self.parameters["num_particles"]
-        # Check which output keys are present (i.e., output of measurement function)
-        measurement_keys = output(
-            self.model.StateContainer(
-                {key: particles[key][0] for key in particles.keys()}
+        resample_fcn = self.parameters["resample_fcn"]
+        if isinstance(resample_fcn, str):
+            if resample_fcn not in resample_functions:
+                raise ValueError(
+                    f"Unsupported resample_fcn {resample_fcn}. Must be one of {list(resample_functions.keys())} or a function"
+                )
+            resample_fcn = resample_functions[resample_fcn]
+        profiler = self.profile
+        if profiler is not None:
+            next_state = profiler.wrap("next_state", next_state)
+            apply_process_noise = profiler.wrap(
+                "apply_process_noise", apply_process_noise
             )
-        ).keys()
+            apply_limits = profiler.wrap("apply_limits", apply_limits)
+            output = profiler.wrap("output", output)
+            resample_fcn = profiler.wrap("resample", resample_fcn)
+        num_particles = self.parameters["num_particles"]
 
         if self.model.is_vectorized:
             # Propagate particles state
@@ -147,40 +417,43 @@ class ParticleFilter(state_estimator.StateEstimator):
                 self.particles = apply_limits(particles)
                 self.t += dt_i
 
-            # Get particle measurements
-            zPredicted = output(self.particles)
+            # Get particle measurements (outputs x particles)
+            z_predicted = _as_container(
+                self.model.OutputContainer, output(self.particles)
+            ).matrix.reshape(len(self.model.outputs), -1)
+        elif (
+            self.parameters["n_workers"] is not None
+            or self.parameters["executor"] is not None
+        ):
+            z_predicted = self._propagate_parallel(t, u, dt)
+            self.t = t
         else:
             # Reserve space (for efficiency)
-            zPredicted = {key: empty(num_particles) for key in measurement_keys}
-            # Propagate and calculate weights
-            for i in range(num_particles):
-                t_i = self.t  # Used to mark time for each particle
-                x = self.model.StateContainer(
-                    {key: particles[key][i] for key in particles.keys()}
-                )
-                while t_i < t:
-                    dt_i = min(dt, t - t_i)
-                    x = next_state(x, u, dt_i)
-                    x = apply_process_noise(x, dt_i)
-                    x = apply_limits(x)
-                    t_i += dt_i
-                for key in particles.keys():
-                    self.particles[key][i] = x[key]
-                z = output(x)
-                for key in measurement_keys:
-                    zPredicted[key][i] = z[key]
+            z_predicted = np.empty((len(self.model.outputs), num_particles))
+            seeds = np.random.randint(2**32, size=num_particles, dtype=np.uint64)
+            # Propagate and predict measurements, in place
+            _propagate(
+                self.model,
+                (next_state, apply_process_noise, apply_limits, output),
+                self.particles.matrix,
+                z_predicted,
+                range(num_particles),
+                self.t,
+                t,
+                u,
+                dt,
+                seeds.tolist(),
+            )
             self.t = t
 
-        # Calculate pdf values
-        pdfs = array(
-            [
-                norm(zPredicted[key], noise_params[key]).logpdf(z[key])
-                for key in zPredicted.keys()
-            ]
-        )
+        if profiler is not None:
+            start = perf_counter()
 
-        # Calculate log weights
-        log_weights = pdfs.sum(0)
+        # Calculate log weights (Gaussian log likelihood of the measurements, times the previous weights)
+        log_weights = self._log_likelihood(z_predicted, z.matrix)
+        if self._weighted:
+            with np.errstate(divide="ignore"):
+                log_weights += np.log(self.weights)
 
         # Scale
         # We subtract the max log weights for numerical stability.
@@ -189,34 +462,249 @@ class ParticleFilter(state_estimator.StateEstimator):
         # this causes problems when trying to sample from the particles.
         # We shift them up by the max log weight (essentially making the max log weight 0) to help avoid that problem.
         # When we normalize the weights by dividing by the sum of all the weights, that constant cancels out.
-        max_log_weight = max(log_weights)
-        scaled_weights = log_weights - max_log_weight
+        max_log_weight = log_weights.max()
+        if np.isfinite(max_log_weight):
+            log_weights -= max_log_weight
 
-        # Convert to weights
-        unnorm_weights = exp(scaled_weights)
+            # Convert to weights
+            weights = np.exp(log_weights, out=log_weights)
 
-        # Normalize
-        total_weight = sum(unnorm_weights)
-        self.weights = unnorm_weights / total_weight
+            # Normalize
+            weights /= weights.sum()
+        else:
+            # No particle has a finite likelihood (e.g., measurement noise of 0)
+            weights = self.weights
+        self.weights = weights
+
+        if profiler is not None:
+            profiler.record("likelihood", perf_counter() - start)
+
+        # Resample only when the effective sample size is too small
+        threshold = self.parameters["resample_threshold"]
+        if threshold < 1 and (
+            threshold <= 0 or 1 / np.dot(weights, weights) >= threshold * num_particles
+        ):
+            self._weighted = True
+            return
 
         # Resample indices
-        indexes = self.parameters["resample_fcn"](self.weights)
+        if self.parameters["kld_bin_size"] is None:
+            indexes = resample_fcn(weights)
+        else:
+            indexes = self._kld_sample(resample_fcn, weights)
+
+        # Resampled particles, into the buffer
+        self._resample(indexes)
+        num_particles = len(indexes)
+        self.parameters["num_particles"] = num_particles
+        self.weights = np.full(num_particles, 1 / num_particles)
+        self._weighted = False
+
+    def _propagate_parallel(self, t: float, u, dt: float) -> np.ndarray:
+        """
+        Propagate the particles of a non-vectorized model to time t in parallel, in chunks. Particles are copied into shared memory, updated in place by the workers, and copied back
+
+        Returns:
+            np.ndarray: Predicted measurements (outputs x particles)
+        """
+        executor = self.parameters["executor"]
+        n_workers = self.parameters["n_workers"]
+        if not isinstance(n_workers, int) or n_workers < 1:
+            raise ValueError(
+                f"n_workers must be a positive integer (the number of chunks, when using executor), was {n_workers}"
+            )
+        if executor is None:
+            executor = self._get_pool(n_workers)
+        profiler = self.profile
+        payload = None
+        if self._sent_model is None or not self._model_unchanged():
+            try:
+                payload = pickle.dumps(self.model)
+            except (pickle.PicklingError, AttributeError, TypeError) as e:
+                raise TypeError(
+                    "The model must be picklable to propagate particles in parallel"
+                ) from e
+            self._sent_model = pickle.loads(payload)
+            self._token = sha1(payload).hexdigest()
+
+        particles = self.particles.matrix
+        n_states, num_particles = particles.shape
+        shape = (n_states + len(self.model.outputs), num_particles)
+        shared = self._get_shared(shape)
+        shared[:n_states] = particles
+
+        seeds = np.random.randint(2**32, size=num_particles, dtype=np.uint64)
+        bounds = np.linspace(0, num_particles, min(num_particles, n_workers) + 1)
+        bounds = bounds.astype(int)
+
+        def submit(start, end, payload):
+            return executor.submit(
+                _propagate_chunk,
+                self._token,
+                payload,
+                self._shm.name,
+                shape,
+                start,
+                end,
+                seeds[start:end].tolist(),
+                self.t,
+                t,
+                u,
+                dt,
+                profiler is not None,
+            )
+
+        chunks = list(zip(bounds[:-1], bounds[1:]))
+        futures = [submit(start, end, payload) for start, end in chunks]
+        for (start, end), future in zip(chunks, futures):
+            propagated, chunk_profile = future.result()
+            if not propagated:
+                # The worker does not have the model (e.g., a new worker)
+                if payload is None:
+                    payload = pickle.dumps(self.model)
+                propagated, chunk_profile = submit(start, end, payload).result()
+            if profiler is not None:
+                profiler.merge(chunk_profile)
+
+        particles[:] = shared[:n_states]
+        return shared[n_states:]
+
+    def _model_unchanged(self) -> bool:
+        """
+        If the model is equal to the model last sent to the workers (i.e., same class and parameters)
+        """
+        try:
+            return bool(self.model == self._sent_model)
+        except ValueError:
+            # Parameters that cannot be compared (e.g., nested arrays) are treated as changed
+            return False
+
+    def _get_pool(self, n_workers: int):
+        """
+        Get the process pool with n_workers workers. The pool is kept and reused for later estimates
+        """
+        if self._pool is None or self._pool_workers != n_workers:
+            if self._pool is not None:
+                self._pool.shutdown()
+            self._pool = ProcessPoolExecutor(max_workers=n_workers)
+            self._pool_workers = n_workers
+        return self._pool
+
+    def _get_shared(self, shape: tuple) -> np.ndarray:
+        """
+        Get an array of the given shape in shared memory. The shared memory is kept and reused while the shape is unchanged, and released with the filter
+        """
+        if self._shared is None or self._shared.shape != shape:
+            if self._shared is not None:
+                self._release_shared()
+            size = int(np.prod(shape)) * np.dtype(float64).itemsize
+            self._shm = SharedMemory(create=True, size=max(size, 1))
+            self._shm_finalizer = weakref.finalize(self, _release, self._shm)
+            self._shared = np.ndarray(shape, dtype=float64, buffer=self._shm.buf)
+        return self._shared
+
+    def _release_shared(self) -> None:
+        self._shared = None
+        self._shm_finalizer()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        # Pools and shared memory cannot be pickled
+        state["_pool"] = None
+        state["_shared"] = None
+        state.pop("_shm", None)
+        state.pop("_shm_finalizer", None)
+        return state
+
+    def _kld_sample(self, resample_fcn, weights: np.ndarray) -> np.ndarray:
+        """
+        KLD-sampling (Fox, 2003): Particles are selected (up to max_particles) until there are enough particles to represent the histogram bins that they occupy, within kld_epsilon (KL divergence)
+
+        Args:
+            resample_fcn (function): Resampling function ([weights], n) -> [indexes]
+            weights (np.ndarray): Normalized weight of each particle
 
-        # Resampled particles
-        samples = [
-            take(self.particles[state], indexes) for state in self.particles.keys()
-        ]
+        Returns:
+            np.ndarray: Index of the particle selected for each new particle
+        """
+        params = self.parameters
+        max_particles = int(params["max_particles"])
+        min_particles = min(int(params["min_particles"]), max_particles)
+        bin_size = params["kld_bin_size"]
+        if isinstance(bin_size, dict):
+            bin_size = [bin_size[key] for key in self.model.states]
+        bin_size = np.reshape(np.asarray(bin_size, dtype=float64), (-1, 1))
+
+        # Bin of each particle
+        bins = np.floor(self.particles.matrix / bin_size)
+        labels = np.unique(bins, axis=1, return_inverse=True)[1].reshape(-1)
+
+        # Candidates, in random order
+        candidates = np.asarray(resample_fcn(weights, max_particles))
+        np.random.shuffle(candidates)
+
+        # Number of bins occupied by the first n candidates, for each n
+        _, first = np.unique(labels[candidates], return_index=True)
+        occupied = np.zeros(len(candidates), dtype=np.intp)
+        occupied[first] = 1
+        occupied = np.cumsum(occupied)
+
+        required = _kld_bound(occupied, params["kld_epsilon"], params["kld_delta"])
+        required = np.clip(required, min_particles, len(candidates))
+        n = int(np.argmax(np.arange(1, len(candidates) + 1) >= required)) + 1
+        return candidates[:n]
+
+    def _log_likelihood(self, z_predicted: np.ndarray, z: np.ndarray) -> np.ndarray:
+        """
+        Gaussian log likelihood of the measurements (z) for each particle, given the predicted measurements (z_predicted), with the standard deviation of each output from measurement_noise
 
-        # Particles as a dictionary
-        self.particles = self.model.StateContainer(array(samples))
+        Args:
+            z_predicted (np.ndarray): Predicted measurements (outputs x particles)
+            z (np.ndarray): Measurements (outputs x 1)
+
+        Returns:
+            np.ndarray: Log likelihood for each particle
+        """
+        noise_params = self.parameters["measurement_noise"]
+        std = np.array([noise_params[key] for key in self.model.outputs], dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Constants: -1/(2*std^2) and -log(std*sqrt(2*pi)) for each output
+            scale = (-0.5 / np.square(std))[:, np.newaxis]
+            offset = -np.log(std).sum() - 0.5 * len(std) * np.log(2 * np.pi)
+            residual = np.subtract(z_predicted, z)
+            np.square(residual, out=residual)
+            residual *= scale
+            log_likelihood = residual.sum(axis=0)
+            log_likelihood += offset
+        return log_likelihood
+
+    def _resample(self, indexes: np.ndarray) -> None:
+        """
+        Replace the particles with the particles at indexes. The resampled particles are written into a preallocated buffer, and the old particle array becomes the buffer for the next resampling
+        """
+        particles = self.particles.matrix
+        buffer = self._buffer
+        if (
+            buffer.shape != (particles.shape[0], len(indexes))
+            or buffer.dtype != particles.dtype
+            or buffer is particles
+        ):
+            buffer = np.empty((particles.shape[0], len(indexes)), dtype=particles.dtype)
+        np.take(particles, indexes, axis=1, out=buffer, mode="clip")
+        self._buffer = particles
+        self.particles = self.model.StateContainer.from_matrix(buffer)
 
     @property
-    def x(self) -> UnweightedSamples:
+    def x(self) -> UncertainData:
         """
-        Getter for property 'x', the current estimated state.
+        Getter for property 'x', the current estimated state. UnweightedSamples after resampling, WeightedSamples otherwise (see resample_threshold)
 
         Example
         -------
         state = observer.x
         """
+        if self._weighted:
+            return WeightedSamples(
+                self.particles, self.weights, _type=self.model.StateContainer
+            )
         return UnweightedSamples(self.particles, _type=self.model.StateContainer)
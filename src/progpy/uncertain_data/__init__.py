@@ -2,7 +2,14 @@
 
 from .uncertain_data import UncertainData
 from .unweighted_samples import UnweightedSamples
+from .weighted_samples import WeightedSamples
 from .scalar_data import ScalarData
 from .multivariate_normal_dist import MultivariateNormalDist
 
-__all__ = ["UncertainData", "UnweightedSamples", "ScalarData", "MultivariateNormalDist"]
+__all__ = [
+    "UncertainData",
+    "UnweightedSamples",
+    "WeightedSamples",
+    "ScalarData",
+    "MultivariateNormalDist",
+]
@@ -1,9 +1,12 @@
 # Copyright © 2021 United States Government as represented by the Administrator of the National Aeronautics and Space Administration. All Rights Reserved.
 
-from numpy import array
+from numpy import array, sqrt
+from numpy.linalg import svd
 from numpy.random import multivariate_normal
+from scipy.stats import norm
 
 from . import UncertainData, UnweightedSamples
+from .uncertain_data import _sample_unit_hypercube
 
 
 class MultivariateNormalDist(UncertainData):
@@ -71,11 +74,18 @@ class MultivariateNormalDist(UncertainData):
             self.__mean = array([i - other for i in self.__mean])
         return self
 
-    def sample(self, num_samples: int = 1) -> UnweightedSamples:
+    def sample(self, num_samples: int = 1, method: str = "random") -> UnweightedSamples:
         if len(self.__mean) != len(self.__labels):
             raise Exception("labels must be provided for each value")
 
-        samples = multivariate_normal(self.__mean, self.__covar, num_samples)
+        if method == "random":
+            samples = multivariate_normal(self.__mean, self.__covar, num_samples)
+        else:
+            # Map points in the unit hypercube to the distribution through the inverse normal CDF
+            # Factor of covariance from SVD (like multivariate_normal), which supports singular covariance
+            u, s, _ = svd(self.__covar)
+            unit = _sample_unit_hypercube(num_samples, len(self.__mean), method)
+            samples = self.__mean + (norm.ppf(unit) * sqrt(s)) @ u.T
         samples = [
             {key: value for (key, value) in zip(self.__labels, x)} for x in samples
         ]
@@ -4,6 +4,7 @@ from typing import Union
 from numpy import array
 
 from . import UncertainData, UnweightedSamples
+from .uncertain_data import _SAMPLE_METHODS
 
 
 class ScalarData(UncertainData):
@@ -71,7 +72,12 @@ class ScalarData(UncertainData):
     def keys(self):
         return self.__state.keys()
 
-    def sample(self, num_samples: int = 1) -> UnweightedSamples:
+    def sample(self, num_samples: int = 1, method: str = "random") -> UnweightedSamples:
+        # All samples are the same, so method only needs to be valid
+        if method not in _SAMPLE_METHODS:
+            raise ValueError(
+                f"Sampling method must be one of {_SAMPLE_METHODS}, was {method}"
+            )
         return UnweightedSamples([self.__state] * num_samples, _type=self._type)
 
     def __str__(self) -> str:
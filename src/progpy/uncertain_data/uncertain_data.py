@@ -3,12 +3,45 @@
 from abc import ABC, abstractmethod, abstractproperty
 from collections import defaultdict
 from matplotlib.figure import Figure
-from numpy import array
+from numpy import array, random
 
 from ..utils.table import print_table_recursive
 from ..visualize import plot_scatter, plot_hist
 from progpy.utils.containers import DictLikeMatrixWrapper
 
+_SAMPLE_METHODS = ("random", "sobol", "halton", "lhs")
+
+
+def _sample_unit_hypercube(num_samples: int, dim: int, method: str) -> array:
+    """Generate points in the unit hypercube [0, 1)^dim using a sampling method
+
+    Args:
+        num_samples (int): Number of points
+        dim (int): Number of dimensions
+        method (str): Sampling method, one of 'random' (pseudo-random), 'sobol' or 'halton' (scrambled quasi-Monte Carlo sequences), or 'lhs' (Latin hypercube)
+
+    Returns:
+        array: Points, with shape (num_samples, dim)
+    """
+    if method == "random":
+        return random.random_sample((num_samples, dim))
+    if method not in _SAMPLE_METHODS:
+        raise ValueError(
+            f"Sampling method must be one of {_SAMPLE_METHODS}, was {method}"
+        )
+
+    from scipy.stats import qmc
+
+    # Seeded from numpy's global random state, so results are repeatable with numpy.random.seed
+    seed = random.randint(2**32, dtype="uint64")
+    if method == "sobol":
+        sampler = qmc.Sobol(dim, seed=seed)
+    elif method == "halton":
+        sampler = qmc.Halton(dim, seed=seed)
+    else:
+        sampler = qmc.LatinHypercube(dim, seed=seed)
+    return sampler.random(num_samples)
+
 
 class UncertainData(ABC):
     """
@@ -19,11 +52,17 @@ class UncertainData(ABC):
         self._type = _type
 
     @abstractmethod
-    def sample(self, nSamples: int = 1):
+    def sample(self, nSamples: int = 1, method: str = "random"):
         """Generate samples from data
 
         Args:
             nSamples (int, optional): Number of samples to generate. Defaults to 1.
+            method (str, optional): Sampling method. Defaults to 'random'. One of:\n
+                * *random*: Pseudo-random samples\n
+                * *sobol*: Scrambled Sobol' sequence (quasi-Monte Carlo). Balance properties are best when nSamples is a power of 2\n
+                * *halton*: Scrambled Halton sequence (quasi-Monte Carlo)\n
+                * *lhs*: Latin hypercube sampling\n
+                Quasi-Monte Carlo and Latin hypercube samples cover the distribution more evenly than pseudo-random samples, so statistics of results (e.g., time of event percentiles) converge with fewer samples
 
         Returns:
             samples (UnweightedSamples): Array of nSamples samples
@@ -32,6 +71,7 @@ class UncertainData(ABC):
             ::
 
                 samples = data.samples(100)
+                samples = data.samples(128, method='sobol')
         """
 
     @property
@@ -8,6 +8,7 @@ from warnings import warn
 from progpy.utils.containers import DictLikeMatrixWrapper
 
 from . import UncertainData
+from .uncertain_data import _sample_unit_hypercube
 
 
 class UnweightedSamples(UncertainData, UserList):
@@ -94,9 +95,18 @@ class UnweightedSamples(UncertainData, UserList):
     def __reduce__(self):
         return (UnweightedSamples, (self.data,))
 
-    def sample(self, num_samples: int = 1, replace: bool = True) -> "UnweightedSamples":
-        # Completely random resample
-        indices = random.choice(len(self.data), int(num_samples), replace=replace)
+    def sample(
+        self, num_samples: int = 1, replace: bool = True, method: str = "random"
+    ) -> "UnweightedSamples":
+        if method == "random":
+            # Completely random resample
+            indices = random.choice(len(self.data), int(num_samples), replace=replace)
+        elif not replace:
+            raise ValueError("replace=False is only supported for method 'random'")
+        else:
+            # Stratified resample - every sample is selected close to num_samples/len(self) times
+            unit = _sample_unit_hypercube(int(num_samples), 1, method)
+            indices = (unit[:, 0] * len(self.data)).astype(int)
         return UnweightedSamples([self.data[i] for i in indices], _type=self._type)
 
     def keys(self) -> list:
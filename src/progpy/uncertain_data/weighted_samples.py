@@ -0,0 +1,216 @@
+# Copyright © 2021 United States Government as represented by the Administrator of the National Aeronautics and Space Administration. All Rights Reserved.
+
+from collections import UserList
+from collections.abc import Iterable
+import numpy as np
+
+from progpy.utils.containers import DictLikeMatrixWrapper
+
+from . import UncertainData
+from .unweighted_samples import UnweightedSamples
+from .uncertain_data import _sample_unit_hypercube
+
+
+class WeightedSamples(UncertainData, UserList):
+    """
+    .. versionadded:: 1.8.0
+
+    Uncertain Data represented by a set of weighted samples (e.g., the particles of a particle filter). Objects of this class can be treated like a list where samples[n] returns the nth sample (Dict). Statistics (mean, covariance, median, percentage in bounds) are weighted, and sample() draws samples with probability proportional to their weight. Samples are not added or removed after construction, since each has a corresponding weight.
+
+    Args:
+        samples (array, dict, or model.*Container, optional): array of samples. Defaults to empty array.\n
+            If dict, must be of the form of {key: [value, ...], ...}\n
+            If list, must be of the form of [{key: value, ...}, ...]\n
+            If InputContainer, OutputContainer, or StateContainer, must be of the form of *Container({'key': value, ...})
+        weights (array, optional): Weight of each sample. Normalized to sum to 1. Defaults to equal weights.
+    """
+
+    def __init__(self, samples: list = [], weights=None, _type=dict):
+        super().__init__(_type)
+        if isinstance(samples, dict) or isinstance(samples, DictLikeMatrixWrapper):
+            # Is in form of {key: [value, ...], ...}
+            # Convert to array of samples
+            if len(samples.keys()) == 0:
+                self.data = []  # is empty
+            else:
+                n_samples = len(list(samples.values())[0])  # Number of samples
+                self.data = [
+                    {key: value[i] for key, value in samples.items()}
+                    for i in range(n_samples)
+                ]
+        elif isinstance(samples, Iterable):
+            # is in form of [{key: value, ...}, ...]
+            self.data = list(samples)
+        else:
+            raise ValueError(
+                "Invalid input. Must be list or dict, was {}".format(type(samples))
+            )
+
+        if weights is None:
+            weights = np.ones(len(self.data))
+        weights = np.array(weights, dtype=np.float64).reshape(-1)
+        if len(weights) != len(self.data):
+            raise ValueError(
+                "Must have one weight for each sample. Had {} weights for {} samples".format(
+                    len(weights), len(self.data)
+                )
+            )
+        if np.any(weights < 0):
+            raise ValueError("Weights must be non-negative")
+        if len(weights) > 0:
+            total = weights.sum()
+            if total <= 0:
+                raise ValueError("Weights must not all be zero")
+            weights /= total
+        self.weights = weights
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, WeightedSamples)
+            and self.data == other.data
+            and np.array_equal(self.weights, other.weights)
+        )
+
+    def __getitem__(self, n):
+        datem = self.data[n]
+        return self._type(datem) if datem is not None else None
+
+    def __shift(self, other) -> "WeightedSamples":
+        result = [{k: v + other for k, v in datem.items()} for datem in self.data]
+        return WeightedSamples(result, self.weights, _type=self._type)
+
+    def __add__(self, other: int) -> "UncertainData":
+        if other == 0:
+            return self
+        return self.__shift(other)
+
+    def __radd__(self, other: int) -> "UncertainData":
+        return self.__add__(other)
+
+    def __iadd__(self, other: int) -> "UncertainData":
+        if other != 0:
+            for datem in self.data:
+                for k in datem:
+                    datem[k] += other
+        return self
+
+    def __sub__(self, other: int) -> "UncertainData":
+        if other == 0:
+            return self
+        return self.__shift(-other)
+
+    def __rsub__(self, other: int) -> "UncertainData":
+        return self.__sub__(other)
+
+    def __isub__(self, other: int) -> "UncertainData":
+        if other != 0:
+            for datem in self.data:
+                for k in datem:
+                    datem[k] -= other
+        return self
+
+    def __reduce__(self):
+        return (WeightedSamples, (self.data, self.weights))
+
+    def sample(
+        self, num_samples: int = 1, replace: bool = True, method: str = "random"
+    ) -> UnweightedSamples:
+        if method == "random":
+            # Random resample, with probability proportional to weight
+            indices = np.random.choice(
+                len(self.data), int(num_samples), replace=replace, p=self.weights
+            )
+        elif not replace:
+            raise ValueError("replace=False is only supported for method 'random'")
+        else:
+            # Stratified resample - every sample is selected close to num_samples*weight times
+            unit = _sample_unit_hypercube(int(num_samples), 1, method)
+            cumulative = np.cumsum(self.weights)
+            cumulative[-1] = 1.0  # Avoid round-off error
+            indices = np.searchsorted(cumulative, unit[:, 0], side="right")
+        return UnweightedSamples([self.data[i] for i in indices], _type=self._type)
+
+    def keys(self) -> list:
+        if len(self.data) == 0:
+            return []  # is empty
+        return self.data[0].keys()
+
+    def key(self, key) -> list:
+        """Return samples for given key
+
+        Args:
+            key (str): key
+
+        Returns:
+            list: list of values for given key
+        """
+        return [sample[key] for sample in self.data]
+
+    def __values(self) -> np.ndarray:
+        # Samples as an array (keys x samples)
+        return np.array(
+            [[sample[key] for sample in self.data] for key in self.keys()],
+            dtype=np.float64,
+        ).reshape(len(self.keys()), len(self.data))
+
+    @property
+    def median(self) -> dict:
+        # Weighted geometric median: the sample with the smallest weighted sum of squared distances to all samples
+        values = self.__values()
+        centered = values - values @ self.weights[:, np.newaxis]
+        # sum_j w_j |x_i - x_j|^2 = |x_i - mean|^2 + sum_j w_j |x_j - mean|^2 (second term is the same for every i)
+        total_dist = np.square(centered).sum(axis=0)
+        total_dist[self.weights == 0] = np.inf  # Only samples with weight
+        return self._type(self[int(np.argmin(total_dist))])
+
+    @property
+    def mean(self) -> dict:
+        values = self.__values()
+        return self._type(
+            {key: values[i] @ self.weights for i, key in enumerate(self.keys())}
+        )
+
+    @property
+    def cov(self) -> np.ndarray:
+        if len(self.data) == 0:
+            return [[]]
+        return np.cov(self.__values(), aweights=self.weights)
+
+    @property
+    def ess(self) -> float:
+        """The effective sample size of the weighted samples, i.e., the number of equally weighted samples that would give the same variance of estimates (1/sum(weights^2))
+
+        Returns:
+            float: Effective sample size
+        """
+        return 1 / np.square(self.weights).sum()
+
+    def __str__(self):
+        return "WeightedSamples({}, weights={})".format(self.data, self.weights)
+
+    def percentage_in_bounds(self, bounds, keys: list = None) -> dict:
+        if not keys:
+            keys = self.keys()
+        if isinstance(keys, str):
+            keys = [keys]
+        if isinstance(bounds, list):
+            bounds = {key: bounds for key in self.keys()}
+        if not isinstance(bounds, dict) or all(
+            [isinstance(b, list) and len(b) == 2 for b in bounds]
+        ):
+            raise TypeError(
+                "Bounds must be list [lower, upper] or dict (key: [lower, upper]), was {}".format(
+                    type(bounds)
+                )
+            )
+        values = self.__values()
+        all_keys = list(self.keys())
+        return {
+            key: float(
+                self.weights[
+                    (values[all_keys.index(key)] < bounds[key][1])
+                    & (values[all_keys.index(key)] > bounds[key][0])
+                ].sum()
+            )
+            for key in keys
+        }
@@ -3,3 +3,4 @@
 
 from .progress_bar import ProgressBar
 from .table import print_table_recursive
+from .profiling import Profiler
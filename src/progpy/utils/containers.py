@@ -1,30 +1,51 @@
 # Copyright © 2021 United States Government as represented by the Administrator of the
 # National Aeronautics and Space Administration.  All Rights Reserved.
 
+from functools import lru_cache
 import numpy as np
 import pandas as pd
+from types import MappingProxyType
 from typing import Union
 from warnings import warn
 
 int_fix = lambda x: np.float64(x) if isinstance(x, (int, type(None))) else x
 
 
+@lru_cache(maxsize=1024)
+def _key_index(keys: tuple) -> tuple:
+    """
+    Keys and map from each key to its row, shared by every container with the same keys. Both are read-only (a tuple and a mapping proxy); containers adding or removing keys get new ones
+    """
+    return keys, MappingProxyType({key: i for i, key in enumerate(keys)})
+
+
 class DictLikeMatrixWrapper:
     """
     A container that behaves like a dictionary, but is backed by a numpy array, which is itself directly accessible. This is used for model states, inputs, and outputs- and enables efficient matrix operations.
 
+    The map from each key to its row is computed once for each set of keys and shared by containers with the same keys, so access by key is O(1).
+
     Arguments:
         keys -- list: The keys of the dictionary. e.g., model.states or model.inputs
         data -- dict or numpy array: The contained data (e.g., :term:`input`, :term:`state`, :term:`output`). If numpy array should be column vector in same order as keys
     """
 
+    __slots__ = ("_keys", "_index", "_matrix", "_frame")
+
+    # Keys and map of key to row for subclasses with fixed keys (e.g., model.StateContainer), see _key_index
+    _shared_keys = None
+    _shared_index = None
+
     def __init__(self, keys: list, data: Union[dict, np.array]):
         """
         Initializes the container
         """
-        if not isinstance(keys, list):
-            keys = list(keys)  # creates list with keys
-        self._keys = keys.copy()
+        if keys is self._shared_keys:
+            self._keys = keys
+            self._index = self._shared_index
+        else:
+            self._keys, self._index = _key_index(tuple(keys))
+        keys = self._keys
         if isinstance(data, np.matrix):
             self._matrix = np.array(data)
             if np.issubdtype(data.dtype, (np.integer)):
@@ -34,34 +55,66 @@ class DictLikeMatrixWrapper:
                 data = np.array(data, dtype=np.float64)
         elif isinstance(data, np.ndarray):
             if data.ndim == 1:
-                data = data[np.newaxis].T
-            if np.issubdtype(data.dtype, np.integer):
+                data = data[:, np.newaxis]
+            kind = data.dtype.kind
+            if kind in "iu":
                 # If integer, switch to float
                 # Using int type will force results to remain ints (so if you add float to it
                 # then there will be an error or it will again round to int
                 data = np.array(data, dtype=np.float64)
-            elif np.issubdtype(data.dtype, np.dtype("O")):
+            elif kind == "O":
                 # if "object" (e.g., includes DiscreteState or None)
                 # Make sure each element if float or object
                 for i in range(data.shape[0]):
                     for j in range(data.shape[1]):
                         data[i][j] = int_fix(data[i][j])
             self._matrix = data
+        elif isinstance(data, DictLikeMatrixWrapper) and data._keys == keys:
+            # Same keys, rows are aligned
+            self._matrix = data._matrix.copy()
         elif isinstance(data, (dict, DictLikeMatrixWrapper)):
-            # ravel is used to prevent vectorized case, where data[key] returns multiple values,  from resulting in a 3D matrix
-            self._matrix = np.array(
-                [
-                    np.ravel([int_fix(data[key])])
-                    if key in data
-                    else [np.float64("nan")]
-                    for key in keys
-                ]
-            )
+            values = [data[key] if key in data else np.nan for key in keys]
+            try:
+                # Fast path for numbers (or equal length arrays, in the vectorized case)
+                matrix = np.array(values, dtype=np.float64)
+            except (TypeError, ValueError):
+                # e.g., DiscreteState or mixed values
+                matrix = None
+            if matrix is None or matrix.ndim > 2:
+                # ravel is used to prevent vectorized case, where data[key] returns multiple values,  from resulting in a 3D matrix
+                matrix = np.array([np.ravel([int_fix(value)]) for value in values])
+            elif matrix.ndim == 1:
+                matrix = matrix[:, np.newaxis]
+            self._matrix = matrix
         else:
             raise TypeError(
                 f"Data must be a dictionary or numpy array, not {type(data)}"
             )
 
+    @classmethod
+    def from_matrix(cls, matrix: np.ndarray, keys: list = None):
+        """
+        Create a container directly from a 2D array with one row per key (in the order of keys), without validation or conversion. The array is not copied. This is faster than the constructor, for use when the array is known to be aligned (e.g., the result of a matrix operation on another container)
+
+        Arguments:
+            matrix -- numpy array: Array of shape (len(keys), n), with float values
+            keys -- list, optional: The keys of the dictionary. Defaults to the keys of the container class (e.g., model.states for model.StateContainer)
+
+        Returns: container of type cls
+        """
+        container = cls.__new__(cls)
+        if keys is None:
+            if cls._shared_keys is None:
+                raise TypeError(
+                    "keys must be provided for containers without fixed keys"
+                )
+            container._keys = cls._shared_keys
+            container._index = cls._shared_index
+        else:
+            container._keys, container._index = _key_index(tuple(keys))
+        container._matrix = matrix
+        return container
+
     @property
     def matrix(self) -> np.array:
         """
@@ -108,24 +161,33 @@ class DictLikeMatrixWrapper:
         get all values associated with a key, ex: all values of 'i'
         """
         # Disable deprecation warnings for internal progpy code.
-        row = self._matrix[self._keys.index(key)]  # creates list from a row of matrix
-        if len(row) == 1:  # list contains 1 value, returns that value (non-vectorized)
-            return row[0]
-        return row  # returns entire row/list (vectorized case)
+        try:
+            index = self._index[key]
+        except KeyError:
+            raise ValueError(f"'{key}' is not in list") from None
+        matrix = self._matrix
+        if matrix.shape[1] == 1:
+            # row contains 1 value, returns that value (non-vectorized)
+            return matrix[index, 0]
+        return matrix[index]  # returns entire row/list (vectorized case)
 
     def __setitem__(self, key: str, value: int) -> None:
         """
         sets a row at the key given
         """
-        index = self._keys.index(key)  # the int value index for the key given
-        self._matrix[index] = np.atleast_1d(value)
+        try:
+            index = self._index[key]  # the int value index for the key given
+        except KeyError:
+            raise ValueError(f"'{key}' is not in list") from None
+        self._matrix[index] = value
 
     def __delitem__(self, key: str) -> None:
         """
         removes row associated with key
         """
-        self._matrix = np.delete(self._matrix, self._keys.index(key), axis=0)
-        self._keys.remove(key)
+        self._matrix = np.delete(self._matrix, self._index[key], axis=0)
+        # Keys are shared, so a new list is created
+        self._keys, self._index = _key_index(tuple(k for k in self._keys if k != key))
 
     def __add__(self, other: "DictLikeMatrixWrapper") -> "DictLikeMatrixWrapper":
         """
@@ -201,7 +263,7 @@ class DictLikeMatrixWrapper:
         """
         gets the list of values associated with the key given
         """
-        if key in self._keys:
+        if key in self._index:
             return self[key]
         return default
 
@@ -209,11 +271,15 @@ class DictLikeMatrixWrapper:
         """
         creates copy of object
         """
-        return DictLikeMatrixWrapper(self._keys, self._matrix.copy())
+        container = DictLikeMatrixWrapper.__new__(DictLikeMatrixWrapper)
+        container._keys = self._keys
+        container._index = self._index
+        container._matrix = self._matrix.copy()
+        return container
 
-    def keys(self) -> list:
+    def keys(self) -> tuple:
         """
-        returns list of keys for container
+        returns tuple of keys for container (shared and immutable, use list(keys) for a list that can be modified)
         """
         return self._keys
 
@@ -246,12 +312,12 @@ class DictLikeMatrixWrapper:
         merges other DictLikeMatrixWrapper, updating values
         """
         for key in other.keys():
-            if key in self._keys:  # checks to see if every key in 'other' is in 'self'
+            if key in self._index:  # checks to see if every key in 'other' is in 'self'
                 # Existing key
                 self[key] = other[key]
             else:  # else it isn't it is appended to self._keys list
-                # A new key!
-                self._keys.append(key)
+                # A new key! Keys are shared, so a new list is created
+                self._keys, self._index = _key_index((*self._keys, key))
                 self._matrix = np.vstack((self._matrix, np.array([other[key]])))
 
     def __contains__(self, key: str) -> bool:
@@ -265,7 +331,7 @@ class DictLikeMatrixWrapper:
         >>> 'a' in dlmw
         True
         """
-        return key in self._keys
+        return key in self._index
 
     def __repr__(self) -> str:
         """
@@ -285,3 +351,14 @@ InputContainer = DictLikeMatrixWrapper
 StateContainer = DictLikeMatrixWrapper
 
 OutputContainer = DictLikeMatrixWrapper
+
+
+def _as_container(container_cls, value):
+    # value as a container with rows aligned with the keys of container_cls (value itself if already aligned)
+    if value is None:
+        value = {}
+    if isinstance(value, DictLikeMatrixWrapper):
+        keys = container_cls._shared_keys
+        if value._keys is keys or value._keys == keys:
+            return value
+    return container_cls(value)
@@ -1,7 +1,23 @@
 # Copyright © 2021 United States Government as represented by the Administrator of the
 # National Aeronautics and Space Administration.  All Rights Reserved.
 
+import numpy as np
 from scipy.integrate import solve_ivp
+from warnings import warn
+
+from progpy.exceptions import ProgModelConvergenceWarning
+
+
+def _as_matrix(container_cls, value) -> np.ndarray:
+    # Column array of value, aligned with the keys of container_cls
+    if isinstance(value, container_cls):
+        return value.matrix
+    return container_cls(value).matrix
+
+
+def _dx_matrix(model, x, u) -> np.ndarray:
+    # Evaluate model.dx at x, returning the derivative as an aligned column array
+    return _as_matrix(model.StateContainer, model.dx(x, u))
 
 
 def euler_next_state(model, x, u, dt: float):
@@ -32,8 +48,8 @@ def euler_next_state(model, x, u, dt: float):
     --------
     PrognosticsModel.next_state
     """
-    dx = model.dx(x, u)
-    return model.StateContainer({key: x[key] + dx[key] * dt for key in dx.keys()})
+    x0 = _as_matrix(model.StateContainer, x)
+    return model.StateContainer.from_matrix(x0 + dt * _dx_matrix(model, x, u))
 
 
 def rk4_next_state(model, x, u, dt: float):
@@ -64,25 +80,271 @@ def rk4_next_state(model, x, u, dt: float):
     --------
     PrognosticsModel.next_state
     """
-    dx1 = model.StateContainer(model.dx(x, u))
-    x2 = model.StateContainer(x.matrix + dx1.matrix * dt / 2)
-    dx2 = model.dx(x2, u)
+    state_cls = model.StateContainer
+    x0 = _as_matrix(state_cls, x)
 
-    x3 = model.StateContainer(
-        {key: x[key] + dt * dx_i / 2 for key, dx_i in dx2.items()}
-    )
-    dx3 = model.dx(x3, u)
+    k = _dx_matrix(model, x, u)
+    shape = np.broadcast_shapes(x0.shape, k.shape)
+    dtype = np.result_type(x0, k, float)
+
+    # Weighted sum of the stage derivatives: k1/2 + k2 + k3 + k4/2
+    k_sum = np.empty(shape, dtype=dtype)
+    np.multiply(k, 0.5, out=k_sum)
+
+    # A single buffer is reused for the intermediate state of every stage
+    stage = np.empty(shape, dtype=dtype)
+    np.multiply(k, dt / 2, out=stage)
+    stage += x0
+    x_stage = state_cls.from_matrix(stage)
+
+    k = _dx_matrix(model, x_stage, u)
+    k_sum += k
+    np.multiply(k, dt / 2, out=stage)
+    stage += x0
+
+    k = _dx_matrix(model, x_stage, u)
+    k_sum += k
+    np.multiply(k, dt, out=stage)
+    stage += x0
+
+    k = _dx_matrix(model, x_stage, u)
+    k_sum += 0.5 * k
+
+    k_sum *= dt / 3
+    k_sum += x0
+    return state_cls.from_matrix(k_sum)
+
+
+def finite_difference_jacobian(model, x, u) -> np.ndarray:
+    """
+    .. versionadded:: 1.8.0
+
+    Jacobian of model.dx with respect to state, estimated by forward finite differences. Each state is perturbed in turn, for every column of a vectorized state at once, so this costs len(model.states) + 1 calls to dx
+
+    Parameters
+    ----------
+    x : StateContainer
+        state, with keys defined by model.states \n
+        e.g., x = m.StateContainer({'abc': 332.1, 'def': 221.003}) given states = ['abc', 'def']
+    u : InputContainer
+        Inputs, with keys defined by model.inputs \n
+        e.g., u = m.InputContainer({'i':3.2}) given inputs = ['i']
+
+    Returns
+    -------
+    jacobian : np.ndarray
+        Matrix where element [i, j] is the derivative of dx[i] with respect to x[j], with states in the order of model.states. Shape is (n_states, n_states), or (n_states, n_states, n_samples) for a vectorized state with more than one column
+
+    See Also
+    --------
+    PrognosticsModel.jacobian
+    """
+    state_cls = model.StateContainer
+    x0 = np.asarray(_as_matrix(state_cls, x), dtype=np.float64)
+    f0 = _dx_matrix(model, state_cls.from_matrix(x0), u)
+    n_states, n_samples = x0.shape
+    jac = np.empty((n_states, n_states, n_samples))
+    for j in range(n_states):
+        x_j = x0.copy()
+        x_j[j] += np.sqrt(np.finfo(np.float64).eps) * np.maximum(np.abs(x0[j]), 1)
+        h = x_j[j] - x0[j]  # Step actually taken, after rounding
+        jac[:, j] = (_dx_matrix(model, state_cls.from_matrix(x_j), u) - f0) / h
+    if n_samples == 1:
+        return jac[:, :, 0]
+    return jac
 
-    x4 = model.StateContainer({key: x[key] + dt * dx_i for key, dx_i in dx3.items()})
-    dx4 = model.dx(x4, u)
 
-    x = model.StateContainer(
-        {
-            key: x[key] + dt / 3 * (dx1[key] / 2 + dx2[key] + dx3[key] + dx4[key] / 2)
-            for key in dx1.keys()
-        }
+def _stacked_jacobian(model, x, u) -> np.ndarray:
+    # model.jacobian as a stack of matrices, one for each column of x: shape (n_samples or 1, n_states, n_states)
+    jac = np.asarray(model.jacobian(x, u), dtype=np.float64)
+    if jac.ndim == 2:
+        return jac[np.newaxis]
+    return np.moveaxis(jac, -1, 0)
+
+
+def _implicit_config(model) -> tuple:
+    config = model.parameters.get("integrator_config", {})
+    return (
+        config.get("rtol", 1e-6),
+        config.get("atol", 1e-9),
+        config.get("max_iter", 10),
     )
-    return x
+
+
+def backward_euler_next_state(model, x, u, dt: float):
+    """
+    .. versionadded:: 1.8.0
+
+    State transition equation using backward (implicit) euler integration: Solves x_next = x + dt * dx(x_next, u) for x_next using Newton's method. The Jacobian (see :py:meth:`PrognosticsModel.jacobian`) is evaluated once at x and reused for every iteration.
+
+    Backward euler is stable for stiff models at step sizes where explicit methods (e.g., euler, rk4) diverge. It is only first order accurate.
+
+    Newton iterations stop when the update is below rtol * abs(x_next) + atol for every state, or after max_iter iterations. These can be set using the model parameter integrator_config (default: {'rtol': 1e-6, 'atol': 1e-9, 'max_iter': 10}).
+
+    Parameters
+    ----------
+    x : StateContainer
+        state, with keys defined by model.states \n
+        e.g., x = m.StateContainer({'abc': 332.1, 'def': 221.003}) given states = ['abc', 'def']
+    u : InputContainer
+        Inputs, with keys defined by model.inputs \n
+        e.g., u = m.InputContainer({'i':3.2}) given inputs = ['i']
+    dt : float
+        Timestep size in seconds (≥ 0) \n
+        e.g., dt = 0.1
+
+    Returns
+    -------
+    x : StateContainer
+        Next state, with keys defined by model.states
+        e.g., x = m.StateContainer({'abc': 332.1, 'def': 221.003}) given states = ['abc', 'def']
+
+    Warns
+    -----
+    ProgModelConvergenceWarning
+        If Newton's method did not converge in max_iter iterations. The last iterate is returned
+
+    See Also
+    --------
+    PrognosticsModel.next_state, PrognosticsModel.jacobian
+    """
+    rtol, atol, max_iter = _implicit_config(model)
+    state_cls = model.StateContainer
+    x0 = _as_matrix(state_cls, x)
+    f = _dx_matrix(model, x, u)
+
+    # Inverse of the Newton matrix (I - dt*J) for each column, computed once per step
+    jac = _stacked_jacobian(model, x, u)
+    newton_inv = np.linalg.inv(np.eye(jac.shape[-1]) - dt * jac)
+
+    # Start from the explicit euler step
+    x_next = x0 + dt * f
+    x_container = state_cls.from_matrix(x_next)
+    for _ in range(max_iter):
+        residual = x_next - x0 - dt * _dx_matrix(model, x_container, u)
+        delta = np.matmul(newton_inv, residual.T[..., np.newaxis])[..., 0].T
+        x_next -= delta
+        if np.all(np.abs(delta) <= rtol * np.abs(x_next) + atol):
+            break
+    else:
+        warn(
+            f"Backward euler did not converge in {max_iter} iterations (dt={dt}). Consider reducing dt or increasing integrator_config['max_iter']",
+            ProgModelConvergenceWarning,
+        )
+    return x_container
+
+
+# ROS2 coefficient (L-stable, second order)
+_ROS2_GAMMA = 1 + 1 / np.sqrt(2)
+
+
+def rosenbrock_next_state(model, x, u, dt: float):
+    """
+    .. versionadded:: 1.8.0
+
+    State transition equation using the second order, L-stable Rosenbrock method ROS2 (Verwer et al., 1999). Rosenbrock methods are linearly implicit: each step solves two linear systems with the Jacobian (see :py:meth:`PrognosticsModel.jacobian`) instead of iterating to convergence, so the cost of a step is fixed.
+
+    Like backward euler, ROS2 is stable for stiff models at step sizes where explicit methods (e.g., euler, rk4) diverge, but is second order accurate. Accuracy depends on the quality of the Jacobian.
+
+    Parameters
+    ----------
+    x : StateContainer
+        state, with keys defined by model.states \n
+        e.g., x = m.StateContainer({'abc': 332.1, 'def': 221.003}) given states = ['abc', 'def']
+    u : InputContainer
+        Inputs, with keys defined by model.inputs \n
+        e.g., u = m.InputContainer({'i':3.2}) given inputs = ['i']
+    dt : float
+        Timestep size in seconds (≥ 0) \n
+        e.g., dt = 0.1
+
+    Returns
+    -------
+    x : StateContainer
+        Next state, with keys defined by model.states
+        e.g., x = m.StateContainer({'abc': 332.1, 'def': 221.003}) given states = ['abc', 'def']
+
+    See Also
+    --------
+    PrognosticsModel.next_state, PrognosticsModel.jacobian
+    """
+    state_cls = model.StateContainer
+    x0 = _as_matrix(state_cls, x)
+    jac = _stacked_jacobian(model, x, u)
+    newton_inv = np.linalg.inv(np.eye(jac.shape[-1]) - _ROS2_GAMMA * dt * jac)
+
+    def solve(rhs):
+        # Solve (I - gamma*dt*J) k = rhs for each column
+        rhs = np.broadcast_to(rhs, np.broadcast_shapes(rhs.shape, x0.shape))
+        return np.matmul(newton_inv, rhs.T[..., np.newaxis])[..., 0].T
+
+    k1 = solve(_dx_matrix(model, x, u))
+    x1 = state_cls.from_matrix(x0 + dt * k1)
+    k2 = solve(_dx_matrix(model, x1, u) - 2 * k1)
+    return state_cls.from_matrix(x0 + dt * (1.5 * k1 + 0.5 * k2))
+
+
+# Dormand-Prince (RK5(4)) coefficients
+_DP_A = (
+    (),
+    (1 / 5,),
+    (3 / 40, 9 / 40),
+    (44 / 45, -56 / 15, 32 / 9),
+    (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+    (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+    (35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84),
+)
+# Difference between 5th and 4th order weights, used to estimate error
+_DP_E = (
+    71 / 57600,
+    0,
+    -71 / 16695,
+    71 / 1920,
+    -17253 / 339200,
+    22 / 525,
+    -1 / 40,
+)
+
+
+def dormand_prince_step(model, x, u, dt: float):
+    """
+    .. versionadded:: 1.8.0
+
+    Single step of the embedded Dormand-Prince Runge-Kutta pair (RK5(4)), used for adaptive time stepping. Calculates the next state (5th order) and an estimate of its local error (the difference from the 4th order solution). Noise and limits are not applied
+
+    Parameters
+    ----------
+    x : StateContainer
+        state, with keys defined by model.states \n
+        e.g., x = m.StateContainer({'abc': 332.1, 'def': 221.003}) given states = ['abc', 'def']
+    u : InputContainer
+        Inputs, with keys defined by model.inputs \n
+        e.g., u = m.InputContainer({'i':3.2}) given inputs = ['i']
+    dt : float
+        Timestep size in seconds (≥ 0) \n
+        e.g., dt = 0.1
+
+    Returns
+    -------
+    x : StateContainer
+        Next state, with keys defined by model.states
+        e.g., x = m.StateContainer({'abc': 332.1, 'def': 221.003}) given states = ['abc', 'def']
+    err : np.ndarray
+        Estimated local error for each state (same shape as x.matrix)
+
+    See Also
+    --------
+    PrognosticsModel.simulate_to_threshold
+    """
+    state_cls = model.StateContainer
+    x0 = _as_matrix(state_cls, x)
+    k = [_dx_matrix(model, x, u)]
+    for a_i in _DP_A[1:]:
+        x_i = x0 + dt * sum(a_ij * k_j for a_ij, k_j in zip(a_i, k) if a_ij != 0)
+        k.append(_dx_matrix(model, state_cls.from_matrix(x_i), u))
+    # Last stage is evaluated at the 5th order solution
+    err = dt * sum(e_i * k_i for e_i, k_i in zip(_DP_E, k) if e_i != 0)
+    return state_cls.from_matrix(x_i), err
 
 
 class SciPyIntegrateNextState:
@@ -129,4 +391,9 @@ class SciPyIntegrateNextState:
         return m.StateContainer(next_state.y.T[-1])
 
 
-next_state_functions = {"euler": euler_next_state, "rk4": rk4_next_state}
+next_state_functions = {
+    "euler": euler_next_state,
+    "rk4": rk4_next_state,
+    "backward_euler": backward_euler_next_state,
+    "rosenbrock": rosenbrock_next_state,
+}
@@ -128,6 +128,13 @@ class PrognosticsModelParameters(UserDict):
                 return
             raise ValueError(f"Unsupported integration method {method}")
 
+        if key == "state_limit_warnings":
+            if value not in ("always", "once", "counted", "off"):
+                raise ValueError(
+                    f"Unsupported state_limit_warnings {value}. Must be 'always', 'once', 'counted', or 'off'"
+                )
+            self._m._state_limit_warnings = value
+
         if key == "process_noise" or key == "process_noise_dist":
             if callable(self["process_noise"]):  # Provided a function
                 self._m.apply_process_noise = types.MethodType(
@@ -0,0 +1,140 @@
+# Copyright © 2021 United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration.  All Rights Reserved.
+
+from contextlib import contextmanager
+from time import perf_counter
+
+
+class Profiler:
+    """
+    .. versionadded:: 1.8.0
+
+    Records the cumulative wall time and number of calls for each phase of a simulation, prediction, or state estimation (e.g., 'next_state', 'apply_limits', 'output'). Used by passing profile=True to :py:meth:`progpy.PrognosticsModel.simulate_to_threshold`, :py:meth:`progpy.predictors.MonteCarlo.predict`, or :py:class:`progpy.state_estimators.ParticleFilter`. A Profiler can also be passed in directly, to accumulate results over several calls.
+
+    Subclasses can override :py:meth:`record` to act as a hook (e.g., forwarding measurements to another tool).
+
+    Example:
+        >>> from progpy.models import BatteryCircuit
+        >>> m = BatteryCircuit()
+        >>> def future_load(t, x=None):
+        ...     return m.InputContainer({'i': 2.0})
+        >>> result = m.simulate_to_threshold(future_load, profile=True)
+        >>> print(result.profile)
+    """
+
+    def __init__(self):
+        self.times = {}
+        self.calls = {}
+
+    def record(self, phase: str, elapsed: float) -> None:
+        """
+        Record one call of a phase
+
+        Args:
+            phase (str): Name of the phase (e.g., 'next_state')
+            elapsed (float): Wall time of the call (s)
+        """
+        self.times[phase] = self.times.get(phase, 0.0) + elapsed
+        self.calls[phase] = self.calls.get(phase, 0) + 1
+
+    def wrap(self, phase: str, fcn):
+        """
+        Wrap a function so that each call is recorded as the given phase
+
+        Args:
+            phase (str): Name of the phase
+            fcn (Callable): Function to time
+
+        Returns:
+            Callable: Wrapped function, with the same arguments and return value as fcn
+        """
+        record = self.record
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return fcn(*args, **kwargs)
+            finally:
+                record(phase, perf_counter() - start)
+
+        return timed
+
+    @contextmanager
+    def phase(self, phase: str):
+        """
+        Context manager recording the time spent in the block as the given phase
+
+        Args:
+            phase (str): Name of the phase
+        """
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, perf_counter() - start)
+
+    @property
+    def total(self) -> float:
+        """
+        Returns:
+            float: Total time recorded for all phases (s)
+        """
+        return sum(self.times.values())
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+            dict: Time (s) and number of calls for each phase, e.g., {'next_state': {'time': 0.1, 'calls': 1000}}
+        """
+        return {
+            phase: {"time": time, "calls": self.calls[phase]}
+            for phase, time in self.times.items()
+        }
+
+    def merge(self, other: "Profiler") -> None:
+        """
+        Add the results of another Profiler (e.g., from a worker process) to this one
+
+        Args:
+            other (Profiler): Profiler to add
+        """
+        for phase, time in other.times.items():
+            self.times[phase] = self.times.get(phase, 0.0) + time
+            self.calls[phase] = self.calls.get(phase, 0) + other.calls[phase]
+
+    def reset(self) -> None:
+        """
+        Clear all recorded results
+        """
+        self.times.clear()
+        self.calls.clear()
+
+    def __str__(self) -> str:
+        lines = ["{:<22}{:>12}{:>10}{:>8}".format("Phase", "Time (s)", "Calls", "%")]
+        total = self.total or 1
+        for phase, time in sorted(self.times.items(), key=lambda item: -item[1]):
+            lines.append(
+                "{:<22}{:>12.6f}{:>10}{:>8.1f}".format(
+                    phase, time, self.calls[phase], 100 * time / total
+                )
+            )
+        return "\n".join(lines)
+
+
+def get_profiler(profile):
+    """
+    Get the Profiler to use for a profile argument
+
+    Args:
+        profile (bool or Profiler): True to create a new Profiler, False or None to disable profiling, or an existing Profiler
+
+    Returns:
+        Profiler or None: Profiler, or None if profiling is disabled
+    """
+    if profile is True:
+        return Profiler()
+    if profile is False or profile is None:
+        return None
+    if not isinstance(profile, Profiler):
+        raise TypeError(f"'profile' must be a bool or Profiler, was a {type(profile)}")
+    return profile
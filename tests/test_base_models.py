@@ -12,7 +12,9 @@ import unittest
 sys.path.append(join(dirname(__file__), ".."))
 
 from progpy import PrognosticsModel, CompositeModel
-from progpy.models import ThrownObject, BatteryElectroChemEOD
+from progpy.loading import Piecewise
+from progpy.utils import Profiler
+from progpy.models import BatteryCircuit, ThrownObject, BatteryElectroChemEOD
 from progpy.models.test_models.linear_models import (
     OneInputNoOutputNoEventLM,
     OneInputOneOutputNoEventLM,
@@ -174,6 +176,93 @@ class TestModels(unittest.TestCase):
         self.assertEqual(x_default["v"], x_rk4["v"])
         self.assertEqual(x_default["x"], x_rk4["x"])
 
+    def test_integration_type_vectorized(self):
+        # Integrators should act on every column of a vectorized state independently
+        x0 = np.array([1.0, 2.0, 3.0])
+        v0 = np.array([40.0, 30.0, 20.0])
+        dt = 0.5
+        for method in ("euler", "rk4"):
+            m = LinearThrownObject(
+                integration_method=method, process_noise=0, measurement_noise=0
+            )
+            u = m.InputContainer({})
+            x = m.StateContainer({"x": x0, "v": v0})
+            x_next = m.next_state(x, u, dt)
+            self.assertIsInstance(x_next, m.StateContainer)
+            self.assertEqual(x_next.matrix.shape, (2, 3))
+            # Input state is not modified
+            np.testing.assert_array_equal(x["x"], x0)
+            for i in range(3):
+                x_i = m.next_state(m.StateContainer({"x": x0[i], "v": v0[i]}), u, dt)
+                self.assertAlmostEqual(x_next["x"][i], x_i["x"])
+                self.assertAlmostEqual(x_next["v"][i], x_i["v"])
+
+        # rk4 is exact for constant acceleration
+        np.testing.assert_allclose(x_next["x"], x0 + v0 * dt - 9.81 * dt**2 / 2)
+
+    def test_integration_type_implicit(self):
+        class StiffDecay(PrognosticsModel):
+            # x1 quickly relaxes to cos(x2), where x2 is time
+            states = ["x1", "x2"]
+            inputs = []
+            outputs = ["x1"]
+
+            def dx(self, x, u):
+                return self.StateContainer(
+                    {
+                        "x1": -1000 * (x["x1"] - np.cos(x["x2"])),
+                        "x2": np.ones_like(x["x2"]),
+                    }
+                )
+
+            def output(self, x):
+                return self.OutputContainer({"x1": x["x1"]})
+
+        # Finite difference jacobian
+        m = StiffDecay()
+        x = m.StateContainer({"x1": 0.5, "x2": 1.0})
+        u = m.InputContainer({})
+        np.testing.assert_allclose(
+            m.jacobian(x, u), [[-1000, -1000 * np.sin(1.0)], [0, 0]], rtol=1e-5
+        )
+
+        # Model-provided jacobian
+        m_linear = LinearThrownObject()
+        x_linear = m_linear.initialize()
+        np.testing.assert_array_equal(
+            m_linear.jacobian(x_linear, m_linear.InputContainer({})), m_linear.A
+        )
+
+        # Explicit euler is unstable at this step size, implicit methods are not
+        dt = 0.05
+        x_true = np.cos(1.0) + np.sin(1.0) / 1000  # Approximately, after transients
+        for method, tol in (("backward_euler", 1e-4), ("rosenbrock", 1e-2)):
+            m = StiffDecay(integration_method=method)
+            x = m.StateContainer({"x1": 0.0, "x2": 0.0})
+            for _ in range(20):
+                x = m.next_state(x, u, dt)
+            self.assertAlmostEqual(x["x2"], 1.0)
+            self.assertAlmostEqual(x["x1"], x_true, delta=tol)
+
+        m = StiffDecay(integration_method="euler")
+        x = m.StateContainer({"x1": 0.0, "x2": 0.0})
+        for _ in range(20):
+            x = m.next_state(x, u, dt)
+        self.assertGreater(abs(x["x1"]), 1e10)
+
+        # Implicit methods act on every column of a vectorized state independently
+        for method in ("backward_euler", "rosenbrock"):
+            m = StiffDecay(integration_method=method)
+            x = m.StateContainer(
+                {"x1": np.array([0.0, 1.0]), "x2": np.array([0.0, 0.5])}
+            )
+            x_next = m.next_state(x, u, dt)
+            for i in range(2):
+                x_i = m.next_state(
+                    m.StateContainer({"x1": x["x1"][i], "x2": x["x2"][i]}), u, dt
+                )
+                self.assertAlmostEqual(x_next["x1"][i], x_i["x1"])
+
     def test_parameters_statelikematrixwrapper(self):
         """
         This is testing a very specific case where a state container from one model is used to define the noise from another.
@@ -1154,6 +1243,390 @@ class TestModels(unittest.TestCase):
         result = m.simulate_to_threshold(load, dt=2, save_pts=[2.5])
         self.assertListEqual(result.times, [0, 4])
 
+    def test_sim_batch(self):
+        m = ThrownObject(process_noise=0, measurement_noise=0)
+        x_batch = [m.StateContainer({"x": 1.83, "v": v}) for v in (35, 40, 45)]
+
+        # Each trajectory should match simulating it on its own
+        results = m.simulate_batch_to_threshold(
+            x_batch, events="impact", dt=0.01, save_freq=1
+        )
+        self.assertEqual(len(results), 3)
+        for x, result in zip(x_batch, results):
+            expected = m.simulate_to_threshold(
+                x=x, events="impact", dt=0.01, save_freq=1
+            )
+            self.assertListEqual(result.times, expected.times)
+            self.assertTrue(
+                np.allclose(result.states.to_numpy(), expected.states.to_numpy())
+            )
+            self.assertAlmostEqual(result.time_of_event["impact"], expected.times[-1])
+            self.assertAlmostEqual(
+                result.state_at_event["impact"]["x"], expected.states[-1]["x"]
+            )
+            self.assertAlmostEqual(result.outputs[-1]["x"], expected.outputs[-1]["x"])
+
+        # Faster throws reach impact later
+        toe = [result.time_of_event["impact"] for result in results]
+        self.assertListEqual(toe, sorted(toe))
+
+        # All events - falling is reached before impact
+        results = m.simulate_batch_to_threshold(x_batch, event_strategy="all", dt=0.01)
+        for result in results:
+            self.assertLess(
+                result.time_of_event["falling"], result.time_of_event["impact"]
+            )
+            self.assertEqual(result.times[-1], result.time_of_event["impact"])
+
+        # Horizon - events not reached
+        results = m.simulate_batch_to_threshold(x_batch, dt=0.01, horizon=1)
+        for result in results:
+            self.assertAlmostEqual(result.times[-1], 1)
+            self.assertIsNone(result.time_of_event["falling"])
+
+        # Horizon - trajectories still active are saved at the horizon, even if
+        # others finished (and were saved) at the same time
+        x_mixed = [m.StateContainer({"x": 1.83, "v": v}) for v in (40, 400)]
+        results = m.simulate_batch_to_threshold(
+            x_mixed, events="impact", dt=0.5, horizon=8.5, save_freq=100
+        )
+        self.assertListEqual(results[0].times, [0, 8.5])
+        self.assertEqual(results[0].time_of_event["impact"], 8.5)
+        self.assertListEqual(results[1].times, [0, 8.5])
+        self.assertIsNone(results[1].time_of_event["impact"])
+
+        # Batch as a single StateContainer with a column per trajectory
+        x_matrix = m.StateContainer({"x": [1.83, 1.83], "v": [35, 45]})
+        results = m.simulate_batch_to_threshold(x_matrix, events="impact", dt=0.01)
+        self.assertEqual(len(results), 2)
+        self.assertAlmostEqual(results[1].time_of_event["impact"], toe[2])
+
+        # Non-vectorized models simulate each trajectory separately
+        m = LinearThrownObject(process_noise=0, measurement_noise=0)
+        results = m.simulate_batch_to_threshold(x_batch, dt=0.01)
+        self.assertEqual(len(results), 3)
+        for x, result in zip(x_batch, results):
+            expected = m.simulate_to_threshold(x=x, dt=0.01)
+            self.assertListEqual(result.times, expected.times)
+            self.assertEqual(result.time_of_event["impact"], expected.times[-1])
+
+        # All events - keeps the time each event was reached, not the end time
+        m = ThrownObject(process_noise=0, measurement_noise=0)
+        m.is_vectorized = False
+        results = m.simulate_batch_to_threshold(x_batch, event_strategy="all", dt=0.01)
+        for x, result in zip(x_batch, results):
+            expected = m.simulate_to_threshold(x=x, event_strategy="all", dt=0.01)
+            self.assertEqual(
+                result.time_of_event["falling"], expected.time_of_event["falling"]
+            )
+            self.assertLess(
+                result.time_of_event["falling"], result.time_of_event["impact"]
+            )
+            self.assertEqual(
+                result.state_at_event["falling"]["v"],
+                expected.state_at_event["falling"]["v"],
+            )
+
+        with self.assertRaises(ValueError):
+            m.simulate_batch_to_threshold(x_batch, events="invalid")
+        with self.assertRaises(ValueError):
+            m.simulate_batch_to_threshold(x_batch, event_strategy="invalid")
+
+    def test_sim_adaptive_dt(self):
+        m = BatteryCircuit(process_noise=0, measurement_noise=0)
+
+        def future_load(t, x=None):
+            return m.InputContainer({"i": 2 if t < 500 else 3})
+
+        expected = m.simulate_to_threshold(future_load, dt=0.1, save_freq=100)
+        result = m.simulate_to_threshold(
+            future_load,
+            dt=("adaptive", 1e-6),
+            save_freq=100,
+            save_pts=[123.4],
+            event_localization="bisect",
+        )
+        # Save points are kept
+        self.assertListEqual(result.times[:4], [0, 100, 123.4, 200])
+        self.assertAlmostEqual(result.times[-1], expected.times[-1], delta=0.1)
+        for key in m.states:
+            self.assertAlmostEqual(
+                result.states[1][key],
+                expected.states[1][key],
+                delta=1e-4 * abs(expected.states[1][key]),
+            )
+
+        # Default tolerance
+        result = m.simulate_to_threshold(future_load, dt="adaptive", save_freq=100)
+        self.assertAlmostEqual(result.times[-1], expected.times[-1], delta=25)
+
+        with self.assertRaises(ValueError):
+            # Only continuous models
+            ThrownObject().simulate_to_threshold(dt="adaptive")
+        with self.assertRaises(ValueError):
+            m.simulate_to_threshold(future_load, dt=("adaptive", -1))
+
+    def test_sim_ivp(self):
+        m = BatteryCircuit(process_noise=0, measurement_noise=0)
+        future_load = Piecewise(m.InputContainer, [500, float("inf")], {"i": [2, 3]})
+
+        expected = m.simulate_to_threshold(future_load, dt=0.1, save_freq=100)
+        for dt in ("ivp", ("ivp", "LSODA")):
+            result = m.simulate_to_threshold(
+                future_load, dt=dt, save_freq=100, save_pts=[123.4]
+            )
+            # Saved at exactly the save points
+            self.assertListEqual(result.times[:4], [0, 100, 123.4, 200])
+            self.assertAlmostEqual(
+                result.time_of_event["EOD"], expected.times[-1], delta=0.5
+            )
+            self.assertEqual(result.times[-1], result.time_of_event["EOD"])
+            # Ends exactly at the threshold
+            self.assertAlmostEqual(
+                result.outputs[-1]["v"], m.parameters["VEOD"], places=6
+            )
+            # State at 500 s (index 6, after save point 123.4). Tolerance is that of the euler reference
+            for key in m.states:
+                self.assertAlmostEqual(
+                    result.states[6][key],
+                    expected.states[5][key],
+                    delta=1e-2 * abs(expected.states[5][key]),
+                )
+
+        class ContinuousThrownObject(PrognosticsModel):
+            states = ["x", "v"]
+            inputs = []
+            outputs = ["x"]
+            events = ["falling", "impact"]
+
+            def dx(self, x, u):
+                return self.StateContainer({"x": x["v"], "v": -9.81})
+
+            def output(self, x):
+                return self.OutputContainer({"x": x["x"]})
+
+            def event_state(self, x):
+                x_max = x["x"] + np.square(x["v"]) / (9.81 * 2)
+                return {
+                    "falling": max(x["v"] / 40, 0),
+                    "impact": max(x["x"] / x_max, 0),
+                }
+
+            def threshold_met(self, x):
+                return {"falling": x["v"] < 0, "impact": x["x"] <= 0}
+
+        m = ContinuousThrownObject(process_noise=0)
+        x0 = m.StateContainer({"x": 1.83, "v": 40})
+        t_falling = 40 / 9.81
+        t_impact = (40 + np.sqrt(40**2 + 2 * 9.81 * 1.83)) / 9.81
+
+        result = m.simulate_to_threshold(x=x0, dt="ivp", save_freq=1)
+        self.assertAlmostEqual(result.times[-1], t_falling, places=6)
+        self.assertListEqual(result.times[:-1], [0, 1, 2, 3, 4])
+        self.assertIsNone(result.time_of_event["impact"])
+
+        # Every event is found, and the simulation continues past the first
+        result = m.simulate_to_threshold(
+            x=x0, dt="ivp", save_freq=1, event_strategy="all"
+        )
+        self.assertAlmostEqual(result.time_of_event["falling"], t_falling, places=6)
+        self.assertAlmostEqual(result.time_of_event["impact"], t_impact, places=6)
+        self.assertAlmostEqual(result.times[-1], t_impact, places=6)
+        self.assertAlmostEqual(result.states[-1]["x"], 0, places=6)
+
+        with self.assertRaises(ValueError):
+            # Only continuous models
+            ThrownObject().simulate_to_threshold(dt="ivp")
+        with self.assertRaises(ValueError):
+            # Only a single state
+            m.simulate_to_threshold(
+                x=m.StateContainer(
+                    {"x": np.array([1.0, 2.0]), "v": np.array([40, 30])}
+                ),
+                dt="ivp",
+            )
+
+    def test_sim_profile(self):
+        m = ThrownObject(process_noise=0, measurement_noise=0)
+        result = m.simulate_to_threshold(dt=0.1, save_freq=1)
+        self.assertIsNone(result.profile)
+
+        result = m.simulate_to_threshold(dt=0.1, save_freq=1, profile=True)
+        profile = result.profile
+        n_steps = profile.calls["next_state"]
+        self.assertEqual(n_steps, round(result.times[-1] / 0.1))
+        for phase in ("load", "apply_process_noise", "apply_limits", "threshold_met"):
+            self.assertEqual(profile.calls[phase], n_steps)
+        self.assertEqual(profile.calls["saving"], len(result.times))
+
+        # Lazy outputs and event states are recorded when calculated
+        self.assertNotIn("output", profile.calls)
+        result.outputs[-1]
+        result.event_states[-1]
+        self.assertEqual(profile.calls["output"], len(result.times))
+        self.assertEqual(profile.calls["event_state"], len(result.times))
+        self.assertGreater(profile.total, 0)
+        self.assertSetEqual(set(profile.to_dict()), set(profile.times))
+
+        # Accumulates in provided profiler
+        profiler = Profiler()
+        m.simulate_to_threshold(dt=0.1, profile=profiler)
+        m.simulate_to_threshold(dt=0.1, profile=profiler)
+        self.assertEqual(profiler.calls["next_state"], 2 * n_steps)
+
+        with self.assertRaises(TypeError):
+            m.simulate_to_threshold(dt=0.1, profile="invalid")
+
+    def test_sim_event_localization(self):
+        m = ThrownObject(process_noise=0, measurement_noise=0)
+        coarse = m.simulate_to_threshold(dt=1, events="impact")
+        for method in ("bisect", "interp"):
+            result = m.simulate_to_threshold(
+                dt=1, events="impact", event_localization=method
+            )
+            # Event is within the last step, and threshold is met
+            self.assertGreater(result.times[-1], coarse.times[-2])
+            self.assertLess(result.times[-1], coarse.times[-1])
+            self.assertTrue(m.threshold_met(result.states[-1])["impact"])
+            self.assertAlmostEqual(result.states[-1]["x"], 0, delta=1e-3)
+
+            # Threshold is not met just before
+            t_prev = result.times[-2]
+            x = m.next_state(result.states[-2], None, result.times[-1] - t_prev - 1e-5)
+            self.assertFalse(m.threshold_met(x)["impact"])
+
+        # Tolerance
+        result = m.simulate_to_threshold(
+            dt=1, events="impact", event_localization=("bisect", 1e-9)
+        )
+        self.assertAlmostEqual(result.states[-1]["x"], 0, delta=1e-6)
+
+        # All events
+        result = m.simulate_to_threshold(
+            dt=1, event_strategy="all", event_localization="interp"
+        )
+        self.assertAlmostEqual(result.states[-1]["x"], 0, delta=1e-3)
+
+        with self.assertRaises(ValueError):
+            m.simulate_to_threshold(dt=1, event_localization="invalid")
+        with self.assertRaises(ValueError):
+            m.simulate_to_threshold(dt=1, event_localization=("bisect", -1))
+
+    def test_sim_multiple_events(self):
+        m = ThrownObject(process_noise=0, measurement_noise=0)
+        falling = m.simulate_to_threshold(dt=0.01, events="falling")
+        impact = m.simulate_to_threshold(dt=0.01, events="impact")
+
+        # Every event is recorded in a single simulation
+        result = m.simulate_to_threshold(dt=0.01, event_strategy="all")
+        self.assertListEqual(list(result.time_of_event.keys()), m.events)
+        self.assertAlmostEqual(result.time_of_event["falling"], falling.times[-1])
+        self.assertAlmostEqual(result.time_of_event["impact"], impact.times[-1])
+        self.assertAlmostEqual(
+            result.state_at_event["falling"]["v"], falling.states[-1]["v"]
+        )
+        self.assertAlmostEqual(
+            result.state_at_event["impact"]["x"], impact.states[-1]["x"]
+        )
+        self.assertEqual(result.times[-1], result.time_of_event["impact"])
+
+        # First event
+        result = m.simulate_to_threshold(dt=0.01)
+        self.assertAlmostEqual(result.time_of_event["falling"], falling.times[-1])
+        self.assertIsNone(result.time_of_event["impact"])
+        self.assertIsNone(result.state_at_event["impact"])
+
+        # Horizon
+        result = m.simulate_to_threshold(dt=0.01, event_strategy="all", horizon=5)
+        self.assertIsNotNone(result.time_of_event["falling"])
+        self.assertIsNone(result.time_of_event["impact"])
+
+        # Each event is localized
+        result = m.simulate_to_threshold(
+            dt=1, event_strategy="all", event_localization=("bisect", 1e-9)
+        )
+        self.assertAlmostEqual(result.state_at_event["falling"]["v"], 0, delta=1e-6)
+        self.assertAlmostEqual(result.state_at_event["impact"]["x"], 0, delta=1e-6)
+        self.assertEqual(result.times[-1], result.time_of_event["impact"])
+
+        # time_of_event and state_at_event
+        toe = m.time_of_event(m.initialize(), dt=0.01)
+        self.assertAlmostEqual(toe["falling"], falling.times[-1])
+        self.assertAlmostEqual(toe["impact"], impact.times[-1])
+        state = m.state_at_event(m.initialize(), dt=0.01)
+        self.assertAlmostEqual(state["impact"]["x"], impact.states[-1]["x"])
+        toe = m.time_of_event(m.initialize(), dt=0.01, horizon=5)
+        self.assertIsNone(toe["impact"])
+
+        # Events that are only met for a while (e.g., e1)
+        class NonPersistentEvents(PrognosticsModel):
+            states = ["a"]
+            events = ["e1", "e2"]
+            default_parameters = {"process_noise": 0, "x0": {"a": 0.0}}
+
+            def dx(self, x, u):
+                return self.StateContainer({"a": 1.0})
+
+            def event_state(self, x):
+                return {"e1": abs(x["a"] - 4) / 4, "e2": max(1 - x["a"] / 10, 0)}
+
+            def threshold_met(self, x):
+                return {"e1": 3 < x["a"] < 5, "e2": x["a"] >= 10}
+
+        m = NonPersistentEvents()
+        toe = m.time_of_event(m.initialize(), dt=0.5, horizon=100)
+        self.assertDictEqual(toe, {"e1": 3.5, "e2": 10.0})
+        result = m.simulate_to_threshold(dt=0.5, event_strategy="all", horizon=100)
+        self.assertEqual(result.times[-1], 10)
+        m.parameters["integrator_config"] = {"max_step": 0.5}  # Steps into e1
+        result = m.simulate_to_threshold(dt="ivp", event_strategy="all", horizon=100)
+        self.assertAlmostEqual(result.time_of_event["e1"], 3, places=6)
+        self.assertAlmostEqual(result.time_of_event["e2"], 10, places=6)
+        self.assertAlmostEqual(result.times[-1], 10, places=6)
+
+        from progpy.predictors import MonteCarlo
+
+        mc_results = MonteCarlo(m).predict(
+            m.initialize(), n_samples=3, dt=0.5, horizon=100
+        )
+        self.assertDictEqual(
+            dict(mc_results.time_of_event.mean), {"e1": 3.5, "e2": 10.0}
+        )
+
+    def test_sim_iter(self):
+        m = ThrownObject(process_noise=0, measurement_noise=0)
+        expected = m.simulate_to_threshold(dt=0.01, save_freq=1)
+
+        # Same save points as simulate_to_threshold
+        results = list(m.simulate_iter(dt=0.01, save_freq=1))
+        self.assertListEqual([r[0] for r in results], expected.times)
+        for (t, u, x, z, es), x_e, z_e, es_e in zip(
+            results, expected.states, expected.outputs, expected.event_states
+        ):
+            self.assertAlmostEqual(x["x"], x_e["x"])
+            self.assertAlmostEqual(x["v"], x_e["v"])
+            self.assertAlmostEqual(z["x"], z_e["x"])
+            self.assertAlmostEqual(es["impact"], es_e["impact"])
+        # States are copies
+        self.assertIsNot(results[0][2], results[1][2])
+
+        # Stopping early
+        for t, u, x, z, es in m.simulate_iter(dt=0.01, save_freq=1):
+            if t >= 3:
+                break
+        self.assertEqual(t, expected.times[3])
+
+        # Integration method is reset when stopped early
+        m = LinearThrownObject(process_noise=0, measurement_noise=0)
+        sim = m.simulate_iter(dt=0.01, integration_method="rk4")
+        next(sim)
+        self.assertEqual(m.parameters["integration_method"], "rk4")
+        sim.close()
+        self.assertEqual(m.parameters["integration_method"], "euler")
+
+        with self.assertRaises(ValueError):
+            next(m.simulate_iter(events="invalid"))
+
     def test_sim_rk4(self):
         # With non-linear model
         m = ThrownObject()
@@ -1288,6 +1761,70 @@ class TestModels(unittest.TestCase):
                 0.001, load, {"o1": 0.8}, x=x0
             )
 
+    def test_state_limit_warnings(self):
+        import warnings
+        from progpy.exceptions import ProgModelStateLimitWarning
+
+        def apply_limits(m, values):
+            n = len(values)
+            x = m.StateContainer(np.array([[1] * n, [5] * n, [-3.2] * n, values]))
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always")
+                x = m.apply_limits(x)
+            n_warnings = len(
+                [
+                    w
+                    for w in caught
+                    if issubclass(w.category, ProgModelStateLimitWarning)
+                ]
+            )
+            return x, n_warnings
+
+        # Default: warn every time a bound is exceeded
+        m = MockProgModel()
+        m.state_limits = {"t": (-100, 100)}
+        for _ in range(2):
+            x, n_warnings = apply_limits(m, [50, -150, 125])
+            self.assertListEqual(list(x["t"]), [50, -100, 100])
+            self.assertEqual(n_warnings, 2)
+        self.assertDictEqual(m.state_limit_counts, {})
+
+        # Warn the first time each bound is exceeded
+        m = MockProgModel(state_limit_warnings="once")
+        m.state_limits = {"t": (-100, 100)}
+        x, n_warnings = apply_limits(m, [50, -150, 125])
+        self.assertListEqual(list(x["t"]), [50, -100, 100])
+        self.assertEqual(n_warnings, 2)
+        x, n_warnings = apply_limits(m, [-200, 200, 0])
+        self.assertListEqual(list(x["t"]), [-100, 100, 0])
+        self.assertEqual(n_warnings, 0)
+        self.assertDictEqual(m.state_limit_counts, {"t": 4})
+
+        m = MockProgModel(state_limit_warnings="counted")
+        m.state_limits = {"t": (-100, 100)}
+        x, n_warnings = apply_limits(m, [-150, 150])
+        self.assertListEqual(list(x["t"]), [-100, 100])
+        self.assertEqual(n_warnings, 0)
+        self.assertDictEqual(m.state_limit_counts, {"t": 2})
+
+        m.parameters["state_limit_warnings"] = "off"
+        x, n_warnings = apply_limits(m, [-150, 150])
+        self.assertListEqual(list(x["t"]), [-100, 100])
+        self.assertEqual(n_warnings, 0)
+        self.assertDictEqual(m.state_limit_counts, {"t": 2})
+
+        # Changes to limits take effect
+        m.state_limits["t"] = (-10, 10)
+        x, _ = apply_limits(m, [-150, 150])
+        self.assertListEqual(list(x["t"]), [-10, 10])
+
+        # Other state types
+        x = m.apply_limits({"a": 1, "b": 5, "c": -3.2, "t": 20})
+        self.assertEqual(x["t"], 10)
+
+        with self.assertRaises(ValueError):
+            m.parameters["state_limit_warnings"] = "sometimes"
+
     def test_progress_bar(self):
         m = MockProgModel(process_noise=0.0)
 
@@ -1,14 +1,17 @@
 # Copyright © 2021 United States Government as represented by the Administrator of the National Aeronautics and Space Administration.  All Rights Reserved.
 
 from copy import deepcopy
+import numpy as np
 import unittest
 
 from progpy import CompositeModel
+from progpy.models import BatteryCircuit
 from progpy.models.test_models.linear_models import (
     OneInputOneOutputNoEventLM,
     OneInputNoOutputOneEventLM,
     OneInputOneOutputNoEventLMPM,
     OneInputOneOutputOneEventLM,
+    OneInputOneOutputOneEventAltLM,
 )
 
 
@@ -813,6 +816,66 @@ class TestCompositeModel(unittest.TestCase):
         )  # extra 1 from pm
         self.assertAlmostEqual(x["OneInputOneOutputOneEventLM_2.x1"], 2)
 
+    def test_composite_wiring(self):
+        m1 = OneInputOneOutputOneEventLM()
+        m2 = OneInputOneOutputOneEventAltLM()
+
+        def fcn(a, b):
+            return a * b
+
+        # Performance metric of the first model feeds the second, output of the second feeds the function
+        m_composite = CompositeModel(
+            [m1, m2, fcn],
+            connections=[
+                (
+                    "OneInputOneOutputOneEventLM.pm1",
+                    "OneInputOneOutputOneEventAltLM.u2",
+                ),
+                ("OneInputOneOutputOneEventAltLM.z2", "function.a"),
+            ],
+        )
+        x = m_composite.initialize(
+            {"OneInputOneOutputOneEventLM.u1": 0, "function.b": 2}
+        )
+        u = m_composite.InputContainer(
+            {"OneInputOneOutputOneEventLM.u1": 1, "function.b": 2}
+        )
+        x1 = 0
+        x2 = 0
+        for _ in range(3):
+            # Models are propagated in order, each with connected values already updated this step
+            x1 += 1
+            x2 += x1 + 1  # pm1 = x1 + 1
+            a = x2
+            x = m_composite.next_state(x, u, 1)
+            self.assertAlmostEqual(x["OneInputOneOutputOneEventLM.x1"], x1)
+            self.assertAlmostEqual(x["OneInputOneOutputOneEventAltLM.x2"], x2)
+            self.assertAlmostEqual(x["OneInputOneOutputOneEventLM.pm1"], x1 + 1)
+            self.assertAlmostEqual(x["function.return"], 2 * a)
+
+        z = m_composite.output(x)
+        self.assertAlmostEqual(z["OneInputOneOutputOneEventLM.z1"], x1)
+        self.assertAlmostEqual(z["function.return"], 2 * a)
+        es = m_composite.event_state(x)
+        self.assertAlmostEqual(
+            es["OneInputOneOutputOneEventAltLM.x2 == 5"], 1 - 0.2 * x2
+        )
+        self.assertDictEqual(
+            m_composite.threshold_met(x),
+            {
+                "OneInputOneOutputOneEventLM.x1 == 10": False,
+                "OneInputOneOutputOneEventAltLM.x2 == 5": True,
+            },
+        )
+
+        # Copies are rewired to their own submodels and containers
+        m_copy = deepcopy(m_composite)
+        x_copy = m_copy.next_state(
+            m_copy.StateContainer(x), m_copy.InputContainer(u), 1
+        )
+        x = m_composite.next_state(x, u, 1)
+        self.assertListEqual(x_copy.matrix.tolist(), x.matrix.tolist())
+
     def test_composite_copy(self):
         m = OneInputOneOutputOneEventLM()
         m_composite = CompositeModel(
@@ -860,6 +923,51 @@ class TestCompositeModel(unittest.TestCase):
         for key in es.keys():
             self.assertEqual(es[key], es_copy[key])
 
+    def test_composite_vectorized(self):
+        def power(v, i):
+            return v * i
+
+        m_batt = BatteryCircuit()
+        connections = [
+            ("BatteryCircuit.v", "function.v"),
+            ("BatteryCircuit.v", "BatteryCircuit_2.i"),
+        ]
+
+        # Functions must be marked as vectorized
+        m_composite = CompositeModel([m_batt, m_batt, power], connections=connections)
+        self.assertFalse(m_composite.is_vectorized)
+        power.is_vectorized = True
+        m_composite = CompositeModel([m_batt, m_batt, power], connections=connections)
+        self.assertTrue(m_composite.is_vectorized)
+        # ... and every model vectorized
+        self.assertFalse(
+            CompositeModel([m_batt, OneInputOneOutputNoEventLM()]).is_vectorized
+        )
+
+        u = m_composite.InputContainer({"BatteryCircuit.i": 2, "function.i": 2})
+        x0 = m_composite.initialize(u)
+        # Three columns, with different charges
+        x = m_composite.StateContainer(x0.matrix * np.ones((1, 3)))
+        x["BatteryCircuit.qb"] = x["BatteryCircuit.qb"] * np.array([1, 0.9, 0.8])
+        columns = [
+            m_composite.StateContainer(x.matrix[:, [j]].copy()) for j in range(3)
+        ]
+
+        # Each column of the vectorized state matches the same state simulated on its own
+        for _ in range(10):
+            x = m_composite.next_state(x, u, 1)
+            columns = [m_composite.next_state(x_j, u, 1) for x_j in columns]
+        for j, x_j in enumerate(columns):
+            np.testing.assert_allclose(x.matrix[:, [j]], x_j.matrix)
+            z = m_composite.output(x)
+            z_j = m_composite.output(x_j)
+            self.assertAlmostEqual(z["function.return"][j], z_j["function.return"])
+            self.assertAlmostEqual(
+                m_composite.event_state(x)["BatteryCircuit_2.EOD"][j],
+                m_composite.event_state(x_j)["BatteryCircuit_2.EOD"],
+            )
+        self.assertEqual(len(set(x["BatteryCircuit_2.tb"])), 3)
+
 
 def main():
     load_test = unittest.TestLoader()
@@ -6,6 +6,7 @@ import pickle
 import sys
 import unittest
 
+from progpy.models import ThrownObject
 from progpy.utils.containers import DictLikeMatrixWrapper
 
 
@@ -18,7 +19,7 @@ class TestDictLikeMatrixWrapper(unittest.TestCase):
         sys.stdout = sys.__stdout__
 
     def _checks(self, c1):
-        self.assertListEqual(c1.keys(), ["a", "b"])
+        self.assertListEqual(list(c1.keys()), ["a", "b"])
         self.assertListEqual(list(c1.values()), [1.0, 2.0])
         self.assertListEqual(list(c1.items()), [("a", 1.0), ("b", 2.0)])
         self.assertEqual(c1["a"], 1)
@@ -49,23 +50,23 @@ class TestDictLikeMatrixWrapper(unittest.TestCase):
         c1.update({"c": 3.0, "b": 2.0})
         self.assertTrue((c1.matrix == np.array([[-1], [2], [3]])).all())
         self.assertEqual(c1["c"], 3)
-        self.assertListEqual(c1.keys(), ["a", "b", "c"])
+        self.assertListEqual(list(c1.keys()), ["a", "b", "c"])
         other = DictLikeMatrixWrapper(["c", "d"], np.array([[5], [7]]))
         c1.update(other)
         self.assertTrue((c1.matrix == np.array([[-1], [2], [5], [7]])).all())
         self.assertEqual(c1["d"], 7)
-        self.assertListEqual(c1.keys(), ["a", "b", "c", "d"])
+        self.assertListEqual(list(c1.keys()), ["a", "b", "c", "d"])
         # deleting items
         del c1["a"]
         self.assertTrue((c1.matrix == np.array([[2], [5], [7]])).all())
-        self.assertListEqual(c1.keys(), ["b", "c", "d"])
+        self.assertListEqual(list(c1.keys()), ["b", "c", "d"])
         del c1["c"]
         self.assertTrue((c1.matrix == np.array([[2], [7]])).all())
-        self.assertListEqual(c1.keys(), ["b", "d"])
+        self.assertListEqual(list(c1.keys()), ["b", "d"])
         del c1["d"]
         del c1["b"]
         self.assertTrue((c1.matrix == np.array([[]])).all())
-        self.assertListEqual(c1.keys(), [])
+        self.assertListEqual(list(c1.keys()), [])
 
     def test_dict_init(self):
         c1 = DictLikeMatrixWrapper(["a", "b"], {"a": 1, "b": 2})
@@ -98,6 +99,66 @@ class TestDictLikeMatrixWrapper(unittest.TestCase):
         c1 = DictLikeMatrixWrapper(["a", "b"], {"a": 1, "b": 2})
         self.assertTrue((c1.matrix == np.array([[1], [2]])).all())
 
+    def test_from_matrix(self):
+        matrix = np.array([[1.0], [2.0]])
+        c1 = DictLikeMatrixWrapper.from_matrix(matrix, ["a", "b"])
+        self._checks(c1)
+
+        # Array is used directly
+        c2 = DictLikeMatrixWrapper.from_matrix(matrix, ["a", "b"])
+        self.assertIs(c2.matrix, matrix)
+
+        # Model containers have fixed keys
+        m = ThrownObject()
+        x = m.StateContainer.from_matrix(np.array([[1.0], [2.0]]))
+        self.assertIsInstance(x, m.StateContainer)
+        self.assertListEqual(list(x.keys()), m.states)
+        self.assertEqual(x["v"], 2)
+
+        with self.assertRaises(TypeError):
+            DictLikeMatrixWrapper.from_matrix(matrix)
+
+    def test_shared_keys(self):
+        m = ThrownObject()
+        x1 = m.StateContainer({"x": 1, "v": 2})
+        x2 = m.StateContainer(np.array([3.0, 4.0]))
+        # Keys and map of key to row are shared
+        self.assertIs(x1._keys, x2._keys)
+        self.assertIs(x1._index, x2._index)
+        self.assertFalse(hasattr(x1, "__dict__"))
+        self.assertEqual(x2["v"], 4)
+        with self.assertRaises(ValueError):
+            x1["missing"]
+
+        # Adding or removing keys doesn't change other containers
+        x1.update({"a": 5})
+        del x2["x"]
+        self.assertListEqual(list(x1.keys()), ["x", "v", "a"])
+        self.assertListEqual(list(x2.keys()), ["v"])
+        self.assertListEqual(
+            list(m.StateContainer({"x": 1, "v": 2}).keys()), ["x", "v"]
+        )
+        self.assertListEqual(m.states, ["x", "v"])
+
+        # Keys returned are shared (not copied), and the shared keys and map are read-only
+        keys = m.StateContainer({"x": 1, "v": 2}).keys()
+        self.assertIs(keys, m.StateContainer(np.array([3.0, 4.0])).keys())
+        with self.assertRaises(AttributeError):
+            keys.append("zzz")
+        self.assertListEqual(
+            list(m.StateContainer({"x": 1, "v": 2}).keys()), ["x", "v"]
+        )
+        self.assertListEqual(list(m.StateContainer._shared_keys), ["x", "v"])
+        with self.assertRaises(TypeError):
+            m.StateContainer._shared_index["zzz"] = 2
+
+        # Construction from a container with the same keys
+        x3 = m.StateContainer(x1.copy())
+        self.assertListEqual(list(x3.keys()), ["x", "v"])
+        self.assertEqual(x3["x"], 1)
+        x4 = m.StateContainer(m.StateContainer({"x": 1, "v": 2}))
+        self.assertEqual(x4["v"], 2)
+
 
 # This allows the module to be executed directly
 def main():
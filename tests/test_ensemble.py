@@ -1,12 +1,14 @@
 # Copyright © 2021 United States Government as represented by the Administrator of the
 # National Aeronautics and Space Administration.  All Rights Reserved.
 
+from concurrent.futures import ThreadPoolExecutor
 from io import StringIO
 import numpy as np
 import sys
 import unittest
 
 from progpy import EnsembleModel
+from progpy.models import BatteryCircuit
 from progpy.models.test_models.linear_models import (
     OneInputOneOutputOneEventLM,
     OneInputOneOutputOneEventAltLM,
@@ -238,6 +240,100 @@ class TestEnsemble(unittest.TestCase):
         # threshold met should be true (because both of the models agree)
         self.assertTrue(em.threshold_met(x2)["x1 == 10"])
 
+    def test_aggregation_without_axis(self):
+        m = OneInputOneOutputOneEventLM()
+        m2 = OneInputOneOutputOneEventAltLM()
+        m3 = OneInputOneOutputOneEventLM(x0={"x1": 2})
+
+        # Aggregation methods that don't accept axis are applied to each value
+        em = EnsembleModel([m, m2, m3], aggregation_method=lambda values: max(values))
+        em_max = EnsembleModel([m, m2, m3], aggregation_method=np.max)
+        x = em.initialize()
+        x_max = em_max.initialize()
+        self.assertEqual(x["x1"], 2)
+        self.assertEqual(x["x2"], 0)
+        u = em.InputContainer({"u1": 1, "u2": 2})
+        for _ in range(3):
+            x = em.next_state(x, u, 1)
+            x_max = em_max.next_state(x_max, u, 1)
+        self.assertListEqual(x.matrix.tolist(), x_max.matrix.tolist())
+        self.assertDictEqual(em.event_state(x), em_max.event_state(x))
+
+        # Errors raised by aggregation methods that accept axis are not hidden
+        def aggregate(values, axis=None):
+            raise TypeError("Invalid values")
+
+        em.parameters["aggregation_method"] = aggregate
+        with self.assertRaises(TypeError):
+            em.next_state(x, u, 1)
+        # Changed aggregation method is used
+        em.parameters["aggregation_method"] = np.min
+        self.assertEqual(em.initialize()["x1"], 0)
+
+    def test_vectorized(self):
+        m = BatteryCircuit()
+        m2 = BatteryCircuit(qMax=7000)
+        em = EnsembleModel([m, m2], aggregation_method=np.median)
+        self.assertTrue(em.is_vectorized)
+        self.assertFalse(
+            EnsembleModel([m, OneInputOneOutputOneEventLM()]).is_vectorized
+        )
+
+        # Each column of a vectorized state matches the same state on its own
+        x0 = em.initialize()
+        x = em.StateContainer(x0.matrix * np.ones((1, 3)))
+        x["qb"] = x["qb"] * np.array([1, 0.9, 0.8])
+        columns = [em.StateContainer(x.matrix[:, [j]].copy()) for j in range(3)]
+        u = em.InputContainer({"i": 2})
+        for _ in range(10):
+            x = em.next_state(x, u, 1)
+            columns = [em.next_state(x_j, u, 1) for x_j in columns]
+        z = em.output(x)
+        es = em.event_state(x)
+        for j, x_j in enumerate(columns):
+            np.testing.assert_allclose(x.matrix[:, [j]], x_j.matrix)
+            np.testing.assert_allclose(z.matrix[:, [j]], em.output(x_j).matrix)
+            self.assertAlmostEqual(es["EOD"][j], em.event_state(x_j)["EOD"])
+
+    def test_executor(self):
+        m = BatteryCircuit()
+        m2 = BatteryCircuit(qMax=7000)
+        em = EnsembleModel([m, m2])
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            em_parallel = EnsembleModel([m, m2], executor=executor)
+            x = em.initialize()
+            self.assertListEqual(
+                em_parallel.initialize().matrix.tolist(), x.matrix.tolist()
+            )
+            u = em.InputContainer({"i": 2})
+            self.assertListEqual(
+                em_parallel.next_state(x, u, 1).matrix.tolist(),
+                em.next_state(x, u, 1).matrix.tolist(),
+            )
+            self.assertDictEqual(em_parallel.event_state(x), em.event_state(x))
+
+            # Time of event, with the default of None for events not reached
+            def future_loading(t, x=None):
+                return m.InputContainer({"i": 2})
+
+            toe = em_parallel.time_of_event(x, future_loading, dt=1, horizon=1000)
+            self.assertIsNone(toe["EOD"])
+            toe = em_parallel.time_of_event(x, future_loading, dt=1)
+            self.assertEqual(toe, em.time_of_event(x, future_loading, dt=1))
+            self.assertAlmostEqual(
+                toe["EOD"],
+                np.mean(
+                    [
+                        m.time_of_event(m.StateContainer(x), future_loading, dt=1)[
+                            "EOD"
+                        ],
+                        m2.time_of_event(m2.StateContainer(x), future_loading, dt=1)[
+                            "EOD"
+                        ],
+                    ]
+                ),
+            )
+
 
 # This allows the module to be executed directly
 def main():
@@ -3,7 +3,12 @@
 import numpy as np
 import unittest
 
-from progpy.loading import Piecewise, GaussianNoiseWrapper
+from progpy.loading import (
+    Piecewise,
+    GaussianNoiseWrapper,
+    MovingAverage,
+    state_independent,
+)
 
 
 class Testloading(unittest.TestCase):
@@ -26,6 +31,32 @@ class Testloading(unittest.TestCase):
         # Should work with one more load
         Piecewise({}, [1, 2], {"a": [1, 2, 3]})
 
+    def test_state_independent(self):
+        self.assertTrue(Piecewise({}, [1, 2], {"a": [1, 2]}).state_independent)
+        self.assertTrue(MovingAverage(dict).state_independent)
+        self.assertFalse(
+            getattr(
+                GaussianNoiseWrapper(lambda t, x=None: {}, 1),
+                "state_independent",
+                False,
+            )
+        )
+
+        def loading(t, x=None):
+            return {"a": t}
+
+        self.assertIs(state_independent(loading), loading)
+        self.assertTrue(loading.state_independent)
+
+        # Bound methods cannot be marked, so are wrapped
+        class Load:
+            def load(self, t, x=None):
+                return {"a": 2 * t}
+
+        wrapped = state_independent(Load().load)
+        self.assertTrue(wrapped.state_independent)
+        self.assertEqual(wrapped(3), {"a": 6})
+
     def test_gaussian_seed(self):
         def loading(t, x=None):
             return {"a": 10}
@@ -2,16 +2,28 @@
 # National Aeronautics and Space Administration.  All Rights Reserved.
 
 from io import StringIO
+import numpy as np
 import sys
 import unittest
 
 from progpy import MixtureOfExpertsModel
+from progpy.models import BatteryCircuit
 from progpy.models.test_models.other_models import (
     OneInputTwoOutputsOneEvent,
     OneInputTwoOutputsOneEvent_alt,
 )
 
 
+class CountingModel(OneInputTwoOutputsOneEvent):
+    """
+    Model recording the number of columns of the state in each call to output
+    """
+
+    def output(self, x):
+        self.__dict__.setdefault("output_calls", []).append(x.matrix.shape[1])
+        return super().output(x)
+
+
 class TestMoE(unittest.TestCase):
     def setUp(self):
         # set stdout (so it won't print)
@@ -172,6 +184,120 @@ class TestMoE(unittest.TestCase):
         self.assertFalse(tm["x0==10"])
         self.assertTrue(tm["x0==7"])
 
+    def test_vectorized(self):
+        experts = [BatteryCircuit(qMax=7856), BatteryCircuit(qMax=6000)]
+        m_moe = MixtureOfExpertsModel(experts)
+        self.assertTrue(m_moe.is_vectorized)
+        self.assertFalse(
+            MixtureOfExpertsModel(
+                (OneInputTwoOutputsOneEvent(), OneInputTwoOutputsOneEvent())
+            ).is_vectorized
+        )
+
+        # Column j is measured from expert j
+        x0 = m_moe.initialize()
+        x = m_moe.StateContainer(x0.matrix * np.ones((1, 2)))
+        columns = [m_moe.StateContainer(x0.matrix.copy()) for _ in range(2)]
+        x_experts = [m.initialize() for m in experts]
+        for _ in range(20):
+            x_experts = [
+                m.next_state(x_i, m.InputContainer({"i": 2}), 10)
+                for m, x_i in zip(experts, x_experts)
+            ]
+            z = [m.output(x_i) for m, x_i in zip(experts, x_experts)]
+            u = m_moe.InputContainer(
+                {
+                    "i": np.full(2, 2.0),
+                    "t": np.array([z_j["t"] for z_j in z]),
+                    "v": np.array([z_j["v"] for z_j in z]),
+                }
+            )
+            x = m_moe.next_state(x, u, 10)
+            columns = [
+                m_moe.next_state(
+                    x_j,
+                    m_moe.InputContainer({"i": 2, "t": z_j["t"], "v": z_j["v"]}),
+                    10,
+                )
+                for x_j, z_j in zip(columns, z)
+            ]
+
+        # Each column matches the same state updated on its own
+        for j, x_j in enumerate(columns):
+            np.testing.assert_allclose(x.matrix[:, [j]], x_j.matrix)
+
+        # Best model is selected for each column
+        self.assertListEqual(
+            [name for name, _ in m_moe.best_model(x)],
+            ["BatteryCircuit", "BatteryCircuit_2"],
+        )
+        z = m_moe.output(x)
+        es = m_moe.event_state(x)
+        for j, x_j in enumerate(columns):
+            self.assertEqual(m_moe.best_model(x_j)[1], experts[j])
+            self.assertAlmostEqual(z["v"][j], m_moe.output(x_j)["v"])
+            self.assertAlmostEqual(es["EOD"][j], m_moe.event_state(x_j)["EOD"])
+        self.assertNotAlmostEqual(z["v"][0], z["v"][1])
+
+    def test_lazy_evaluation(self):
+        experts = [
+            CountingModel(a=2.3, b=0.75, c=0.75),
+            CountingModel(a=1.19),
+            CountingModel(a=0.95, b=0.85, c=0.85),
+        ]
+        m_moe = MixtureOfExpertsModel(experts)
+        x0 = m_moe.initialize()
+        x = m_moe.next_state(x0, m_moe.InputContainer({"u0": 2}), 1)
+        x = m_moe.StateContainer(x.matrix * np.ones((1, 3)))
+        # Column 0: first model is best, columns 1 and 2: third model is best
+        x["CountingModel._score"] = np.array([0.9, 0.1, 0.1])
+        x["CountingModel_3._score"] = np.array([0.1, 0.9, 0.9])
+
+        z = m_moe.output(x)
+        # Only the best models are evaluated, and only for their columns
+        self.assertListEqual(
+            [m.__dict__.get("output_calls") for _, m in m_moe.parameters["models"]],
+            [[1], None, [2]],
+        )
+        for j in range(3):
+            x_j = m_moe.StateContainer(x.matrix[:, [j]])
+            self.assertEqual(z["x0+b"][j], m_moe.output(x_j)["x0+b"])
+        self.assertListEqual(z["x0+b"].tolist(), [5.35, 2.75, 2.75])
+
+        # Selection follows the scores
+        x["CountingModel_2._score"] = np.array([1, 1, 0])
+        es = m_moe.event_state(x)
+        self.assertAlmostEqual(es["x0==10"][0], 1 - 2.38 / 10)
+        self.assertAlmostEqual(es["x0==10"][2], 1 - 1.9 / 10)
+        self.assertListEqual(m_moe.threshold_met(x)["x0==10"].tolist(), [False] * 3)
+
+    def test_threads(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        m_moe = MixtureOfExpertsModel(
+            [
+                OneInputTwoOutputsOneEvent(a=2.3, b=0.75, c=0.75),
+                OneInputTwoOutputsOneEvent(a=0.95, b=0.85, c=0.85),
+            ]
+        )
+        x0 = m_moe.next_state(m_moe.initialize(), m_moe.InputContainer({"u0": 2}), 1)
+        # States with a different best model, used from several threads at once
+        states = []
+        for scores in ((0.9, 0.1), (0.1, 0.9)):
+            x = m_moe.StateContainer(x0.matrix.copy())
+            x["OneInputTwoOutputsOneEvent._score"] = scores[0]
+            x["OneInputTwoOutputsOneEvent_2._score"] = scores[1]
+            states.append(x)
+        expected = [m_moe.output(x)["x0+b"] for x in states]
+
+        def output(i):
+            return m_moe.output(states[i % 2])["x0+b"]
+
+        with ThreadPoolExecutor(4) as pool:
+            results = list(pool.map(output, range(400)))
+        self.assertNotEqual(expected[0], expected[1])
+        self.assertListEqual(results, expected * 200)
+
 
 # This allows the module to be executed directly
 def main():
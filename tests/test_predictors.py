@@ -12,7 +12,9 @@ from progpy.predictors import (
 )
 from progpy.uncertain_data import MultivariateNormalDist, UnweightedSamples, ScalarData
 from progpy.models import BatteryCircuit, ThrownObject
+from progpy.loading import state_independent
 from progpy.state_estimators import UnscentedKalmanFilter
+from progpy.predictors.monte_carlo import _SharedLoad
 from progpy.predictors.prediction import UnweightedSamplesPrediction, Prediction
 from progpy.metrics import samples
 
@@ -301,6 +303,337 @@ class TestPredictors(unittest.TestCase):
             mc_results.times[-1], 3, 1
         )  # Saving every second, last time should be around the nearest 1s before falling event
 
+    def test_store_trajectories(self):
+        m = ThrownObject(process_noise=0, measurement_noise=0)
+        x0 = MultivariateNormalDist(m.states, [1.83, 40], np.diag([0.1, 1]))
+        samples = x0.sample(5)
+
+        for predictor, state in (
+            (MonteCarlo(m), samples),
+            (UnscentedTransformPredictor(m), x0),
+        ):
+            # Vectorized and serial prediction
+            for kwargs in ({}, {"event_localization": "bisect"}):
+                if kwargs and isinstance(predictor, UnscentedTransformPredictor):
+                    continue
+                expected = predictor.predict(state, dt=0.01, save_freq=1, **kwargs)
+                results = predictor.predict(
+                    state, dt=0.01, save_freq=1, store_trajectories=False, **kwargs
+                )
+                self.assertEqual(len(results.times), 0)
+                self.assertEqual(len(results.states.data), 0)
+                self.assertEqual(len(results.outputs.data), 0)
+                for event in m.events:
+                    self.assertEqual(
+                        results.time_of_event.mean[event],
+                        expected.time_of_event.mean[event],
+                    )
+                    self.assertEqual(
+                        results.time_of_event.final_state[event].mean,
+                        expected.time_of_event.final_state[event].mean,
+                    )
+
+    def test_MC_convergence(self):
+        m = ThrownObject(process_noise=0, measurement_noise=0)
+        mc = MonteCarlo(m)
+        x0 = MultivariateNormalDist(m.states, [1.83, 40], np.diag([0.1, 1]))
+
+        # Without a stopping rule, all samples are simulated
+        results = mc.predict(x0, dt=0.01, n_samples=20, store_trajectories=False)
+        self.assertEqual(results.n_samples, 20)
+        self.assertIsNone(results.converged)
+
+        for convergence in ("sem", "quantile"):
+            np.random.seed(0)
+            results = mc.predict(
+                x0,
+                dt=0.01,
+                n_samples=2000,
+                convergence=convergence,
+                batch_size=50,
+                store_trajectories=False,
+            )
+            self.assertTrue(results.converged)
+            self.assertLess(results.n_samples, 2000)
+            self.assertEqual(results.n_samples % 50, 0)
+            self.assertEqual(len(results.time_of_event), results.n_samples)
+            self.assertAlmostEqual(
+                results.time_of_event.mean["impact"], 7.78, delta=0.1
+            )
+
+            # Reaching n_samples before converging
+            results = mc.predict(
+                x0,
+                dt=0.01,
+                n_samples=20,
+                convergence=convergence,
+                convergence_tol=1e-9,
+                batch_size=10,
+                store_trajectories=False,
+            )
+            self.assertFalse(results.converged)
+            self.assertEqual(results.n_samples, 20)
+
+            # Early batches reach no event (thrown too high to land before the horizon)
+            samples = UnweightedSamples(
+                [{"x": 1.83, "v": 1000}] * 20 + [{"x": 1.83, "v": 40}] * 80
+            )
+            results = mc.predict(
+                samples,
+                events="impact",
+                dt=0.01,
+                horizon=20,
+                convergence=convergence,
+                batch_size=10,
+                store_trajectories=False,
+            )
+            self.assertTrue(results.converged)
+            # At least convergence_min_samples (10) samples reach each event
+            self.assertGreaterEqual(results.n_samples, 30)
+            self.assertAlmostEqual(
+                results.time_of_event.mean["impact"], 7.78, delta=0.01
+            )
+            results = mc.predict(
+                samples,
+                events="impact",
+                dt=0.01,
+                horizon=20,
+                convergence=convergence,
+                batch_size=10,
+                convergence_min_samples=85,
+                store_trajectories=False,
+            )
+            self.assertFalse(results.converged)
+            self.assertEqual(results.n_samples, 100)
+
+        with self.assertRaises(ValueError):
+            mc.predict(x0, dt=0.01, n_samples=20, convergence="invalid")
+        with self.assertRaises(ValueError):
+            mc.predict(
+                x0, dt=0.01, n_samples=20, convergence="sem", convergence_min_samples=1
+            )
+        with self.assertRaises(ValueError):
+            mc.predict(x0, dt=0.01, n_samples=20, convergence="sem", batch_size=1)
+
+    def test_MC_sample_method(self):
+        m = ThrownObject(process_noise=0, measurement_noise=0)
+        mc = MonteCarlo(m)
+        x0 = MultivariateNormalDist(m.states, [1.83, 40], np.diag([0.1, 1]))
+
+        def toe_spread(sample_method):
+            # Standard deviation of the estimated mean time of event between predictions
+            return np.std(
+                [
+                    mc.predict(
+                        x0,
+                        dt=0.01,
+                        n_samples=64,
+                        sample_method=sample_method,
+                        store_trajectories=False,
+                    ).time_of_event.mean["impact"]
+                    for _ in range(10)
+                ]
+            )
+
+        np.random.seed(0)
+        random_spread = toe_spread("random")
+        for sample_method in ("sobol", "halton", "lhs"):
+            self.assertLess(toe_spread(sample_method), random_spread)
+
+        with self.assertRaises(ValueError):
+            mc.predict(x0, dt=0.01, n_samples=4, sample_method="invalid")
+
+    def test_shared_load(self):
+        m = ThrownObject(process_noise=0, measurement_noise=0)
+        x0 = MultivariateNormalDist(m.states, [1.83, 40], np.diag([0.1, 1]))
+        samples = x0.sample(5)
+        calls = []
+
+        def future_load(t, x=None):
+            calls.append(t)
+            return {}
+
+        # Serial prediction
+        mc = MonteCarlo(m)
+        kwargs = {"dt": 0.01, "save_freq": 1, "event_localization": "bisect"}
+        expected = mc.predict(samples, future_load, **kwargs)
+        n_calls = len(calls)
+        calls.clear()
+        results = mc.predict(samples, state_independent(future_load), **kwargs)
+        # Each time is only evaluated once
+        self.assertEqual(len(calls), len(set(calls)))
+        self.assertLess(len(calls), n_calls / 4)
+        for event in m.events:
+            self.assertListEqual(
+                [toe[event] for toe in results.time_of_event],
+                [toe[event] for toe in expected.time_of_event],
+            )
+        self.assertIsInstance(results.inputs[0][0], m.InputContainer)
+
+        # Samples do not share inputs, and the cache is bounded
+        load = _SharedLoad(lambda t, x=None: {"i": t}, BatteryCircuit(), maxsize=2)
+        u1 = [load(t) for t in (0, 1, 2)]
+        load.start()
+        u2 = [load(t) for t in (0, 1, 2)]
+        self.assertEqual(len(load.loads), 2)
+        for a, b in zip(u1, u2):
+            self.assertIsNot(a, b)
+            self.assertEqual(a["i"], b["i"])
+        u1[0]["i"] = 10
+        load.start()
+        self.assertEqual(load(0)["i"], 0)
+        # A different time at the same step is not taken from the cache
+        self.assertEqual(load(1.5)["i"], 1.5)
+
+        # Mean state is not calculated for UnscentedTransformPredictor
+        utp = UnscentedTransformPredictor(m)
+        states = []
+
+        def future_load(t, x=None):
+            states.append(x)
+            return m.InputContainer({})
+
+        expected = utp.predict(x0, future_load, dt=0.01)
+        self.assertIsNotNone(states[-1])
+        results = utp.predict(x0, state_independent(future_load), dt=0.01)
+        self.assertIsNone(states[-1])
+        self.assertEqual(
+            results.time_of_event.mean["impact"], expected.time_of_event.mean["impact"]
+        )
+
+    def test_MC_vectorized(self):
+        m = ThrownObject(process_noise=0, measurement_noise=0)
+        self.assertTrue(m.is_vectorized)
+        mc = MonteCarlo(m)
+        x0 = MultivariateNormalDist(m.states, [1.83, 40], np.diag([0.1, 1]))
+        samples = x0.sample(5)
+
+        # Matches simulating each sample
+        for event_strategy in ("first", "all"):
+            mc_results = mc.predict(
+                samples, dt=0.01, save_freq=1, event_strategy=event_strategy
+            )
+            self.assertEqual(len(mc_results.states), 5)
+            for x, toe, final_state in zip(
+                samples,
+                mc_results.time_of_event,
+                mc_results.time_of_event.final_state["falling"],
+            ):
+                expected = m.simulate_to_threshold(x=x, dt=0.01, events="falling")
+                self.assertAlmostEqual(toe["falling"], expected.times[-1])
+                self.assertAlmostEqual(final_state["v"], expected.states[-1]["v"])
+                if event_strategy == "first":
+                    self.assertNotIn("impact", toe)
+                else:
+                    expected = m.simulate_to_threshold(x=x, dt=0.01, events="impact")
+                    self.assertAlmostEqual(toe["impact"], expected.times[-1])
+
+        # Horizon
+        mc_results = mc.predict(samples, dt=0.01, horizon=5)
+        for toe in mc_results.time_of_event:
+            self.assertIsNone(toe["impact"])
+            self.assertIsNotNone(toe["falling"])
+        self.assertAlmostEqual(mc_results.times[-1], 5, delta=0.011)
+
+        # Loads that depend on state are called with the state of each sample
+        m = BatteryCircuit(process_noise=0)
+        self.assertTrue(m.is_vectorized)
+
+        def future_load(t, x=None):
+            if x is not None and x["tb"] > 290:
+                return m.InputContainer({"i": 2})
+            return m.InputContainer({"i": 3})
+
+        samples = UnweightedSamples([m.initialize()] * 2)
+        mc_results = MonteCarlo(m).predict(samples, future_load, dt=1, horizon=20)
+        self.assertEqual(len(mc_results.time_of_event), 2)
+        self.assertEqual(mc_results.inputs[0][1]["i"], 2)
+
+    def test_MC_parallel(self):
+        m = ThrownObject(process_noise=0.5)
+        mc = MonteCarlo(m)
+        x0 = MultivariateNormalDist(m.states, [1.83, 40], np.diag([0.1, 1]))
+
+        # Same results, independent of number of workers
+        np.random.seed(5)
+        mc_results = mc.predict(x0, n_samples=10, dt=0.1, save_freq=1, n_workers=1)
+        np.random.seed(5)
+        mc_results_2 = mc.predict(
+            x0, n_samples=10, dt=0.1, save_freq=1, n_workers=2, profile=True
+        )
+        self.assertListEqual(mc_results.times, mc_results_2.times)
+        for toe, toe_2 in zip(mc_results.time_of_event, mc_results_2.time_of_event):
+            self.assertDictEqual(toe, toe_2)
+        for event in m.events:
+            for x, x_2 in zip(
+                mc_results.time_of_event.final_state[event],
+                mc_results_2.time_of_event.final_state[event],
+            ):
+                self.assertIsInstance(x_2, m.StateContainer)
+                self.assertEqual(x, x_2)
+        self.assertEqual(len(mc_results_2.states), 10)
+        self.assertIsInstance(mc_results_2.states[0][0], m.StateContainer)
+        self.assertEqual(mc_results_2.outputs[0][-1], mc_results.outputs[0][-1])
+        # Profiles of workers are combined
+        self.assertEqual(mc_results_2.profile.calls["output"], 10)
+
+        # Executor, with samples split for n_workers workers
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(2) as executor:
+            np.random.seed(5)
+            mc_results_2 = mc.predict(
+                x0, n_samples=10, dt=0.1, save_freq=1, n_workers=2, executor=executor
+            )
+            for toe, toe_2 in zip(mc_results.time_of_event, mc_results_2.time_of_event):
+                self.assertDictEqual(toe, toe_2)
+            # n_workers is required with executor
+            with self.assertRaises(ValueError):
+                mc.predict(x0, n_samples=3, dt=0.1, executor=executor)
+
+        # Pool is reused, and not pickled with the predictor
+        pool = mc._pool
+        mc.predict(x0, n_samples=2, dt=0.1, n_workers=2)
+        self.assertIs(mc._pool, pool)
+        self.assertIsNone(pickle.loads(pickle.dumps(mc))._pool)
+
+        # Same results as serial without noise
+        m = ThrownObject(process_noise=0)
+        mc = MonteCarlo(m, n_workers=2)
+        mc_results = mc.predict(x0, n_samples=3, dt=0.1, n_workers=None)
+        mc_results_2 = mc.predict(mc_results.states.snapshot(0), dt=0.1)
+        for toe, toe_2 in zip(mc_results.time_of_event, mc_results_2.time_of_event):
+            self.assertDictEqual(toe, toe_2)
+
+        with self.assertRaises(TypeError):
+            # Load must be picklable
+            mc.predict(x0, lambda t, x=None: {}, n_samples=3, dt=0.1)
+        with self.assertRaises(ValueError):
+            mc.predict(x0, n_samples=3, dt=0.1, n_workers=0)
+
+    def test_MC_profile(self):
+        m = ThrownObject()
+        mc = MonteCarlo(m)
+        mc_results = mc.predict(m.initialize(), dt=0.2, n_samples=3, save_freq=1)
+        self.assertIsNone(mc_results.profile)
+
+        mc_results = mc.predict(
+            m.initialize(), dt=0.2, n_samples=3, save_freq=1, profile=True
+        )
+        profile = mc_results.profile
+        for phase in (
+            "load",
+            "next_state",
+            "apply_process_noise",
+            "apply_limits",
+            "threshold_met",
+            "saving",
+        ):
+            self.assertIn(phase, profile.times)
+            self.assertGreater(profile.calls[phase], 0)
+        # Every step is recorded
+        self.assertEqual(profile.calls["next_state"], profile.calls["apply_limits"])
+
     def test_prediction_mvnormaldist(self):
         times = list(range(10))
         covar = [[0.1, 0.01], [0.01, 0.1]]
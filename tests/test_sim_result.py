@@ -7,8 +7,8 @@ import sys
 import unittest
 import pandas as pd
 
-from progpy.models import BatteryElectroChemEOD
-from progpy.sim_result import SimResult, LazySimResult
+from progpy.models import BatteryElectroChemEOD, ThrownObject
+from progpy.sim_result import ColumnarSimResult, SimResult, LazySimResult
 from progpy.utils.containers import DictLikeMatrixWrapper
 
 
@@ -870,6 +870,80 @@ class TestSimResult(unittest.TestCase):
         self.assertEqual(converted_result.times, time)  # Compare to expected values
         self.assertEqual(converted_result.data, data)
 
+    def test_columnar_sim_result(self):
+        time = list(range(5))
+        state = [{"a": i * 2.5, "b": i * 5.0} for i in range(5)]
+        result = ColumnarSimResult(["a", "b"])
+        for t, x in zip(time, state):
+            result._append(t, np.array([x["a"], x["b"]]))
+
+        # Same API as SimResult
+        expected = SimResult(time, state)
+        self.assertListEqual(result.times, time)
+        self.assertEqual(len(result), 5)
+        self.assertEqual(result[2], state[2])
+        self.assertTrue(result.frame.equals(expected.frame.astype(np.float64)))
+        self.assertTrue((result.to_numpy() == expected.to_numpy()).all())
+        self.assertTrue((result.to_numpy(["b"]) == expected.to_numpy(["b"])).all())
+
+        # Removing the last row before data is accessed only shortens the array
+        result2 = ColumnarSimResult(["a", "b"], time, result.to_numpy())
+        self.assertEqual(result2.pop_by_index(), state[-1])
+        self.assertListEqual(result2.times, time[:-1])
+        self.assertEqual(result2.to_numpy().shape, (4, 2))
+        self.assertEqual(result2[-1], state[-2])
+
+        # Data is stored as a single array, without copying
+        self.assertTrue(np.shares_memory(result.to_numpy(), result.frame.to_numpy()))
+
+        # Lazy results use the states directly
+        lazy = LazySimResult(
+            lambda x: {"c": x["a"] + x["b"]}, time, result, _copy=False
+        )
+        self.assertEqual(lazy[1]["c"], 7.5)
+
+        # Modifying data keeps array and containers consistent
+        result.pop_by_index(0)
+        self.assertListEqual(result.times, time[1:])
+        self.assertEqual(result.to_numpy().shape, (4, 2))
+        self.assertEqual(result.frame.shape, (4, 2))
+        # and doesn't change lazy results calculated from it
+        self.assertEqual(len(lazy.states), 5)
+        self.assertEqual(lazy.frame.shape, (5, 1))
+        self.assertEqual(lazy[0]["c"], 0)
+
+        # Pickles as a ColumnarSimResult
+        result2 = pickle.loads(pickle.dumps(result))
+        self.assertIsInstance(result2, ColumnarSimResult)
+        self.assertListEqual(result2.times, result.times)
+        self.assertEqual(result2.data, result.data)
+        self.assertTrue(np.shares_memory(result2.to_numpy(), result2.frame.to_numpy()))
+
+        # Simulation stores states this way
+        m = BatteryElectroChemEOD()
+        sim = m.simulate_to(100, lambda t, x=None: m.InputContainer({"i": 2}))
+        self.assertIsInstance(sim.states, ColumnarSimResult)
+        self.assertEqual(sim.states.to_numpy().shape, (len(sim.times), m.n_states))
+        self.assertIsInstance(sim.states[0], m.StateContainer)
+        self.assertAlmostEqual(sim.outputs[-1]["v"], m.output(sim.states[-1])["v"])
+        states = pickle.loads(pickle.dumps(sim.states))
+        self.assertIsInstance(states, ColumnarSimResult)
+        np.testing.assert_array_equal(states.to_numpy(), sim.states.to_numpy())
+        self.assertIsInstance(states[0], DictLikeMatrixWrapper)
+        self.assertEqual(states[0]["tb"], sim.states[0]["tb"])
+
+        # Modifying states doesn't change outputs or event states
+        sim = ThrownObject().simulate_to_threshold(save_freq=1, dt=0.1)
+        n = len(sim.times)
+        x0 = sim.states[0].copy()
+        sim.states.pop_by_index(0)
+        sim.states[0]["x"] = -1
+        for lazy in (sim.outputs, sim.event_states):
+            self.assertEqual(len(lazy.states), n)
+            self.assertEqual(lazy.frame.shape[0], n)
+        self.assertEqual(sim.outputs[0]["x"], x0["x"])
+        self.assertNotEqual(sim.outputs[1]["x"], -1)
+
     def test_monotonicity(self):
         # Variables
         time = list(range(5))
@@ -15,7 +15,13 @@ from progpy.models import (
     BatteryElectroChemEOD,
 )
 from progpy.state_estimators import ParticleFilter, KalmanFilter, UnscentedKalmanFilter
-from progpy.uncertain_data import ScalarData, MultivariateNormalDist, UnweightedSamples
+from progpy.state_estimators.particle_filter import resample_functions
+from progpy.uncertain_data import (
+    ScalarData,
+    MultivariateNormalDist,
+    UnweightedSamples,
+    WeightedSamples,
+)
 
 
 def equal_cov(pair1, pair2):
@@ -394,6 +400,248 @@ class TestStateEstimators(unittest.TestCase):
         for u, z in zip(simulated_results.inputs, simulated_results.outputs):
             filt.estimate(t, u, z, dt=3)
             t += config["save_freq"]
+        self.assertIsNone(filt.profile)
+
+        # Profile
+        filt = ParticleFilter(m, x0, num_particles=10, profile=True)
+        filt.estimate(1, future_loading(0), simulated_results.outputs[1])
+        filt.estimate(2, future_loading(1), simulated_results.outputs[2])
+        for phase in ("next_state", "apply_process_noise", "apply_limits"):
+            # Not vectorized - called for each particle
+            self.assertEqual(filt.profile.calls[phase], 20)
+        self.assertEqual(filt.profile.calls["likelihood"], 2)
+        self.assertEqual(filt.profile.calls["resample"], 2)
+
+    def test_PF_resample(self):
+        weights = np.array([0.05, 0.5, 0.0, 0.3, 0.15])
+        for name, resample_fcn in resample_functions.items():
+            indexes = resample_fcn(weights)
+            self.assertEqual(len(indexes), 5, name)
+            counts = np.bincount(indexes, minlength=5)
+            # Particles without weight are never selected
+            self.assertEqual(counts[2], 0, name)
+            if name != "stratified":
+                # At least floor(n*weight) copies of each particle
+                self.assertTrue(np.all(counts >= np.floor(5 * weights)), name)
+
+            # Selected in proportion to the weights
+            counts = np.bincount(
+                resample_fcn(np.repeat(weights, 2000) / 2000), minlength=10000
+            )
+            counts = counts.reshape(5, 2000).sum(axis=1)
+            np.testing.assert_allclose(counts / 10000, weights, atol=0.02)
+
+        m = ThrownObject(process_noise=0.1)
+        with self.assertRaises(ValueError):
+            ParticleFilter(m, m.initialize(), resample_fcn="abc").estimate(
+                0.1, {}, {"x": 1.9}
+            )
+
+        # Particles are resampled into a buffer, swapped with the particle array
+        filt = ParticleFilter(
+            m, m.initialize(), resample_fcn="systematic", measurement_noise={"x": 1}
+        )
+        for i in range(1, 4):
+            buffer = filt._buffer
+            filt.estimate(i * 0.1, {}, {"x": 1.83 + 4 * i})
+            self.assertIs(filt.particles.matrix, buffer)
+            self.assertEqual(filt.particles.matrix.shape, (2, 100))
+
+    def test_PF_likelihood(self):
+        m = ThrownObject(process_noise=0, measurement_noise=0)
+        filt = ParticleFilter(m, m.initialize(), measurement_noise={"x": 0.5})
+        z_predicted = np.array([[1.0, 2.0, 3.5]])
+        np.testing.assert_allclose(
+            filt._log_likelihood(z_predicted, np.array([[2.5]])),
+            -0.5 * np.square((z_predicted[0] - 2.5) / 0.5)
+            - np.log(0.5 * np.sqrt(2 * np.pi)),
+        )
+
+        # Without measurement noise, particles are weighted equally
+        x0 = MultivariateNormalDist(["x", "v"], np.array([1.83, 40]), np.eye(2))
+        filt = ParticleFilter(m, x0, num_particles=10)
+        filt.estimate(0.1, {}, {"x": 5.0})
+        np.testing.assert_array_equal(filt.weights, np.full(10, 0.1))
+
+    def test_PF_resample_threshold(self):
+        m = ThrownObject(process_noise=0, measurement_noise=0)
+        x0 = MultivariateNormalDist(["x", "v"], np.array([1.83, 40]), np.eye(2))
+        z = [{"x": 1.83 + 4 * i - 0.49 * i * i / 100} for i in range(1, 11)]
+
+        # Never resampled - weights are the product of the likelihoods
+        np.random.seed(1)
+        filt = ParticleFilter(
+            m,
+            x0,
+            num_particles=200,
+            measurement_noise={"x": 1},
+            resample_threshold=0,
+            profile=True,
+        )
+        log_weights = np.zeros(200)
+        for i in range(1, 4):
+            filt.estimate(i * 0.1, {}, z[i - 1])
+            z_predicted = filt.particles.matrix[[0]]
+            log_weights += filt._log_likelihood(
+                z_predicted, np.array([[z[i - 1]["x"]]])
+            )
+        weights = np.exp(log_weights - log_weights.max())
+        np.testing.assert_allclose(filt.weights, weights / weights.sum())
+        self.assertNotIn("resample", filt.profile.calls)
+        x = filt.x
+        self.assertIsInstance(x, WeightedSamples)
+        np.testing.assert_allclose(x.weights, filt.weights)
+        self.assertAlmostEqual(x.mean["v"], filt.particles.matrix[1] @ filt.weights)
+
+        # Resampled when the effective sample size is below the threshold
+        filt = ParticleFilter(
+            m,
+            x0,
+            num_particles=200,
+            measurement_noise={"x": 1},
+            resample_threshold=0.5,
+            profile=True,
+        )
+        for i in range(1, 11):
+            weights = filt.weights
+            filt.estimate(i * 0.1, {}, z[i - 1])
+            if filt.profile.calls.get("resample", 0) == 0:
+                # Not resampled yet
+                self.assertGreaterEqual(1 / np.dot(filt.weights, filt.weights), 100)
+                self.assertIsInstance(filt.x, WeightedSamples)
+        self.assertGreater(filt.profile.calls["resample"], 0)
+        self.assertLess(filt.profile.calls["resample"], 10)
+
+        # Resampling resets the weights
+        filt.parameters["resample_threshold"] = 1
+        filt.estimate(1.1, {}, {"x": 34})
+        np.testing.assert_array_equal(filt.weights, np.full(200, 1 / 200))
+        self.assertIsInstance(filt.x, UnweightedSamples)
+
+    def test_PF_kld(self):
+        m = ThrownObject(process_noise={"x": 0.1, "v": 0.1}, measurement_noise=0)
+        x0 = MultivariateNormalDist(["x", "v"], np.array([1.83, 40]), np.eye(2) * 4)
+
+        filt = ParticleFilter(
+            m,
+            x0,
+            num_particles=1000,
+            measurement_noise={"x": 0.5},
+            kld_bin_size={"x": 0.5, "v": 0.5},
+            min_particles=50,
+            max_particles=4000,
+        )
+        self.assertEqual(len(filt.weights), 1000)
+        x = m.initialize()
+        counts = []
+        for i in range(1, 31):
+            x = m.next_state(x, {}, 0.1)
+            filt.estimate(i * 0.1, {}, m.output(x))
+            n = filt.parameters["num_particles"]
+            self.assertEqual(filt.particles.matrix.shape, (2, n))
+            self.assertEqual(len(filt.weights), n)
+            self.assertGreaterEqual(n, 50)
+            self.assertLessEqual(n, 4000)
+            counts.append(n)
+        # Fewer particles as the estimate converges
+        self.assertLess(counts[-1], counts[0])
+        self.assertLess(counts[-1], 1000)
+        for key in ("x", "v"):
+            self.assertAlmostEqual(filt.x.mean[key], x[key], delta=0.5)
+
+        # More particles for a diffuse estimate (smaller bins)
+        filt = ParticleFilter(
+            m,
+            x0,
+            num_particles=1000,
+            kld_bin_size=0.01,
+            max_particles=4000,
+        )
+        filt.estimate(0.1, {}, {"x": 5.0})  # No measurement noise - uninformative
+        self.assertEqual(filt.parameters["num_particles"], 4000)
+
+    def test_PF_parallel(self):
+        from concurrent.futures import ProcessPoolExecutor
+
+        m = ThrownObject(process_noise=0, measurement_noise=0)
+        m.is_vectorized = False  # Propagated particle by particle
+        x0 = MultivariateNormalDist(["x", "v"], np.array([1.83, 40]), np.eye(2))
+
+        def run(**kwargs):
+            np.random.seed(2)
+            filt = ParticleFilter(
+                m, x0, num_particles=50, measurement_noise={"x": 1}, **kwargs
+            )
+            for i in range(1, 4):
+                filt.estimate(i * 0.1, {}, {"x": 1.83 + 4 * i}, dt=0.05)
+            return filt
+
+        # Same as serial
+        serial = run(profile=True)
+        filt = run(n_workers=2, profile=True)
+        np.testing.assert_array_equal(filt.particles.matrix, serial.particles.matrix)
+        np.testing.assert_array_equal(filt.weights, serial.weights)
+        self.assertEqual(filt.t, serial.t)
+        # Profile is collected from the workers
+        for phase in ("next_state", "apply_process_noise", "apply_limits", "output"):
+            self.assertEqual(filt.profile.calls[phase], serial.profile.calls[phase])
+        self.assertEqual(filt.profile.calls["output"], 50 * 3)
+        filt._pool.shutdown()
+
+        # Process noise is independent of the number of workers
+        m.parameters["process_noise"] = {"x": 0.5, "v": 0.5}
+        serial = run()
+        filt = run(n_workers=2)
+        with ProcessPoolExecutor(3) as executor:
+            filt2 = run(n_workers=3, executor=executor)
+            # n_workers (number of chunks) is required with executor
+            with self.assertRaises(ValueError):
+                run(executor=executor)
+        np.testing.assert_array_equal(filt.particles.matrix, serial.particles.matrix)
+        np.testing.assert_array_equal(filt2.particles.matrix, serial.particles.matrix)
+        self.assertIsNone(filt2._pool)
+
+        # Shared memory follows the number of particles
+        filt.parameters["kld_bin_size"] = 0.5
+        filt.parameters["max_particles"] = 80
+        filt.estimate(0.4, {}, {"x": 14.1})
+        filt.estimate(0.5, {}, {"x": 16.8})
+        self.assertEqual(
+            filt._shared.shape, (3, filt.parameters["num_particles"])
+        )  # states and outputs
+
+        # Filter can be copied without its pool or shared memory
+        from copy import deepcopy
+
+        copied = deepcopy(filt)
+        self.assertIsNone(copied._pool)
+        self.assertIsNone(copied._shared)
+        np.testing.assert_array_equal(copied.particles.matrix, filt.particles.matrix)
+        filt._pool.shutdown()
+
+        # The model is only sent to the workers when it has changed
+        serial = run()
+        filt = run(n_workers=2)
+        token = filt._token
+        m.parameters["g"] = -5
+        for f in (serial, filt):
+            np.random.seed(3)
+            f.estimate(0.4, {}, {"x": 14.1}, dt=0.05)
+        self.assertNotEqual(filt._token, token)
+        np.testing.assert_array_equal(filt.particles.matrix, serial.particles.matrix)
+        token = filt._token
+        filt.estimate(0.5, {}, {"x": 16.8}, dt=0.05)
+        self.assertEqual(filt._token, token)
+        filt._pool.shutdown()
+        # Workers without the model ask for it
+        from progpy.state_estimators.particle_filter import _propagate_chunk
+
+        self.assertEqual(
+            _propagate_chunk(
+                "unknown", None, "", (3, 1), 0, 1, [0], 0, 1, {}, 1, False
+            ),
+            (False, None),
+        )
 
     def test_PF(self):
         m = ThrownObject(process_noise={"x": 0.75, "v": 0.75}, measurement_noise=1)
@@ -1,7 +1,13 @@
 # Copyright © 2021 United States Government as represented by the Administrator of the National Aeronautics and Space Administration. All Rights Reserved.
 
 import unittest
-from progpy.uncertain_data import UnweightedSamples, MultivariateNormalDist, ScalarData
+from progpy.uncertain_data import (
+    UnweightedSamples,
+    WeightedSamples,
+    MultivariateNormalDist,
+    ScalarData,
+)
+import numpy as np
 from numpy import array
 
 
@@ -57,6 +63,73 @@ class TestUncertainData(unittest.TestCase):
             {"a": 0.6, "b": 0.2},
         )
 
+    def test_weightedsamples(self):
+        data = [
+            {"a": 1, "b": 2},
+            {"a": 3, "b": 4},
+            {"a": 1, "b": 4},
+            {"a": 2, "b": 3},
+            {"a": 3, "b": 1},
+        ]
+        with self.assertRaises(ValueError):
+            WeightedSamples(data, [1, 2])
+        with self.assertRaises(ValueError):
+            WeightedSamples(data, [1, -1, 0, 0, 0])
+
+        # Equal weights - same as unweighted samples
+        s = WeightedSamples(data)
+        self.assertEqual(len(s), 5)
+        self.assertDictEqual(s[1], {"a": 3, "b": 4})
+        np.testing.assert_allclose(s.weights, np.full(5, 0.2))
+        self.assertAlmostEqual(s.ess, 5)
+        unweighted = UnweightedSamples(data)
+        for key in ("a", "b"):
+            self.assertAlmostEqual(s.mean[key], unweighted.mean[key])
+        np.testing.assert_allclose(s.cov, unweighted.cov)
+        self.assertEqual(s.median, unweighted.median)
+
+        # Weighted statistics
+        s = WeightedSamples(
+            {"a": [1, 3, 1, 2, 3], "b": [2, 4, 4, 3, 1]}, [2, 0, 0, 1, 1]
+        )
+        np.testing.assert_allclose(s.weights, [0.5, 0, 0, 0.25, 0.25])
+        self.assertAlmostEqual(s.ess, 8 / 3)
+        self.assertAlmostEqual(s.mean["a"], 1.75)
+        self.assertAlmostEqual(s.mean["b"], 2)
+        np.testing.assert_allclose(
+            s.cov,
+            np.cov(
+                [[1, 2, 3], [2, 3, 1]], aweights=[2, 1, 1]
+            ),  # Same as dropping samples without weight
+        )
+        self.assertEqual(s.median, {"a": 1, "b": 2})
+        self.assertEqual(
+            s.percentage_in_bounds({"a": [0, 2.5], "b": [0, 2.5]}),
+            {"a": 0.75, "b": 0.75},
+        )
+
+        # Sampling follows the weights
+        for method in ("random", "sobol"):
+            samples = s.sample(4000, method=method)
+            self.assertIsInstance(samples, UnweightedSamples)
+            self.assertEqual(len(samples), 4000)
+            self.assertNotIn({"a": 3, "b": 4}, samples.data)
+            self.assertAlmostEqual(samples.mean["a"], 1.75, delta=0.05)
+
+        # Arithmetic keeps the weights
+        shifted = s + 1
+        self.assertIsInstance(shifted, WeightedSamples)
+        np.testing.assert_array_equal(shifted.weights, s.weights)
+        self.assertAlmostEqual(shifted.mean["a"], 2.75)
+        self.assertAlmostEqual((shifted - 1).mean["b"], 2)
+
+        # Metrics are weighted
+        self.assertAlmostEqual(s.metrics()["a"]["mean"], 1.75)
+
+        import pickle
+
+        self.assertEqual(pickle.loads(pickle.dumps(s)), s)
+
     def test_multivariatenormaldist(self):
         try:
             dist = MultivariateNormalDist()
@@ -74,6 +147,55 @@ class TestUncertainData(unittest.TestCase):
         self.assertTrue((dist.cov == array([[1, 0], [0, 1]])).all())
         dist.percentage_in_bounds([0, 10])
 
+    def test_sample_methods(self):
+        np.random.seed(0)
+        mean = [1, 2, 3]
+        covar = [[1, 0.5, 0], [0.5, 2, 0], [0, 0, 0]]  # Singular
+        dist = MultivariateNormalDist(["a", "b", "c"], mean, covar)
+        for method in ("random", "sobol", "halton", "lhs"):
+            samples = dist.sample(1024, method=method)
+            self.assertIsInstance(samples, UnweightedSamples)
+            self.assertEqual(len(samples), 1024)
+            self.assertListEqual(list(samples.keys()), ["a", "b", "c"])
+            for key, value in samples.mean.items():
+                self.assertAlmostEqual(value, dist.mean[key], delta=0.15)
+            self.assertTrue(np.allclose(samples.cov, covar, atol=0.25))
+            self.assertTrue(all(x["c"] == 3 for x in samples))
+
+        # Quasi-Monte Carlo samples are closer to the distribution
+        def mean_error(method):
+            return np.mean(
+                [abs(dist.sample(256, method=method).mean["a"] - 1) for _ in range(20)]
+            )
+
+        self.assertLess(mean_error("sobol"), mean_error("random"))
+        self.assertLess(mean_error("lhs"), mean_error("random"))
+
+        # Repeatable with numpy random seed
+        np.random.seed(1)
+        samples1 = dist.sample(8, method="sobol")
+        np.random.seed(1)
+        samples2 = dist.sample(8, method="sobol")
+        self.assertListEqual(list(samples1), list(samples2))
+
+        # Stratified resampling selects each sample evenly
+        samples = UnweightedSamples([{"a": i} for i in range(10)])
+        for method in ("sobol", "halton", "lhs"):
+            resampled = samples.sample(100, method=method)
+            self.assertEqual(len(resampled), 100)
+            counts = np.bincount([x["a"] for x in resampled], minlength=10)
+            self.assertTrue(all(counts >= 8))
+            self.assertTrue(all(counts <= 12))
+        with self.assertRaises(ValueError):
+            samples.sample(5, replace=False, method="lhs")
+
+        scalar = ScalarData({"a": 1})
+        self.assertEqual(len(scalar.sample(4, method="halton")), 4)
+
+        for data in (dist, samples, scalar):
+            with self.assertRaises(ValueError):
+                data.sample(4, method="invalid")
+
     def test_scalardist(self):
         data = {"a": 12, "b": 14}
         d = ScalarData(data)